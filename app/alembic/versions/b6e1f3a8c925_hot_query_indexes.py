@@ -0,0 +1,50 @@
+"""hot query indexes
+
+Revision ID: b6e1f3a8c925
+Revises: a9d4e6f20c73
+Create Date: 2026-10-18 16:05:12.733104
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e1f3a8c925'
+down_revision: Union[str, Sequence[str], None] = 'a9d4e6f20c73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Built CONCURRENTLY (outside the migration transaction) so writes to these
+# tables are not blocked while the indexes build. A build that fails leaves an
+# INVALID index behind: drop it and rerun the upgrade.
+INDEXES = [
+    ('ix_projectupload_project_id_uploaded_at', 'projectupload', ['project_id', 'uploaded_at'], {}),
+    ('ix_reportupload_report_id_uploaded_at_image', 'reportupload', ['report_id', 'uploaded_at'],
+     {'postgresql_where': sa.text("file_type = 'image'")}),
+    ('ix_projectreport_project_id_report_date', 'projectreport', ['project_id', 'report_date'], {}),
+    ('ix_projectreport_updated_at', 'projectreport', ['updated_at'], {}),
+    ('ix_paymenthistory_project_id_updated_at_id', 'paymenthistory', ['project_id', 'updated_at', 'id'], {}),
+    ('ix_paymenthistory_updated_at', 'paymenthistory', ['updated_at'],
+     {'postgresql_where': sa.text('project_id IS NOT NULL')}),
+    ('ix_buildingproject_owner_id_status_created_at', 'buildingproject', ['owner_id', 'status', 'created_at'], {}),
+    ('ix_planpackageusagecount_project_id_package_tag', 'planpackageusagecount', ['project_id', 'package_tag'],
+     {'postgresql_include': ['usage_count']}),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns, options in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, **options)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
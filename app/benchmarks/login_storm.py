@@ -0,0 +1,81 @@
+"""
+Event-loop lag during a login storm — run from ``app/``:
+``python3 -m benchmarks.login_storm [concurrent_logins]``
+
+A ticker task sleeps 5 ms in a loop and records how late each wake-up is.
+While it runs, N password verifications are fired concurrently: first with the
+blocking ``verify_password`` (what ``AuthService.login`` used to do), then with
+``verify_password_async`` (the hashing pool). The lag percentiles show how long
+every other request on the worker would have been stalled.
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+
+from utils.security import (
+    get_password_hash,
+    password_hasher_stats,
+    shutdown_password_hasher,
+    verify_password,
+    verify_password_async,
+)
+
+TICK = 0.005
+
+
+async def _ticker(lags: list, stop: asyncio.Event) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + TICK
+        await asyncio.sleep(TICK)
+        lags.append(max(loop.time() - expected, 0.0))
+
+
+def _percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(int(len(ordered) * pct / 100), len(ordered) - 1)
+    return ordered[index]
+
+
+async def _storm(label: str, verify, hashed: str, n: int) -> None:
+    async def blocking_login():
+        await asyncio.sleep(0)
+        return verify_password("correct horse battery staple", hashed)
+
+    async def pooled_login():
+        return await verify("correct horse battery staple", hashed)
+
+    lags: list = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(lags, stop))
+    await asyncio.sleep(TICK * 4)
+
+    login = pooled_login if verify else blocking_login
+    started = time.perf_counter()
+    results = await asyncio.gather(*(login() for _ in range(n)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await ticker
+    assert all(results)
+
+    print(
+        f"{label:<8} logins={n:<4} wall={elapsed * 1000:8.1f} ms  "
+        f"lag p50={statistics.median(lags) * 1000:7.1f} ms  "
+        f"p99={_percentile(lags, 99) * 1000:7.1f} ms  "
+        f"max={max(lags) * 1000:7.1f} ms"
+    )
+
+
+async def main(n: int) -> None:
+    hashed = get_password_hash("correct horse battery staple")
+    await _storm("sync", None, hashed, n)
+    await _storm("pooled", verify_password_async, hashed, n)
+    print(password_hasher_stats())
+    shutdown_password_hasher()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 50))
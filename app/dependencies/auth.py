@@ -9,10 +9,11 @@ from typing import Dict, Any, Optional
 from datetime import datetime, timedelta, UTC, timezone
 from models.users import User
 from sqlalchemy.sql.functions import user
-from utils.db_setup import get_database
+from utils.db_setup import get_database, release_connection
 from settings import get_settings
 from utils.loggers import setup_logger
 from schemas.auth_schema import UserResponse
+from utils.user_cache import user_cache
 
 # Set up logger
 logger = setup_logger(__name__)
@@ -89,6 +90,12 @@ async def get_current_user(
             )
             raise credentials_exception
 
+        # Cache hit: no pool checkout and no Postgres round-trip for this request
+        iat = payload.get("iat")
+        cached = await user_cache.get(user_id, iat)
+        if cached is not None:
+            return UserResponse.model_validate(cached).model_dump()
+
         user_data = await db_session.get(User, user_id)
 
         if not user_data:
@@ -97,7 +104,11 @@ async def get_current_user(
                 detail="Invalid Token, Authentication has Expired Please Login",
             )
 
-        return UserResponse.model_validate(user_data).model_dump()
+        principal = UserResponse.model_validate(user_data)
+        # Don't hold the lookup's connection through the endpoint's non-DB work
+        await release_connection(db_session)
+        await user_cache.set(user_id, iat, principal.model_dump(mode="json"))
+        return principal.model_dump()
 
     except ExpiredSignatureError:
         logger.error("Authentication error: Token has expired")
@@ -0,0 +1,23 @@
+# Loaded automatically by gunicorn from the working directory.
+#
+# Supported launch mode with PROMETHEUS_MULTIPROC_DIR set (the Docker image):
+#   gunicorn main:app -k uvicorn.workers.UvicornWorker --workers N
+# `uvicorn --workers N` runs neither hook below, so samples of restarted or dead
+# workers would stay in the "livesum" gauges. For a bare `uvicorn main:app`
+# (local development) leave PROMETHEUS_MULTIPROC_DIR unset.
+import os
+import shutil
+
+
+def on_starting(server):
+    # Samples left by a previous master would be summed into the new one's
+    multiproc_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if multiproc_dir:
+        shutil.rmtree(multiproc_dir, ignore_errors=True)
+        os.makedirs(multiproc_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from utils.metrics import mark_process_dead
+
+    mark_process_dead(worker.pid)
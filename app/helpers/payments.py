@@ -1,4 +1,3 @@
-import asyncio
 from models.payments import Invoice, Transaction
 from models.plans import PaymentHistory, Plan, PlanPackageUsageCount
 from models.building_project import BuildingProject
@@ -6,15 +5,20 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, exists, update, delete
 from datetime import datetime, timezone
 from fastapi import HTTPException, BackgroundTasks
-from services.email_service import get_email_service
+from services.email_outbox import kick_email_outbox, queue_email
 from models.users import User
 from helpers.constant import get_next_cycle_date
+from services.entitlement_service import reset_project_usage
 
 
 async def handle_success_payment(
     db: AsyncSession, payload: dict, transaction: Transaction, provider_payload: dict
 ):
 
+    # Already applied (redelivered or retried event); never renew twice
+    if transaction.status == "SUCCESS":
+        return
+
     invoice = await db.scalar(
         select(Invoice).where(Invoice.invoice_id == transaction.invoice_id)
     )
@@ -76,8 +80,7 @@ async def handle_success_payment(
     )
 
     await db.execute(delete_stmt)
-    # save all
-    await db.commit()
+    await reset_project_usage(project_id)
 
     # Get the user
     user = await db.get(User, project.owner_id)
@@ -90,27 +93,30 @@ async def handle_success_payment(
         "reference": transaction.reference or transaction.provider_reference,
         "next_billing_date": tranx_history.next_billing_date.strftime("%d %b %Y"),
     }
-    recipient = [user.email]
-
-    email_subject = "Subscription Successful"
 
-    # run under
-    await asyncio.create_task(
-        get_email_service().send_emails(
-            subject=email_subject,
-            recipient=recipient,
-            template_name="subsciption_update.html",
-            context=template_data,
-        )
+    # Committed with the payment, sent by the outbox worker
+    queue_email(
+        db,
+        subject="Subscription Successful",
+        recipient=[user.email],
+        template_name="subsciption_update.html",
+        context=template_data,
     )
 
-    # Get the reference from transactions
+    # save all
+    await db.commit()
+    await reset_project_usage(project_id)
+    await kick_email_outbox()
 
 
 async def handle_failed_payment(
     db: AsyncSession, payload: dict, transaction: Transaction, provider_payload: dict
 ):
 
+    # A late failure event must not overwrite a settled transaction
+    if transaction.status in ("SUCCESS", "FAILED"):
+        return
+
     invoice = await db.scalar(
         select(Invoice).where(Invoice.invoice_id == transaction.invoice_id)
     )
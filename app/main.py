@@ -4,17 +4,29 @@ import uvicorn
 from utils.loggers import setup_logger
 import logging
 from fastapi import FastAPI, Request, status, Depends, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.exceptions import RequestValidationError
 from settings import get_settings
 from routers import api_v1_router
 import asyncio
+import hmac
 from services.permission_service import seed_roles_permissions
 from services.plan_service import seed_plans
-from utils.db_setup import get_database
+from utils.db_setup import get_database, replica_monitor
 from fastapi.staticfiles import StaticFiles
 from utils.redis_client import redis_client
+from utils.user_cache import user_cache
+from utils.http_client import http_clients
+from utils.pubsub_hub import chat_hub
+from services.chat_ingest import chat_ingest
+from utils.security import password_hasher_stats, shutdown_password_hasher
 from middlewares.cors import setup_cors
+from middlewares.rate_limiter import RateLimitMiddleware
+from middlewares.admission import AdmissionMiddleware, admission
+from middlewares.metrics import MetricsMiddleware, gauge_sampler
+from middlewares.query_stats import QueryStatsMiddleware
+from utils.metrics import render_metrics
+from utils.client_ip import client_ip
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
 
@@ -40,6 +52,11 @@ async def lifespan(app: FastAPI):
 
         # asyncio.create_task(seed_plans())
 
+        admission.start()
+        gauge_sampler.start()
+        if replica_monitor is not None:
+            replica_monitor.start()
+
     except Exception as e:
         logger.error(f"Error during startup: {str(e)}")
         raise
@@ -47,6 +64,14 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown
     logger.info("Shutting down Oysterbuild API...")
+    await admission.aclose()
+    await gauge_sampler.aclose()
+    if replica_monitor is not None:
+        await replica_monitor.aclose()
+    await chat_ingest.aclose()
+    await chat_hub.aclose()
+    await http_clients.aclose()
+    shutdown_password_hasher()
 
 
 _is_production = settings.environment.lower() == "production"
@@ -60,6 +85,18 @@ app = FastAPI(
     redoc_url=None if _is_production else "/redoc",
 )
 
+# Innermost: per-request SQL counts, Server-Timing and query budgets
+app.add_middleware(QueryStatsMiddleware)
+
+# Shed DB-bound requests once the pool or event loop is saturated
+app.add_middleware(AdmissionMiddleware)
+
+# Runs after host checks and proxy header handling
+app.add_middleware(RateLimitMiddleware)
+
+# Latency of everything that passed the host check, including 429s and 503s
+app.add_middleware(MetricsMiddleware)
+
 # Restrict which hosts can hit your API at all
 app.add_middleware(
     TrustedHostMiddleware,
@@ -136,14 +173,8 @@ def health_check():
 
 @app.get("/debug/ip")
 async def get_ip(req: Request):
-    client_ip = (
-        req.headers.get("CF-Connecting-IP")  # real IP from Cloudflare
-        or req.headers.get("X-Real-IP")
-        or req.headers.get("X-Forwarded-For")
-        or req.client.host
-    )
     return {
-        "real_ip": client_ip,
+        "real_ip": client_ip(req.headers, req.client.host if req.client else None),
         "cf_connecting_ip": req.headers.get("CF-Connecting-IP"),
         "x_real_ip": req.headers.get("X-Real-IP"),
         "x_forwarded_for": req.headers.get("X-Forwarded-For"),
@@ -151,6 +182,58 @@ async def get_ip(req: Request):
     }
 
 
+def _has_ops_token(req: Request) -> bool:
+    return not settings.metrics_token or hmac.compare_digest(
+        req.headers.get("Authorization", ""), f"Bearer {settings.metrics_token}"
+    )
+
+
+async def require_ops_access(req: Request) -> None:
+    """Gate for the /debug views: the /metrics bearer token, or hidden in production without one."""
+    if _is_production and not settings.metrics_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not _has_ops_token(req):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized")
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(req: Request):
+    if not _has_ops_token(req):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized")
+    content, media_type = render_metrics()
+    return Response(content=content, media_type=media_type)
+
+
+@app.get("/debug/admission", dependencies=[Depends(require_ops_access)])
+async def admission_stats():
+    return admission.stats()
+
+
+@app.get("/debug/replica", dependencies=[Depends(require_ops_access)])
+async def replica_stats():
+    return replica_monitor.stats() if replica_monitor is not None else {"enabled": False}
+
+
+@app.get("/debug/auth-cache", dependencies=[Depends(require_ops_access)])
+async def auth_cache_stats():
+    return user_cache.stats()
+
+
+@app.get("/debug/http-clients", dependencies=[Depends(require_ops_access)])
+async def http_client_stats():
+    return http_clients.stats()
+
+
+@app.get("/debug/chat-hub", dependencies=[Depends(require_ops_access)])
+async def chat_hub_stats():
+    return {"hub": chat_hub.stats(), "ingest": chat_ingest.stats()}
+
+
+@app.get("/debug/password-hasher", dependencies=[Depends(require_ops_access)])
+async def password_hasher_pool_stats():
+    return password_hasher_stats()
+
+
 @app.get("/redis_health")
 async def redis_health_check():
     try:
@@ -0,0 +1,164 @@
+import asyncio
+import json
+from typing import Any, Dict, Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from settings import get_settings
+from utils.adaptive_limit import AdaptiveLimit, Ewma
+from utils.db_setup import TimedQueuePool
+from utils.loggers import setup_logger
+from utils.metrics import ADMISSION_REJECTED
+
+settings = get_settings()
+logger = setup_logger("Admission_Control")
+
+# Never shed: liveness probes, provider webhooks (they retry slowly and we want
+# the payment state), static assets and the admission/metrics views used while
+# overloaded. Other /debug views are token-gated but still go through admission.
+PRIORITY_PATHS = {
+    "/health",
+    "/debug/admission",
+    "/api/v1/payment/paystack/webhook-events",
+    "/api/v1/payment/stripe/webhook-events",
+}
+PRIORITY_PREFIXES = ("/assets/", "/metrics")
+
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def route_class(scope: Scope) -> Optional[str]:
+    """``"read"`` / ``"write"`` for sheddable requests, ``None`` for prioritized traffic."""
+    # WebSocket handshakes are long-lived and hold no pooled connection
+    if scope["type"] != "http":
+        return None
+    path = scope["path"].rstrip("/") or "/"
+    if path in PRIORITY_PATHS or path.startswith(PRIORITY_PREFIXES):
+        return None
+    return "read" if scope["method"] in READ_METHODS else "write"
+
+
+class AdmissionController:
+    """
+    Per-process admission control for DB-bound requests.
+
+    Each route class has an ``AdaptiveLimit`` on in-flight requests. A sampler
+    task measures event-loop lag and DB pool checkout waits every
+    ``admission_sample_interval`` seconds; above target the limits back off,
+    otherwise they creep up. Requests over the limit are rejected immediately
+    instead of queueing in the pool until ``pool_timeout``.
+    """
+
+    def __init__(self) -> None:
+        self.limits: Dict[str, AdaptiveLimit] = {
+            name: AdaptiveLimit(
+                initial,
+                min_limit=settings.admission_min_limit,
+                max_limit=settings.admission_max_limit,
+            )
+            for name, initial in (
+                ("read", settings.admission_read_limit),
+                ("write", settings.admission_write_limit),
+            )
+        }
+        self.loop_lag = Ewma()
+        self.pool_wait = Ewma()
+        self.overloaded = False
+        self._sampler: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._sampler is None or self._sampler.done():
+            self._sampler = asyncio.create_task(self._sample_forever())
+
+    async def aclose(self) -> None:
+        if self._sampler is not None:
+            self._sampler.cancel()
+            try:
+                await self._sampler
+            except asyncio.CancelledError:
+                pass
+            self._sampler = None
+
+    async def _sample_forever(self) -> None:
+        loop = asyncio.get_running_loop()
+        interval = settings.admission_sample_interval
+        while True:
+            started = loop.time()
+            await asyncio.sleep(interval)
+            self.sample(max(loop.time() - started - interval, 0.0), TimedQueuePool.take_worst_wait())
+
+    def sample(self, loop_lag: float, pool_wait: float) -> None:
+        lag = self.loop_lag.add(loop_lag)
+        wait = self.pool_wait.add(pool_wait)
+        overloaded = (
+            lag > settings.admission_target_loop_lag
+            or wait > settings.admission_target_pool_wait
+            or TimedQueuePool.waiting > 0
+        )
+        if overloaded and not self.overloaded:
+            logger.warning(
+                f"[Admission] Overloaded: loop lag={lag * 1000:.1f}ms "
+                f"pool wait={wait * 1000:.1f}ms waiting={TimedQueuePool.waiting} "
+                f"limits={ {name: limit.stats()['limit'] for name, limit in self.limits.items()} }"
+            )
+        self.overloaded = overloaded
+        for limit in self.limits.values():
+            limit.adjust(overloaded)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "overloaded": self.overloaded,
+            "loop_lag_ms": round(self.loop_lag.value * 1000, 2),
+            "pool_wait_ms": round(self.pool_wait.value * 1000, 2),
+            "pool_waiting": TimedQueuePool.waiting,
+            "classes": {name: limit.stats() for name, limit in self.limits.items()},
+        }
+
+
+admission = AdmissionController()
+
+
+class AdmissionMiddleware:
+    """Fast-fails requests beyond their route class's limit with 503 and ``Retry-After``."""
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController = admission) -> None:
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        name = route_class(scope) if settings.admission_enabled else None
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.controller.limits[name]
+        if not limit.acquire():
+            ADMISSION_REJECTED.labels(name).inc()
+            await self._reject(send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limit.release()
+
+    @staticmethod
+    async def _reject(send: Send) -> None:
+        body = json.dumps(
+            {
+                "success": False,
+                "statusCode": 503,
+                "message": "Server is busy, please try again shortly",
+            }
+        ).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", b"1"),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
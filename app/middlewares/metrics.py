@@ -0,0 +1,109 @@
+import asyncio
+import time
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from middlewares.admission import admission
+from settings import get_settings
+from utils.db_setup import engine
+from utils.loggers import setup_logger
+from utils.metrics import (
+    ADMISSION_IN_FLIGHT,
+    ADMISSION_LIMIT,
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_OVERFLOW,
+    HTTP_REQUEST_DURATION,
+    PUBSUB_SUBSCRIPTIONS,
+    UNMATCHED_ROUTE,
+    WEBSOCKET_CONNECTIONS,
+    status_class,
+)
+from utils.pubsub_hub import chat_hub
+
+settings = get_settings()
+logger = setup_logger("Metrics")
+
+
+class MetricsMiddleware:
+    """
+    Records one latency observation per HTTP request, labelled by method, route
+    template (``/projects/{project_id}``, never the raw path) and status class.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route on the shared scope
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                scope["method"],
+                getattr(route, "path", UNMATCHED_ROUTE),
+                status_class(status_code),
+            ).observe(time.perf_counter() - started)
+
+
+class GaugeSampler:
+    """
+    Refreshes this process's gauges every ``metrics_sample_interval`` seconds, so
+    a scrape served by any worker reports every worker's current values.
+    """
+
+    def __init__(self) -> None:
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                self.sample()
+            except Exception as e:
+                logger.warning(f"[Metrics] Gauge sampling failed: {e}")
+            await asyncio.sleep(settings.metrics_sample_interval)
+
+    @staticmethod
+    def sample() -> None:
+        pool = engine.pool
+        DB_POOL_CHECKED_OUT.set(pool.checkedout())
+        DB_POOL_OVERFLOW.set(max(pool.overflow(), 0))
+
+        hub = chat_hub.stats()
+        PUBSUB_SUBSCRIPTIONS.set(hub["subscriptions"])
+        WEBSOCKET_CONNECTIONS.set(hub["connections"])
+
+        for name, limit in admission.limits.items():
+            stats = limit.stats()
+            ADMISSION_LIMIT.labels(name).set(stats["limit"])
+            ADMISSION_IN_FLIGHT.labels(name).set(stats["in_flight"])
+
+
+gauge_sampler = GaugeSampler()
@@ -0,0 +1,67 @@
+import json
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from settings import get_settings
+from utils import query_stats
+from utils.loggers import setup_logger
+
+settings = get_settings()
+logger = setup_logger("Query_Stats")
+
+
+class QueryStatsMiddleware:
+    """
+    Counts and times the SQL statements of each HTTP request.
+
+    The totals go out as a ``Server-Timing: db`` header and one JSON log line.
+    Identical statements repeated ``query_repeat_threshold`` times are logged as
+    N+1 suspects. With ``query_budget_strict`` on (tests, staging), a request to
+    an endpoint declared with ``@query_budget(n)`` fails on its ``n + 1``-th
+    statement; otherwise going over budget is logged.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        def budget():
+            return query_stats.endpoint_budget(scope.get("endpoint"))
+
+        stats, token = query_stats.begin(
+            budget_source=budget if settings.query_budget_strict else None
+        )
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            query_stats.end(token)
+            if stats.count:
+                self._log(scope, stats, budget())
+
+    @staticmethod
+    def _log(scope: Scope, stats: query_stats.QueryStats, budget) -> None:
+        route = getattr(scope.get("route"), "path", scope["path"])
+        entry = {"method": scope["method"], "route": route, **stats.summary()}
+        logger.info(f"[Queries] {json.dumps(entry)}")
+
+        repeated = stats.repeated(settings.query_repeat_threshold)
+        if repeated:
+            logger.warning(
+                f"[Queries] Possible N+1 on {scope['method']} {route}: "
+                + json.dumps([{"count": n, "statement": stmt[:200]} for stmt, n in repeated])
+            )
+        if budget is not None and stats.count > budget:
+            logger.warning(
+                f"[Queries] {scope['method']} {route} issued {stats.count} statements, budget {budget}"
+            )
@@ -0,0 +1,212 @@
+import asyncio
+import hashlib
+import json
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from settings import get_settings
+from utils.client_ip import client_ip
+from utils.loggers import setup_logger
+from utils.redis_client import redis_client
+from utils.token_bucket import BucketSpec, LocalTokenBuckets
+
+settings = get_settings()
+logger = setup_logger("Rate_Limiter")
+
+KEY_PREFIX = "rl:"
+
+# Provider callbacks arrive in bursts from a few source IPs; they are verified
+# by signature and deduplicated, so they are never limited
+EXEMPT_PATHS = {
+    "/api/v1/payment/paystack/webhook-events",
+    "/api/v1/payment/stripe/webhook-events",
+}
+
+# Token buckets charged all-or-nothing. ARGV = now, then capacity/rate/cost per key.
+# Returns {allowed, retry_after} — retry_after as a string, Lua numbers return as ints.
+_TOKEN_BUCKET_LUA = """
+local now = tonumber(ARGV[1])
+local levels = {}
+local retry_after = 0
+for i = 1, #KEYS do
+    local capacity = tonumber(ARGV[i * 3 - 1])
+    local rate = tonumber(ARGV[i * 3])
+    local cost = tonumber(ARGV[i * 3 + 1])
+    local state = redis.call('HMGET', KEYS[i], 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    levels[i] = tokens
+    if tokens < cost then
+        retry_after = math.max(retry_after, (cost - tokens) / rate)
+    end
+end
+if retry_after > 0 then
+    return {0, tostring(retry_after)}
+end
+for i = 1, #KEYS do
+    local capacity = tonumber(ARGV[i * 3 - 1])
+    local rate = tonumber(ARGV[i * 3])
+    local cost = tonumber(ARGV[i * 3 + 1])
+    redis.call('HSET', KEYS[i], 'tokens', levels[i] - cost, 'ts', now)
+    redis.call('EXPIRE', KEYS[i], math.ceil(capacity / rate) + 1)
+end
+return {1, '0'}
+"""
+
+_token_bucket = redis_client.register_script(_TOKEN_BUCKET_LUA)
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """
+    A bucket of ``capacity`` tokens per client, refilled over ``per_seconds``.
+    ``scope`` is ``"ip"`` or ``"user"`` (bearer token, else IP). The token is not
+    verified yet, so a ``"user"`` rule also charges a per-IP bucket
+    ``rate_limit_ip_factor`` times larger; rotating tokens cannot escape that.
+    A rule without ``path`` applies to every request and is charged the route's
+    cost weight.
+    """
+
+    name: str
+    capacity: float
+    per_seconds: float
+    scope: str = "ip"
+    method: Optional[str] = None
+    path: Optional[str] = None
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.per_seconds
+
+    def matches(self, method: str, path: str) -> bool:
+        if self.method and self.method != method:
+            return False
+        return self.path is None or path.rstrip("/") == self.path
+
+
+# Cost in the shared "api" bucket; unlisted routes cost 1
+ROUTE_COSTS: Dict[Tuple[str, str], float] = {
+    ("POST", "/api/v1/auth/sign-in"): 10,  # Argon2 verify
+    ("POST", "/api/v1/auth/send-otp"): 10,  # outbound email
+    ("POST", "/api/v1/projects"): 20,  # multi-file upload
+}
+
+RATE_LIMIT_RULES: List[RateLimitRule] = [
+    RateLimitRule("api", settings.rate_limit_capacity, settings.rate_limit_period, scope="user"),
+    RateLimitRule("sign-in", 10, 60, method="POST", path="/api/v1/auth/sign-in"),
+    RateLimitRule("send-otp", 3, 300, method="POST", path="/api/v1/auth/send-otp"),
+    RateLimitRule("create-project", 20, 3600, scope="user", method="POST", path="/api/v1/projects"),
+]
+
+
+def _bearer_key(headers: Headers) -> Optional[str]:
+    authorization = headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        # Keyed by token, not by its unverified claims, so a forged token
+        # cannot spend someone else's quota
+        return "t:" + hashlib.sha256(authorization[7:].encode()).hexdigest()[:24]
+    return None
+
+
+class RateLimitMiddleware:
+    """
+    ASGI token-bucket limiter backed by Redis.
+
+    The matching rules are charged all-or-nothing in one Lua call. A rejected
+    request gets 429 with ``Retry-After``. If Redis errors or misses
+    ``rate_limit_redis_timeout``, the request is charged against per-process
+    buckets instead, so limiting degrades rather than failing open or closed.
+    """
+
+    def __init__(self, app: ASGIApp, rules: Optional[List[RateLimitRule]] = None) -> None:
+        self.app = app
+        self.rules = RATE_LIMIT_RULES if rules is None else rules
+        self.local = LocalTokenBuckets()
+        self.fallbacks = 0
+
+    def _specs(self, scope: Scope) -> List[BucketSpec]:
+        method, path = scope["method"], scope["path"].rstrip("/")
+        headers = Headers(scope=scope)
+        ip_key = "ip:" + client_ip(headers, scope["client"][0] if scope.get("client") else None)
+        token_key = _bearer_key(headers)
+        route_cost = ROUTE_COSTS.get((method, path), 1)
+
+        specs = []
+        for rule in self.rules:
+            if not rule.matches(method, path):
+                continue
+            cost = route_cost if rule.path is None else 1
+            if rule.scope == "user" and token_key:
+                buckets = [
+                    (f"{rule.name}:{token_key}", 1),
+                    (f"{rule.name}-tokens:{ip_key}", settings.rate_limit_ip_factor),
+                ]
+            else:
+                buckets = [(f"{rule.name}:{ip_key}", 1)]
+            specs += [
+                BucketSpec(
+                    key=KEY_PREFIX + key,
+                    capacity=rule.capacity * scale,
+                    rate=rule.rate * scale,
+                    cost=cost,
+                )
+                for key, scale in buckets
+            ]
+        return specs
+
+    async def _take(self, specs: List[BucketSpec]) -> Tuple[bool, float]:
+        args: list = [time.time()]
+        for spec in specs:
+            args += [spec.capacity, spec.rate, spec.cost]
+        try:
+            allowed, retry_after = await asyncio.wait_for(
+                _token_bucket(keys=[spec.key for spec in specs], args=args),
+                settings.rate_limit_redis_timeout,
+            )
+            return bool(int(allowed)), float(retry_after)
+        except Exception as e:
+            self.fallbacks += 1
+            logger.warning(f"[RateLimit] Redis unavailable, using local buckets: {e!r}")
+            return self.local.take(specs)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or not settings.rate_limit_enabled
+            or scope["path"].rstrip("/") in EXEMPT_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        specs = self._specs(scope)
+        allowed, retry_after = await self._take(specs) if specs else (True, 0.0)
+        if allowed:
+            await self.app(scope, receive, send)
+            return
+
+        retry_after_header = str(max(math.ceil(retry_after), 1))
+        body = json.dumps(
+            {
+                "success": False,
+                "statusCode": 429,
+                "message": "Too many requests, please try again later",
+            }
+        ).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", retry_after_header.encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
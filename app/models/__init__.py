@@ -3,10 +3,12 @@ from .building_project import BuildingProject
 from .core import Role, RolePermission, Permission
 
 # from .financial_tracking import ProjectPayment
-from .plans import Plan, Package
+from .plans import Plan, Package, ExpirationReminder
 from .project_members import ProjectMember
 from .media_upload import ProjectUpload, ReportUpload
 from .project_milestone import MilestoneStatus
 from .project_report import ProjectReport
-from .payments import Invoice, Transaction
-from .chat import ChatMessage
+from .payments import Invoice, Transaction, WebhookEvent
+from .chat import ChatMessage, ChatReadCursor
+from .email_outbox import EmailOutbox
+from .analytics import AnalyticsSummary
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
+from .base_model import BaseModel
+
+
+class AnalyticsSummary(BaseModel):
+    """
+    Precomputed dashboard counters. ``scope`` is ``"global"`` or
+    ``"project:<project_id>"``; ``refreshed_at`` is when ``metrics`` was computed.
+    """
+
+    scope = Column(String(64), nullable=False, unique=True)
+    metrics = Column(JSONB, nullable=False, default=dict)
+    refreshed_at = Column(DateTime(timezone=True), nullable=False)
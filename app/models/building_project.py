@@ -14,6 +14,7 @@ from sqlalchemy import (
     ForeignKey,
     ARRAY,
     Integer,
+    Index,
 )
 from sqlalchemy.types import Enum  # <-- rename Enum
 from datetime import datetime, date
@@ -68,4 +69,11 @@ class BuildingProject(BaseModel):
             "preferred_inspection_days <@ ARRAY['Monday','Tuesday','Wednesday','Thursday','Friday','Saturday','Sunday']::varchar[]",
             name="check_inspection_days",
         ),
+        # Owner's project list, optionally by status, newest first
+        Index(
+            "ix_buildingproject_owner_id_status_created_at",
+            "owner_id",
+            "status",
+            "created_at",
+        ),
     )
@@ -1,4 +1,14 @@
-from sqlalchemy import Column, UUID, Text, Boolean, ForeignKey, String
+from sqlalchemy import (
+    Column,
+    UUID,
+    Text,
+    Boolean,
+    ForeignKey,
+    String,
+    Index,
+    DateTime,
+    UniqueConstraint,
+)
 from .base_model import BaseModel
 
 
@@ -19,3 +29,36 @@ class ChatMessage(BaseModel):
     # "text" | "image" | "file" — extend as needed
     message_type = Column(String(20), nullable=False, server_default="text")
     is_read = Column(Boolean, default=False, nullable=False)
+
+    __table_args__ = (
+        # Keyset pagination over (created_at, id) within a project
+        Index(
+            "ix_chatmessage_project_id_created_at_id",
+            "project_id",
+            "created_at",
+            "id",
+        ),
+    )
+
+
+class ChatReadCursor(BaseModel):
+    """How far a user has read a project's chat; everything after it is unread."""
+
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("user.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    project_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("buildingproject.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    last_read_at = Column(DateTime(timezone=True), nullable=False)
+    last_read_message_id = Column(UUID(as_uuid=True), nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "project_id", name="uq_chatreadcursor_user_project"),
+    )
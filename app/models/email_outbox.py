@@ -0,0 +1,42 @@
+from sqlalchemy import (
+    Column,
+    String,
+    Integer,
+    Text,
+    DateTime,
+    Index,
+    CheckConstraint,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from .base_model import BaseModel
+
+
+class EmailOutbox(BaseModel):
+    """
+    Transactional emails waiting to be sent. Rows are added in the same
+    transaction as the change that triggers them and drained by Celery.
+    """
+
+    subject = Column(String(255), nullable=False)
+    template_name = Column(String(100), nullable=False)
+    context = Column(JSONB, nullable=False, default=dict)
+
+    # Sent together as one message (one SendGrid personalization)
+    recipients = Column(JSONB, nullable=False)
+
+    status = Column(String(10), nullable=False, default="PENDING")
+    # PENDING | SENDING | SENT | FAILED | DEAD
+
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=True)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_emailoutbox_status_next_attempt_at", "status", "next_attempt_at"),
+        CheckConstraint(
+            "status IN ('PENDING', 'SENDING', 'SENT', 'FAILED', 'DEAD')",
+            name="check_emailoutbox_status",
+        ),
+    )
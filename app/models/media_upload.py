@@ -10,6 +10,8 @@ from sqlalchemy import (
     UUID,
     Float,
     ForeignKey,
+    Index,
+    text,
 )
 from sqlalchemy.types import Enum  # <-- rename Enum
 from datetime import datetime
@@ -27,6 +29,11 @@ class ProjectUpload(BaseModel):
     file_type = Column(String(50))  # image, document, etc.
     uploaded_at = Column(DateTime(timezone=True), default=datetime.utcnow)
 
+    __table_args__ = (
+        # First images of each project in the project list
+        Index("ix_projectupload_project_id_uploaded_at", "project_id", "uploaded_at"),
+    )
+
 
 class ReportUpload(BaseModel):
     report_id = Column(
@@ -38,3 +45,13 @@ class ReportUpload(BaseModel):
     file_url = Column(String(500), nullable=False)
     file_type = Column(String(50))
     uploaded_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+
+    __table_args__ = (
+        # Cover image per report in the report listing
+        Index(
+            "ix_reportupload_report_id_uploaded_at_image",
+            "report_id",
+            "uploaded_at",
+            postgresql_where=text("file_type = 'image'"),
+        ),
+    )
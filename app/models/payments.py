@@ -14,6 +14,8 @@ from sqlalchemy import (
     UUID,
     CheckConstraint,
     Date,
+    Index,
+    Text,
 )
 
 
@@ -145,3 +147,35 @@ class Transaction(BaseModel):
             name="check_transaction_currency",
         ),
     )
+
+
+class WebhookEvent(BaseModel):
+    """
+    Append-only ledger of payment provider webhooks. One row per provider event;
+    the unique (provider, event_id) pair makes redelivered events a no-op.
+    """
+
+    provider = Column(String(20), nullable=False)
+
+    # Provider event id (Stripe ``evt_...``; Paystack ``<event>:<data.id>``)
+    event_id = Column(String(200), nullable=False)
+    event_type = Column(String(100), nullable=False)
+    payload = Column(JSONB, nullable=False)
+
+    status = Column(String(15), nullable=False, default="RECEIVED")
+    # RECEIVED | PROCESSING | PROCESSED | FAILED | DEAD
+
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=True)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("provider", "event_id", name="uq_webhookevent_provider_event_id"),
+        Index("ix_webhookevent_status_next_attempt_at", "status", "next_attempt_at"),
+        CheckConstraint(
+            "status IN ('RECEIVED', 'PROCESSING', 'PROCESSED', 'FAILED', 'DEAD')",
+            name="check_webhookevent_status",
+        ),
+    )
@@ -11,6 +11,9 @@ from sqlalchemy import (
     UUID,
     CheckConstraint,
     Date,
+    UniqueConstraint,
+    Index,
+    text,
 )
 from .base_model import BaseModel
 
@@ -65,6 +68,16 @@ class PlanPackageUsageCount(BaseModel):
     package_tag = Column(String(50), nullable=False)
     usage_count = Column(Integer(), nullable=False, default=0)
 
+    __table_args__ = (
+        # Usage lookups by (project, tag); covering, so the sum never reads the heap
+        Index(
+            "ix_planpackageusagecount_project_id_package_tag",
+            "project_id",
+            "package_tag",
+            postgresql_include=["usage_count"],
+        ),
+    )
+
 
 class PaymentHistory(BaseModel):
     project_id = Column(
@@ -100,4 +113,40 @@ class PaymentHistory(BaseModel):
             name="check_status",
         ),
         CheckConstraint("currency IN ('NGN', 'USD')", name="check_currency"),
+        # Payment history keyset pages: newest updated_at, id first
+        Index(
+            "ix_paymenthistory_project_id_updated_at_id",
+            "project_id",
+            "updated_at",
+            "id",
+        ),
+        # Analytics refresh: project payments changed since the last run
+        Index(
+            "ix_paymenthistory_updated_at",
+            "updated_at",
+            postgresql_where=text("project_id IS NOT NULL"),
+        ),
+    )
+
+
+class ExpirationReminder(BaseModel):
+    """One row per expiry reminder sent; reruns skip reminders already recorded."""
+
+    project_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("buildingproject.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    expiry_date = Column(Date, nullable=False)
+    days_left = Column(Integer, nullable=False)
+    email = Column(String(255), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "project_id",
+            "expiry_date",
+            "days_left",
+            name="uq_expirationreminder_project_expiry_days_left",
+        ),
     )
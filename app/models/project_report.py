@@ -13,6 +13,7 @@ from sqlalchemy import (
     Integer,
     Date,
     ARRAY,
+    Index,
 )
 from sqlalchemy.types import Enum  # <-- rename Enum
 from datetime import datetime
@@ -43,3 +44,10 @@ class ProjectReport(BaseModel):
         nullable=False,
         index=True,
     )
+
+    __table_args__ = (
+        # Report listing and recent reports, newest report_date first
+        Index("ix_projectreport_project_id_report_date", "project_id", "report_date"),
+        # Analytics refresh: reports changed since the last run
+        Index("ix_projectreport_updated_at", "updated_at"),
+    )
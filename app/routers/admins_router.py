@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from dependencies.auth import get_current_user
 from services.projects import ProjectSetupService
+from services.webhook_service import WebhookService
 from utils.db_setup import get_database
 from utils.loggers import setup_logger
 
@@ -18,6 +19,12 @@ def get_project_service(
     return ProjectSetupService(db=db)
 
 
+def get_webhook_service(
+    db: AsyncSession = Depends(get_database),
+) -> WebhookService:
+    return WebhookService(db=db)
+
+
 @router.get("/all-projects")
 async def get_all_project(
     page: int = Query(1, ge=1),
@@ -106,6 +113,26 @@ async def get_all_project_analytics(
         )
 
 
+@router.post("/project/analytics/rebuild")
+async def rebuild_project_analytics(
+    current_user: dict = Depends(get_current_user),
+    project_service: ProjectSetupService = Depends(get_project_service),
+):
+    user_id = str(current_user.get("id"))
+    logger.info(f"admin rebuild_project_analytics user_id={user_id}")
+    try:
+        return await project_service.rebuild_analytics(user_id=user_id)
+    except HTTPException as e:
+        logger.error(f"admin rebuild_project_analytics HTTP error: {e.detail}")
+        raise e
+    except Exception as e:
+        logger.exception(f"admin rebuild_project_analytics failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Something went wrong: {e}",
+        )
+
+
 @router.put("/project/{project_id}/update-status")
 async def update_project_status(
     project_id: str,
@@ -132,3 +159,48 @@ async def update_project_status(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Something went wrong: {e}",
         )
+
+
+@router.get("/webhook-events/dead")
+async def get_dead_webhook_events(
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: dict = Depends(get_current_user),
+    webhook_service: WebhookService = Depends(get_webhook_service),
+):
+    user_id = str(current_user.get("id"))
+    logger.info(f"admin get_dead_webhook_events user_id={user_id} page={page} limit={limit}")
+    try:
+        return await webhook_service.get_dead_letters(
+            user_id=user_id, page=page, limit=limit
+        )
+    except HTTPException as e:
+        logger.error(f"admin get_dead_webhook_events HTTP error: {e.detail}")
+        raise e
+    except Exception as e:
+        logger.exception(f"admin get_dead_webhook_events failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Something went wrong: {e}",
+        )
+
+
+@router.post("/webhook-events/{event_id}/requeue")
+async def requeue_webhook_event(
+    event_id: str,
+    current_user: dict = Depends(get_current_user),
+    webhook_service: WebhookService = Depends(get_webhook_service),
+):
+    user_id = str(current_user.get("id"))
+    logger.info(f"admin requeue_webhook_event user_id={user_id} event_id={event_id}")
+    try:
+        return await webhook_service.requeue(user_id=user_id, row_id=event_id)
+    except HTTPException as e:
+        logger.error(f"admin requeue_webhook_event HTTP error: {e.detail}")
+        raise e
+    except Exception as e:
+        logger.exception(f"admin requeue_webhook_event failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Something went wrong: {e}",
+        )
@@ -2,7 +2,6 @@ from typing import Literal
 from fastapi import (
     APIRouter,
     Depends,
-    BackgroundTasks,
     Query,
     status,
     UploadFile,
@@ -108,7 +107,6 @@ async def email_verification(
 @router.post("/send-otp")
 async def send_otp_pin(
     request_data: SendOTPRequest,  # Email is now in the body, safer for logs
-    background_tasks: BackgroundTasks,
     auth_service: AuthService = Depends(get_auth_service),
 ):
     try:
@@ -116,7 +114,6 @@ async def send_otp_pin(
         return await auth_service.process_otp_request(
             email=request_data.email,
             email_type=request_data.email_type,
-            background_task=background_tasks,
         )
     except HTTPException as e:
         logger.error(f"HTTP Exception: {e.detail}")
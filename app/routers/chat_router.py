@@ -8,19 +8,18 @@ from typing import Optional
 import jwt
 from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
 from jwt.exceptions import ExpiredSignatureError, PyJWTError
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from dependencies.auth import get_current_user
-from models.building_project import BuildingProject
-from models.project_members import ProjectMember
 from models.users import User
+from services.access_service import AccessService
 from schemas.chat_schema import ChatHistoryResponse, SendMessageDTO, UnreadCountResponse
+from services.chat_ingest import chat_ingest
 from services.chat_service import ChatService, _channel
 from settings import get_settings
 from utils.db_setup import AsyncSessionLocal, get_database
 from utils.loggers import setup_logger
-from utils.redis_client import redis_client
+from utils.pubsub_hub import chat_hub
 
 router = APIRouter(prefix="/chat")
 settings = get_settings()
@@ -58,18 +57,26 @@ async def get_messages(
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
     before: Optional[datetime] = Query(
-        None, description="Cursor: fetch messages created before this ISO timestamp"
+        None, description="Fetch messages created before this ISO timestamp"
+    ),
+    cursor: Optional[str] = Query(
+        None, description="Opaque cursor from meta_data.next_cursor of the previous page"
+    ),
+    include_total: bool = Query(
+        False, description="Also count every message in the project (slower)"
     ),
     chat_service: ChatService = Depends(get_chat_service),
     current_user: dict = Depends(get_current_user),
 ):
-    """Paginated message history for a project chat."""
+    """Paginated message history for a project chat (newest first)."""
     return await chat_service.get_project_messages(
         project_id=project_id,
         user_id=str(current_user["id"]),
         page=page,
         limit=limit,
         before=before,
+        cursor=cursor,
+        include_total=include_total,
     )
 
 
@@ -86,6 +93,15 @@ async def mark_as_read(
     )
 
 
+@router.get("/unread")
+async def unread_counts(
+    chat_service: ChatService = Depends(get_chat_service),
+    current_user: dict = Depends(get_current_user),
+):
+    """Unread message counts for every project chat the current user takes part in."""
+    return await chat_service.get_all_unread_counts(user_id=str(current_user["id"]))
+
+
 @router.get("/{project_id}/messages/unread")
 async def unread_count(
     project_id: str,
@@ -136,23 +152,12 @@ async def _assert_ws_participant(
     project_id: str, user_id: str, db: AsyncSession
 ) -> None:
     """Close connection if user is not the project owner or an active member."""
-    project = await db.scalar(
-        select(BuildingProject).where(BuildingProject.id == project_id)
-    )
-    if not project:
+    access = await AccessService(db).resolve(user_id, project_id)
+    if not access.project_exists:
         raise WebSocketDisconnect(code=4004, reason="Project not found")
 
-    is_owner = str(project.owner_id) == user_id
-    if not is_owner:
-        member = await db.scalar(
-            select(ProjectMember).where(
-                ProjectMember.project_id == project_id,
-                ProjectMember.user_id == user_id,
-                ProjectMember.is_active.is_(True),
-            )
-        )
-        if not member:
-            raise WebSocketDisconnect(code=4003, reason="Forbidden")
+    if not access.is_participant:
+        raise WebSocketDisconnect(code=4003, reason="Forbidden")
 
 
 # ---------------------------------------------------------------------------
@@ -165,11 +170,19 @@ async def chat_websocket(
     websocket: WebSocket,
     project_id: str,
     token: str = Query(..., description="JWT access token"),
+    since: Optional[str] = Query(
+        None, description="Cursor of the last message the client has; missed messages are replayed"
+    ),
 ):
     """
-    Real-time chat via WebSocket + Redis Pub/Sub.
+    Real-time chat via WebSocket + Redis Pub/Sub, fanned out by the per-process
+    ``chat_hub`` (one Redis subscription per active project, not per socket).
 
-    Connect: `ws://<host>/api/v1/chat/{project_id}/ws?token=<JWT>`
+    Connect: `ws://<host>/api/v1/chat/{project_id}/ws?token=<JWT>[&since=<cursor>]`
+
+    With `since`, messages created after that cursor are sent first (oldest
+    first, capped); if more were missed, a `{"event": "replay_truncated"}` frame
+    follows and the client should page the gap over HTTP.
 
     Incoming frame (JSON):
         { "content": "Hello!", "message_type": "text" }
@@ -196,12 +209,29 @@ async def chat_websocket(
             await websocket.close(code=exc.code, reason=exc.reason)
             return
 
-    channel = _channel(project_id)
-    pubsub = redis_client.pubsub()
-    await pubsub.subscribe(channel)
+    subscriber = await chat_hub.join(_channel(project_id), websocket)
+
+    # Replay after joining so nothing published meanwhile is lost; live messages
+    # queue up until subscriber.run() starts and replayed ids are skipped there.
+    if since:
+        try:
+            async with AsyncSessionLocal() as db:
+                missed, truncated = await ChatService(db=db).get_messages_since(
+                    project_id, since
+                )
+        except HTTPException as exc:
+            await chat_hub.leave(subscriber)
+            await websocket.close(code=4400, reason=exc.detail)
+            return
+
+        for payload in missed:
+            await websocket.send_json(payload)
+        subscriber.skip(payload["id"] for payload in missed)
+        if truncated:
+            await websocket.send_json({"event": "replay_truncated"})
 
     async def _receive_from_client() -> None:
-        """Read frames from the WebSocket, persist and publish to Redis."""
+        """Read frames from the WebSocket and hand them to the batched ingest stage."""
         try:
             while True:
                 raw = await websocket.receive_text()
@@ -220,37 +250,34 @@ async def chat_websocket(
                 if message_type not in ("text", "image", "file"):
                     message_type = "text"
 
-                async with AsyncSessionLocal() as db:
-                    chat_svc = ChatService(db=db)
-                    await chat_svc.handle_ws_message(
+                try:
+                    await chat_ingest.submit(
                         project_id=project_id,
-                        sender_id=current_user["id"],
+                        sender=current_user,
                         content=content,
                         message_type=message_type,
                     )
+                except Exception:
+                    await websocket.send_json({"error": "Message not saved"})
         except WebSocketDisconnect:
             pass
 
-    async def _broadcast_from_redis() -> None:
-        """Forward Redis Pub/Sub messages to the WebSocket client."""
-        try:
-            async for message in pubsub.listen():
-                if message["type"] == "message":
-                    await websocket.send_text(message["data"])
-        except Exception:
-            pass
-
+    receiver = asyncio.create_task(_receive_from_client())
+    sender = asyncio.create_task(subscriber.run())
     try:
-        await asyncio.gather(
-            _receive_from_client(),
-            _broadcast_from_redis(),
-            return_exceptions=False,
+        # Either side ending (client gone, or evicted as a slow consumer) ends both
+        done, _ = await asyncio.wait(
+            {receiver, sender}, return_when=asyncio.FIRST_COMPLETED
         )
+        for task in done:
+            if task.exception():
+                raise task.exception()
     except Exception as exc:
         logger.warning(f"WS session ended for project {project_id}: {exc}")
     finally:
-        await pubsub.unsubscribe(channel)
-        await pubsub.aclose()
+        receiver.cancel()
+        sender.cancel()
+        await chat_hub.leave(subscriber)
         try:
             await websocket.close()
         except Exception:
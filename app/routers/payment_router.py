@@ -14,6 +14,7 @@ from fastapi import (
 from httpx import _status_codes
 import hmac, hashlib
 from services.payment_services import PaymentService
+from services.webhook_service import WebhookService
 from utils.db_setup import get_database
 from sqlalchemy.ext.asyncio import AsyncSession
 from utils.db_setup import get_database
@@ -35,6 +36,10 @@ def get_payment_service(db: AsyncSession = Depends(get_database)) -> PaymentServ
     return PaymentService(db=db)
 
 
+def get_webhook_service(db: AsyncSession = Depends(get_database)) -> WebhookService:
+    return WebhookService(db=db)
+
+
 def get_plan_service(db: AsyncSession = Depends(get_database)) -> PaymentService:
     return PlansService(db=db)
 
@@ -57,7 +62,7 @@ async def roles(
 @router.post("/paystack/webhook-events")
 async def paystack_webhook_event(
     request: Request,
-    payment_service: PaymentService = Depends(get_payment_service),
+    webhook_service: WebhookService = Depends(get_webhook_service),
 ):
     # 1. Get the raw bytes from the request (required for HMAC)
     body_bytes = await request.body()
@@ -84,16 +89,15 @@ async def paystack_webhook_event(
     # event: str = payload.get("event")
     # data: dict = payload.get("data", {})
 
-    await payment_service.payment_webhook(payload, "PAYSTACK")
-
-    # Your logic here...
+    # Processed by the Celery workers; acknowledge as soon as it is recorded
+    await webhook_service.record("PAYSTACK", payload)
     return {"status": "success"}
 
 
 @router.post("/stripe/webhook-events")
 async def stripe_webhook_event(
     request: Request,
-    payment_service: PaymentService = Depends(get_payment_service),
+    webhook_service: WebhookService = Depends(get_webhook_service),
 ):
     body_bytes = await request.body()
     sig_header = request.headers.get("stripe-signature")
@@ -119,7 +123,8 @@ async def stripe_webhook_event(
             status_code=status.HTTP_400_BAD_REQUEST,
         )
 
-    await payment_service.payment_webhook(dict(event), "STRIPE")
+    # Record exactly what signature verification accepted
+    await webhook_service.record("STRIPE", event.to_dict())
     return {"status": "success"}
 
 
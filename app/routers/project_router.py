@@ -1,4 +1,3 @@
-import asyncio
 import json
 from fastapi import (
     APIRouter,
@@ -27,11 +26,12 @@ from utils.db_setup import get_database
 from sqlalchemy.ext.asyncio import AsyncSession
 from utils.db_setup import get_database
 from dependencies.auth import get_current_user
-from utils.file_upload import upload_file_optimized
+from utils.file_upload import upload_files_bounded
 from typing import List, Optional, Literal
 from datetime import datetime, timezone
 from uuid import UUID
 from utils.loggers import setup_logger
+from utils.query_stats import query_budget
 from services.cloudinary_service import get_cloudinary, CloudinaryService
 
 router = APIRouter(prefix="/projects")
@@ -121,18 +121,13 @@ async def create_project(
                 detail=f"Invalid Payload -> {e}",
             )
 
-        # Upload all images concurrently
-        uploaded_image_urls = await asyncio.gather(
-            *(
-                upload_file_optimized(
-                    img,
-                    "project_image",
-                    str(current_user.get("id")),
-                    current_user,
-                    "PROJECT",
-                )
-                for img in images
-            )
+        # Upload images with bounded concurrency
+        uploaded_image_urls = await upload_files_bounded(
+            images,
+            "project_image",
+            str(current_user.get("id")),
+            current_user,
+            "PROJECT",
         )
 
         # Combine project data with uploaded image URLs
@@ -535,17 +530,21 @@ async def update_report_status(
 @router.get(
     "/{project_id}/payment/history", description="This shows the list of all payments"
 )
+@query_budget(6)  # user + access lookups on a cold cache, then one page query
 async def get_subscriptions(
     project_id: str,
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(
+        None, description="Opaque cursor from meta_data.next_cursor of the previous page"
+    ),
     project_service: ProjectSetupService = Depends(get_project_service),
     current_user: dict = Depends(get_current_user),
 ):
     try:
         user_id = str(current_user.get("id"))
         response = await project_service.payments_history(
-            project_id, user_id, page, limit
+            project_id, user_id, page, limit, cursor=cursor
         )
         # Get all subscription payments:
         return response
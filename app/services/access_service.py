@@ -0,0 +1,143 @@
+from dataclasses import dataclass
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.building_project import BuildingProject
+from models.project_members import ProjectMember
+from models.users import User
+from utils.loggers import setup_logger
+
+logger = setup_logger("Access_Service")
+
+SUPER_ADMIN = "SUPER_ADMIN"
+INSPECTOR = "INSPECTOR"
+
+# Keys under ``AsyncSession.info``; the session lives exactly as long as the request.
+_ACCESS_MEMO = "project_access"
+_ROLE_MEMO = "user_roles"
+
+
+@dataclass(frozen=True)
+class ProjectAccess:
+    """Everything the services need to authorize a (user, project) pair."""
+
+    user_id: str
+    project_id: str
+    role: Optional[str] = None
+    project_exists: bool = False
+    is_owner: bool = False
+    is_member: bool = False
+    plan_id: Optional[UUID] = None
+    payment_status: Optional[str] = None
+
+    @property
+    def is_system_admin(self) -> bool:
+        return self.role == SUPER_ADMIN
+
+    @property
+    def is_inspector(self) -> bool:
+        return self.role == INSPECTOR
+
+    @property
+    def has_project_permission(self) -> bool:
+        """Same rule as ``PermissionService.has_project_permission``."""
+        return self.is_system_admin or self.is_inspector
+
+    @property
+    def can_view(self) -> bool:
+        return self.is_system_admin or self.is_owner or self.is_member
+
+    @property
+    def is_participant(self) -> bool:
+        return self.is_owner or self.is_member
+
+
+class AccessService:
+    """
+    Resolves role, ownership, active membership and the project's plan for a
+    (user, project) pair in one SQL round-trip. Results are memoized on the
+    session, so every service built on the same request session shares them.
+    """
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+
+    def _memo(self, name: str) -> dict:
+        return self.db.info.setdefault(name, {})
+
+    @staticmethod
+    def _access_stmt(user_id: str, project_id: str):
+        is_member = (
+            exists()
+            .where(
+                ProjectMember.project_id == BuildingProject.id,
+                ProjectMember.user_id == User.id,
+                ProjectMember.is_active.is_(True),
+            )
+            .correlate_except(ProjectMember)
+        )
+
+        return (
+            select(
+                User.role,
+                BuildingProject.id.label("project_id"),
+                BuildingProject.owner_id,
+                BuildingProject.plan_id,
+                BuildingProject.payment_status,
+                is_member.label("is_member"),
+            )
+            .select_from(User)
+            .outerjoin(BuildingProject, BuildingProject.id == project_id)
+            .where(User.id == user_id)
+        )
+
+    async def resolve(self, user_id: str, project_id: str) -> ProjectAccess:
+        key = (str(user_id), str(project_id))
+        memo = self._memo(_ACCESS_MEMO)
+        if key in memo:
+            return memo[key]
+
+        row = (await self.db.execute(self._access_stmt(*key))).first()
+
+        if row is None:
+            # Unknown user: no role, nothing visible
+            access = ProjectAccess(user_id=key[0], project_id=key[1])
+        else:
+            project_exists = row.project_id is not None
+            access = ProjectAccess(
+                user_id=key[0],
+                project_id=key[1],
+                role=row.role,
+                project_exists=project_exists,
+                is_owner=project_exists and str(row.owner_id) == key[0],
+                is_member=bool(row.is_member) if project_exists else False,
+                plan_id=row.plan_id,
+                payment_status=row.payment_status,
+            )
+
+        memo[key] = access
+        self._memo(_ROLE_MEMO)[key[0]] = access.role
+        logger.debug(f"[Access] Resolved user={key[0]} project={key[1]}: {access}")
+        return access
+
+    async def user_role(self, user_id: str) -> Optional[str]:
+        user_id = str(user_id)
+        memo = self._memo(_ROLE_MEMO)
+        if user_id not in memo:
+            memo[user_id] = await self.db.scalar(
+                select(User.role).where(User.id == user_id)
+            )
+        return memo[user_id]
+
+    def forget(self, project_id: Optional[str] = None) -> None:
+        """Drop memoized access (all, or for one project) after a write that changes it."""
+        memo = self._memo(_ACCESS_MEMO)
+        if project_id is None:
+            memo.clear()
+            return
+
+        for key in [k for k in memo if k[1] == str(project_id)]:
+            del memo[key]
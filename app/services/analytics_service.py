@@ -0,0 +1,243 @@
+import asyncio
+import uuid
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import case, func, select, union
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.analytics import AnalyticsSummary
+from models.building_project import BuildingProject
+from models.plans import PaymentHistory
+from models.project_report import ProjectReport
+from utils.db_routing import replica_reads
+from utils.loggers import setup_logger
+
+logger = setup_logger("Analytics_Service")
+
+GLOBAL_SCOPE = "global"
+REBUILD_TASK = "rebuild_analytics_summary"
+
+
+def _project_scope(project_id) -> str:
+    return f"project:{project_id}"
+
+
+def _report_columns():
+    return (
+        func.count(ProjectReport.id).label("total"),
+        func.count(case((ProjectReport.approved == False, 1))).label("pending"),
+    )
+
+
+def _billing_columns():
+    return (
+        func.count(PaymentHistory.id).label("total"),
+        func.count(case((PaymentHistory.status.in_(["Active", "Paid"]), 1))).label("paid"),
+        func.count(case((PaymentHistory.status == "Pending", 1))).label("pending"),
+        func.count(
+            case((PaymentHistory.status.in_(["Overdue", "Expired"]), 1))
+        ).label("overdue"),
+        func.count(
+            case(
+                (
+                    (PaymentHistory.next_billing_date < date.today())
+                    & (PaymentHistory.status != "Paid"),
+                    1,
+                )
+            )
+        ).label("late_payments"),
+    )
+
+
+def _reports(row) -> dict:
+    return {"total": row.total if row else 0, "pending": row.pending if row else 0}
+
+
+def _billing(row) -> dict:
+    keys = ("total", "paid", "pending", "overdue", "late_payments")
+    return {key: getattr(row, key) if row else 0 for key in keys}
+
+
+async def request_analytics_rebuild() -> None:
+    from worker.celery_worker import celery
+
+    await asyncio.to_thread(celery.send_task, REBUILD_TASK)
+
+
+class AnalyticsService:
+    """
+    Admin dashboard counters served from ``AnalyticsSummary``.
+
+    Reads are a single-row lookup. A Celery job recomputes the global row and
+    the rows of projects whose reports or payments changed since the last
+    refresh. A nightly full rebuild repairs drift, such as deleted rows or
+    ``late_payments`` ageing with the date. A scope that has never been
+    computed is filled on first read.
+    """
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    async def _read(self, scope: str) -> Optional[AnalyticsSummary]:
+        return await self.db.scalar(
+            select(AnalyticsSummary).where(AnalyticsSummary.scope == scope)
+        )
+
+    @replica_reads
+    async def global_summary(self) -> dict:
+        summary = await self._read(GLOBAL_SCOPE)
+        if summary is None:
+            await self.refresh_global()
+            summary = await self._read(GLOBAL_SCOPE)
+        return {**summary.metrics, "refreshed_at": summary.refreshed_at}
+
+    @replica_reads
+    async def project_summary(self, project_id: str) -> dict:
+        summary = await self._read(_project_scope(project_id))
+        if summary is None:
+            await self.refresh_projects([project_id])
+            summary = await self._read(_project_scope(project_id))
+        return {**summary.metrics, "refreshed_at": summary.refreshed_at}
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+
+    async def _upsert(
+        self, metrics_by_scope: Dict[str, dict], refreshed_at: Optional[datetime] = None
+    ) -> None:
+        if not metrics_by_scope:
+            return
+        now = datetime.now(timezone.utc)
+        refreshed_at = refreshed_at or now
+        stmt = pg_insert(AnalyticsSummary).values(
+            [
+                {
+                    "id": uuid.uuid4(),
+                    "scope": scope,
+                    "metrics": metrics,
+                    "refreshed_at": refreshed_at,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for scope, metrics in metrics_by_scope.items()
+            ]
+        )
+        await self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[AnalyticsSummary.scope],
+                set_={
+                    "metrics": stmt.excluded.metrics,
+                    "refreshed_at": stmt.excluded.refreshed_at,
+                    "updated_at": stmt.excluded.updated_at,
+                },
+            )
+        )
+        await self.db.commit()
+
+    async def refresh_global(self, refreshed_at: Optional[datetime] = None) -> None:
+        projects = (
+            await self.db.execute(
+                select(
+                    func.count().label("total"),
+                    func.count(case((BuildingProject.status == "Active", 1))).label("active"),
+                    func.count(case((BuildingProject.status == "Completed", 1))).label("completed"),
+                    func.count(case((BuildingProject.status == "Pending", 1))).label("pending"),
+                    func.count(case((BuildingProject.status == "Draft", 1))).label("draft"),
+                )
+            )
+        ).first()
+        reports = (await self.db.execute(select(*_report_columns()))).first()
+        billing = (await self.db.execute(select(*_billing_columns()))).first()
+
+        await self._upsert(
+            {
+                GLOBAL_SCOPE: {
+                    "projects": {
+                        key: getattr(projects, key)
+                        for key in ("total", "active", "completed", "pending", "draft")
+                    },
+                    "reports": _reports(reports),
+                    "billing": _billing(billing),
+                }
+            },
+            refreshed_at,
+        )
+
+    async def refresh_projects(self, project_ids: Optional[Iterable] = None) -> int:
+        """Recompute per-project rows; ``None`` means every project. Returns rows written."""
+        report_stmt = select(ProjectReport.project_id, *_report_columns()).group_by(
+            ProjectReport.project_id
+        )
+        billing_stmt = select(PaymentHistory.project_id, *_billing_columns()).group_by(
+            PaymentHistory.project_id
+        )
+        project_stmt = select(BuildingProject.id)
+
+        if project_ids is not None:
+            project_ids = [str(pid) for pid in project_ids]
+            if not project_ids:
+                return 0
+            report_stmt = report_stmt.where(ProjectReport.project_id.in_(project_ids))
+            billing_stmt = billing_stmt.where(PaymentHistory.project_id.in_(project_ids))
+            project_stmt = project_stmt.where(BuildingProject.id.in_(project_ids))
+
+        reports = {row.project_id: row for row in (await self.db.execute(report_stmt)).all()}
+        billing = {row.project_id: row for row in (await self.db.execute(billing_stmt)).all()}
+        existing = (await self.db.scalars(project_stmt)).all()
+
+        metrics = {
+            _project_scope(pid): {
+                "project_id": str(pid),
+                "reports": _reports(reports.get(pid)),
+                "billing": _billing(billing.get(pid)),
+            }
+            for pid in existing
+        }
+        # Keep each statement well under the bind-parameter limit
+        items = list(metrics.items())
+        for start in range(0, len(items), 1000):
+            await self._upsert(dict(items[start:start + 1000]))
+        return len(metrics)
+
+    async def _changed_project_ids(self, since: datetime) -> List:
+        changed = union(
+            select(ProjectReport.project_id).where(ProjectReport.updated_at >= since),
+            select(PaymentHistory.project_id).where(
+                PaymentHistory.updated_at >= since,
+                PaymentHistory.project_id.is_not(None),
+            ),
+        )
+        return list((await self.db.scalars(changed)).all())
+
+    async def refresh(self, full: bool = False) -> dict:
+        """
+        Incremental refresh: the global row plus projects touched since the last
+        run. ``full`` recomputes every project (drift repair).
+        """
+        last = await self._read(GLOBAL_SCOPE)
+        started = datetime.now(timezone.utc)
+
+        if full or last is None:
+            projects = await self.refresh_projects(None)
+        else:
+            projects = await self.refresh_projects(
+                await self._changed_project_ids(last.refreshed_at)
+            )
+        # Stamp with the start time so the next run also re-reads anything
+        # that changed while this one was running
+        await self.refresh_global(refreshed_at=started)
+
+        stats = {
+            "full": full or last is None,
+            "projects": projects,
+            "seconds": round((datetime.now(timezone.utc) - started).total_seconds(), 3),
+        }
+        logger.info(f"[Analytics] Summary refreshed: {stats}")
+        return stats
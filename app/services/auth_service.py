@@ -1,17 +1,22 @@
-from fastapi import HTTPException, status, BackgroundTasks
+from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError
 from datetime import datetime, timezone, timedelta
 
 from models.users import User, EmailVerificationCodes
-from utils.security import get_password_hash, verify_password
+from utils.security import (
+    get_password_hash_async,
+    verify_and_update_password,
+    verify_password_async,
+)
 from utils.helpers import email_nomalizers, generate_otp_pin
 from utils.loggers import setup_logger
 from dependencies.auth import create_access_token
 from schemas.auth_schema import AuthResponse, UserResponse
-from services.email_service import get_email_service
+from services.email_outbox import kick_email_outbox, queue_email
 from constant.email_content import EMAIL_CONSTANT
+from utils.user_cache import user_cache
 
 logger = setup_logger("Auth_Service")
 
@@ -21,8 +26,6 @@ class AuthService:
 
     def __init__(self, database: AsyncSession):
         self.db = database
-        self.email_service = get_email_service()
-        # self.background_task = BackgroundTasks()
 
     # ------------------------------------------------------------------
     # SIGN UP
@@ -61,7 +64,7 @@ class AuthService:
                 user_data.update(
                     {
                         "email": email,
-                        "password": get_password_hash(user_data["password"]),
+                        "password": await get_password_hash_async(user_data["password"]),
                     }
                 )
 
@@ -101,7 +104,17 @@ class AuthService:
             result = await self.db.execute(select(User).where(User.email == email))
             user = result.scalar_one_or_none()
 
-            if not user or not verify_password(login_data["password"], user.password):
+            if not user:
+                logger.warning("Login failed | invalid credentials | %s", email)
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Authentication details not found",
+                )
+
+            valid, new_hash = await verify_and_update_password(
+                login_data["password"], user.password
+            )
+            if not valid:
                 logger.warning("Login failed | invalid credentials | %s", email)
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -115,6 +128,13 @@ class AuthService:
                     detail="Please verify your email before login",
                 )
 
+            # Stored hash uses outdated parameters; upgrade it transparently
+            if new_hash:
+                user.password = new_hash
+                await self.db.commit()
+                await self.db.refresh(user)
+                logger.info("Password hash upgraded | user_id=%s", user.id)
+
             logger.info("Login successful | user_id=%s", user.id)
             return AuthResponse(
                 access_token=create_access_token(str(user.id)),
@@ -165,8 +185,9 @@ class AuthService:
                     detail="User not found",
                 )
 
-            user.password = get_password_hash(data["password"])
+            user.password = await get_password_hash_async(data["password"])
             await self.db.commit()
+            await user_cache.invalidate(user.id)
 
             logger.info("Password reset successful | email=%s", email)
 
@@ -221,9 +242,7 @@ class AuthService:
     # ------------------------------------------------------------------
     # SEND OTP
     # ------------------------------------------------------------------
-    async def process_otp_request(
-        self, email: str, background_task: BackgroundTasks, email_type: str = "sign_up"
-    ):
+    async def process_otp_request(self, email: str, email_type: str = "sign_up"):
         logger.info("Sending OTP | email=%s", email)
 
         try:
@@ -248,22 +267,18 @@ class AuthService:
                     expires_at=expires_at,
                 )
             )
-            await self.db.commit()
 
             # -----EMAIL SENDING-----------
             email_types = EMAIL_CONSTANT.get(email_type, {})
-            subject = email_types.get("subject")
-            template = email_types.get("templates")
-            context = {"otp_code": otp}
-            recepient_email = [email]
-
-            background_task.add_task(
-                self.email_service.send_emails,
-                subject,
-                recepient_email,
-                template,
-                context,
+            queue_email(
+                self.db,
+                subject=email_types.get("subject"),
+                recipient=[email],
+                template_name=email_types.get("templates"),
+                context={"otp_code": otp},
             )
+            await self.db.commit()
+            await kick_email_outbox()
 
             logger.info("OTP sent successfully | email=%s", email)
 
@@ -289,14 +304,15 @@ class AuthService:
                     detail="User not found",
                 )
 
-            if not verify_password(data["old_password"], user.password):
+            if not await verify_password_async(data["old_password"], user.password):
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Invalid old password",
                 )
 
-            user.password = get_password_hash(data["new_password"])
+            user.password = await get_password_hash_async(data["new_password"])
             await self.db.commit()
+            await user_cache.invalidate(user_id)
 
             logger.info("Password reset successful | user_id=%s", user_id)
             return UserResponse.model_validate(user).model_dump()
@@ -339,6 +355,7 @@ class AuthService:
                     setattr(user, field, value)
 
             await self.db.commit()
+            await user_cache.invalidate(user_id)
 
             logger.info("Profile updated | user_id=%s", user_id)
             return UserResponse.model_validate(user).model_dump()
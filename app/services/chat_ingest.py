@@ -0,0 +1,195 @@
+import asyncio
+import json
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import List, Optional
+
+from sqlalchemy import insert
+
+from models.chat import ChatMessage
+from services.chat_service import ChatService, _channel
+from services.chat_unread_service import ChatUnreadService
+from settings import get_settings
+from utils.db_setup import AsyncSessionLocal
+from utils.loggers import setup_logger
+from utils.redis_client import redis_client
+
+settings = get_settings()
+logger = setup_logger("Chat_Ingest")
+
+
+@dataclass
+class _PendingMessage:
+    project_id: str
+    sender: dict
+    content: str
+    message_type: str
+    future: asyncio.Future = field(repr=False)
+
+
+class ChatIngestBatcher:
+    """
+    Write-batching stage for WebSocket chat messages.
+
+    Messages from every socket in the process are grouped into micro-batches of
+    at most ``chat_ingest_batch_size`` messages or ``chat_ingest_max_delay_ms``
+    of waiting. Each batch is one session, one multi-row ``INSERT ... RETURNING``
+    and one commit, then one pipelined publish to Redis. ``submit`` resolves
+    with the published payload once its batch is committed.
+    """
+
+    def __init__(self) -> None:
+        self.max_batch = settings.chat_ingest_batch_size
+        self.max_delay = settings.chat_ingest_max_delay_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.messages = 0
+        self._last_created_at: Optional[datetime] = None
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue(maxsize=settings.chat_ingest_queue_size)
+            self._worker = asyncio.create_task(self._run())
+        return self._queue
+
+    async def submit(
+        self, project_id: str, sender: dict, content: str, message_type: str = "text"
+    ) -> dict:
+        """
+        Persist and publish one message. ``sender`` is the profile resolved at the
+        WebSocket handshake (``id``, ``first_name``, ``last_name``, ``image_url``).
+        """
+        queue = self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await queue.put(_PendingMessage(project_id, sender, content, message_type, future))
+        return await future
+
+    async def _collect(self) -> List[_PendingMessage]:
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_delay
+
+        while len(batch) < self.max_batch:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            try:
+                payloads = await self._flush(batch)
+            except Exception as e:
+                logger.exception(f"[Ingest] Batch of {len(batch)} failed: {e}")
+                for item in batch:
+                    if not item.future.done():
+                        item.future.set_exception(e)
+            else:
+                for item, payload in zip(batch, payloads):
+                    if not item.future.done():
+                        item.future.set_result(payload)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _rows(self, batch: List[_PendingMessage]) -> List[dict]:
+        """
+        Insert rows for ``batch``. History and ``?since=`` replay order by
+        ``(created_at, id)``, so timestamps step by a microsecond per message
+        (and past the previous batch) to keep submission order.
+        """
+        start = datetime.now(timezone.utc)
+        if self._last_created_at is not None and start <= self._last_created_at:
+            start = self._last_created_at + timedelta(microseconds=1)
+        rows = []
+        for i, item in enumerate(batch):
+            created_at = start + timedelta(microseconds=i)
+            rows.append(
+                {
+                    "id": uuid.uuid4(),
+                    "project_id": item.project_id,
+                    "sender_id": item.sender["id"],
+                    "content": item.content,
+                    "message_type": item.message_type,
+                    "is_read": False,
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                }
+            )
+        self._last_created_at = rows[-1]["created_at"]
+        return rows
+
+    async def _flush(self, batch: List[_PendingMessage]) -> List[dict]:
+        rows = self._rows(batch)
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                insert(ChatMessage)
+                .values(rows)
+                .returning(
+                    ChatMessage.id,
+                    ChatMessage.project_id,
+                    ChatMessage.sender_id,
+                    ChatMessage.content,
+                    ChatMessage.message_type,
+                    ChatMessage.is_read,
+                    ChatMessage.created_at,
+                    ChatMessage.updated_at,
+                )
+            )
+            inserted = {row.id: row for row in result.all()}
+            await db.commit()
+
+            await ChatUnreadService(db).record_sent(
+                (item.project_id, item.sender["id"]) for item in batch
+            )
+
+        payloads = [
+            ChatService._serialize_message(
+                inserted[row["id"]], SimpleNamespace(**item.sender)
+            )
+            for row, item in zip(rows, batch)
+        ]
+
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for payload in payloads:
+                pipe.publish(_channel(payload["project_id"]), json.dumps(payload))
+            await pipe.execute()
+        except Exception as e:
+            # Already committed; clients catch up via history / ?since= replay
+            logger.error(f"[Ingest] Publish of {len(payloads)} messages failed: {e}")
+
+        self.batches += 1
+        self.messages += len(batch)
+        return payloads
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "messages": self.messages,
+            "avg_batch_size": round(self.messages / self.batches, 2) if self.batches else 0.0,
+            "queued": self._queue.qsize() if self._queue else 0,
+        }
+
+    async def aclose(self) -> None:
+        """Flush what is queued and stop the worker (app shutdown)."""
+        if self._worker is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=5)
+        except asyncio.TimeoutError:
+            logger.warning(f"[Ingest] Dropping {self._queue.qsize()} unsaved messages")
+        self._worker.cancel()
+        self._worker = None
+
+
+chat_ingest = ChatIngestBatcher()
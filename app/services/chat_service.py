@@ -6,15 +6,16 @@ from typing import Optional
 from uuid import UUID
 
 from fastapi import HTTPException, status
-from sqlalchemy import func, select, update
+from sqlalchemy import func, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from models.building_project import BuildingProject
 from models.chat import ChatMessage
-from models.project_members import ProjectMember
 from models.users import User
+from services.access_service import AccessService
+from services.chat_unread_service import ChatUnreadService
+from utils.db_routing import replica_reads
 from utils.loggers import setup_logger
-from utils.pagination import normalize_pagination
+from utils.pagination import decode_cursor, encode_cursor, normalize_pagination
 from utils.redis_client import redis_client
 
 logger = setup_logger("ChatService")
@@ -29,6 +30,7 @@ def _channel(project_id: str) -> str:
 class ChatService:
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.unread = ChatUnreadService(db)
 
     # ------------------------------------------------------------------
     # Access helpers
@@ -36,30 +38,18 @@ class ChatService:
 
     async def _assert_project_participant(self, project_id: str, user_id: str) -> None:
         """Raise 403 if the user is neither the project owner nor an active member."""
-        project = await self.db.scalar(
-            select(BuildingProject).where(BuildingProject.id == project_id)
-        )
-        if not project:
+        access = await AccessService(self.db).resolve(user_id, project_id)
+        if not access.project_exists:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Project not found",
             )
 
-        is_owner = str(project.owner_id) == user_id
-
-        if not is_owner:
-            member = await self.db.scalar(
-                select(ProjectMember).where(
-                    ProjectMember.project_id == project_id,
-                    ProjectMember.user_id == user_id,
-                    ProjectMember.is_active.is_(True),
-                )
+        if not access.is_participant:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You are not a participant of this project.",
             )
-            if not member:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="You are not a participant of this project.",
-                )
 
     # ------------------------------------------------------------------
     # HTTP: send message
@@ -85,6 +75,8 @@ class ChatService:
             await self.db.commit()
             await self.db.refresh(msg)
 
+            await self.unread.record_sent([(project_id, sender_id)])
+
             # fetch sender info
             sender = await self.db.get(User, sender_id)
 
@@ -109,6 +101,7 @@ class ChatService:
     # HTTP: get message history
     # ------------------------------------------------------------------
 
+    @replica_reads
     async def get_project_messages(
         self,
         project_id: str,
@@ -116,7 +109,17 @@ class ChatService:
         page: int = 1,
         limit: int = 20,
         before: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = False,
     ) -> dict:
+        """
+        Newest-first message history.
+
+        Pass ``meta_data.next_cursor`` back as ``cursor`` to fetch the next (older)
+        page; this is a keyset seek on ``(created_at, id)`` and costs the same at any
+        depth. ``page`` is only honoured when no cursor is given (legacy clients).
+        The exact ``total`` is counted only when ``include_total`` is set.
+        """
         await self._assert_project_participant(project_id, user_id)
 
         page, limit, offset = normalize_pagination(page, limit)
@@ -129,41 +132,86 @@ class ChatService:
         if before:
             stmt = stmt.where(ChatMessage.created_at < before)
 
-        stmt = stmt.order_by(ChatMessage.created_at.desc()).offset(offset).limit(limit)
+        if cursor:
+            created_at, message_id = self._decode_cursor(cursor)
+            stmt = stmt.where(
+                tuple_(ChatMessage.created_at, ChatMessage.id)
+                < tuple_(created_at, message_id)
+            )
+        elif offset:
+            stmt = stmt.offset(offset)
+
+        # One extra row tells us whether another page exists without counting
+        stmt = stmt.order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc()).limit(
+            limit + 1
+        )
         rows = (await self.db.execute(stmt)).all()
 
+        has_more = len(rows) > limit
+        rows = rows[:limit]
         messages = [self._serialize_message(msg, sender) for msg, sender in rows]
 
-        total = await self.db.scalar(
-            select(func.count())
-            .select_from(ChatMessage)
-            .where(ChatMessage.project_id == project_id)
-        )
+        # is_read is per user: own messages, and anything up to the user's read cursor
+        last_read_at = await self.unread.last_read_at(user_id, project_id)
+        for (msg, _), payload in zip(rows, messages):
+            payload["is_read"] = str(msg.sender_id) == str(user_id) or bool(
+                last_read_at and msg.created_at and msg.created_at <= last_read_at
+            )
+
+        meta_data = {
+            "page": page,
+            "limit": limit,
+            "has_more": has_more,
+            "next_cursor": messages[-1]["cursor"] if has_more else None,
+        }
+        if include_total:
+            meta_data["total"] = await self.db.scalar(
+                select(func.count())
+                .select_from(ChatMessage)
+                .where(ChatMessage.project_id == project_id)
+            )
 
         return {
-            "meta_data": {"page": page, "limit": limit, "total": total},
+            "meta_data": meta_data,
             "data": messages,
             "message": "Messages fetched successfully",
         }
 
+    async def get_messages_since(
+        self, project_id: str, cursor: str, limit: int = 200
+    ) -> tuple[list[dict], bool]:
+        """
+        Messages newer than ``cursor``, oldest first, for WebSocket replay after a
+        reconnect. Returns ``(messages, truncated)``; when truncated, the client
+        should page the rest over HTTP. Participation must already be checked.
+        """
+        created_at, message_id = self._decode_cursor(cursor)
+
+        stmt = (
+            select(ChatMessage, User)
+            .join(User, ChatMessage.sender_id == User.id)
+            .where(
+                ChatMessage.project_id == project_id,
+                tuple_(ChatMessage.created_at, ChatMessage.id)
+                > tuple_(created_at, message_id),
+            )
+            .order_by(ChatMessage.created_at.asc(), ChatMessage.id.asc())
+            .limit(limit + 1)
+        )
+        rows = (await self.db.execute(stmt)).all()
+
+        truncated = len(rows) > limit
+        return [self._serialize_message(msg, sender) for msg, sender in rows[:limit]], truncated
+
     # ------------------------------------------------------------------
     # HTTP: mark messages as read
     # ------------------------------------------------------------------
 
     async def mark_as_read(self, project_id: str, user_id: str) -> dict:
-        """Mark all messages in the project as read for the requesting user (messages NOT sent by them)."""
+        """Move the requesting user's read cursor to the latest message of the project."""
         await self._assert_project_participant(project_id, user_id)
 
-        await self.db.execute(
-            update(ChatMessage)
-            .where(
-                ChatMessage.project_id == project_id,
-                ChatMessage.sender_id != user_id,
-                ChatMessage.is_read.is_(False),
-            )
-            .values(is_read=True)
-        )
-        await self.db.commit()
+        await self.unread.mark_read(user_id, project_id)
         return {"data": None, "message": "Messages marked as read"}
 
     # ------------------------------------------------------------------
@@ -173,56 +221,47 @@ class ChatService:
     async def get_unread_count(self, project_id: str, user_id: str) -> dict:
         await self._assert_project_participant(project_id, user_id)
 
-        count = await self.db.scalar(
-            select(func.count())
-            .select_from(ChatMessage)
-            .where(
-                ChatMessage.project_id == project_id,
-                ChatMessage.sender_id != user_id,
-                ChatMessage.is_read.is_(False),
-            )
-        )
+        counts = await self.unread.unread_counts(user_id, [project_id])
         return {
-            "data": {"project_id": project_id, "unread_count": count or 0},
+            "data": {"project_id": project_id, "unread_count": counts.get(str(project_id), 0)},
             "message": "Unread count fetched successfully",
         }
 
-    # ------------------------------------------------------------------
-    # WebSocket: publish-only helper (called from router)
-    # ------------------------------------------------------------------
-
-    async def handle_ws_message(
-        self,
-        project_id: str,
-        sender_id: str,
-        content: str,
-        message_type: str = "text",
-    ) -> dict:
-        """Persist a message and publish it on the Redis channel. Returns the serialised payload."""
-        msg = ChatMessage(
-            project_id=project_id,
-            sender_id=sender_id,
-            content=content,
-            message_type=message_type,
-        )
-        self.db.add(msg)
-        await self.db.commit()
-        await self.db.refresh(msg)
-
-        sender = await self.db.get(User, sender_id)
-        payload = self._serialize_message(msg, sender)
-
-        await redis_client.publish(_channel(project_id), json.dumps(payload))
-        return payload
+    async def get_all_unread_counts(self, user_id: str) -> dict:
+        """Unread counts for every project the user owns or is an active member of."""
+        project_ids = await self.unread.user_project_ids(user_id)
+        counts = await self.unread.unread_counts(user_id, project_ids)
+        return {
+            "data": {
+                "projects": [
+                    {"project_id": pid, "unread_count": count}
+                    for pid, count in counts.items()
+                ],
+                "total_unread": sum(counts.values()),
+            },
+            "message": "Unread counts fetched successfully",
+        }
 
     # ------------------------------------------------------------------
     # Private helpers
     # ------------------------------------------------------------------
 
+    @staticmethod
+    def _decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+        try:
+            created_at, message_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            )
+        return created_at, UUID(message_id)
+
     @staticmethod
     def _serialize_message(msg: ChatMessage, sender: Optional[User]) -> dict:
         return {
             "id": str(msg.id),
+            "cursor": encode_cursor(msg.created_at, msg.id) if msg.created_at else None,
             "project_id": str(msg.project_id),
             "sender_id": str(msg.sender_id),
             "content": msg.content,
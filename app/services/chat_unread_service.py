@@ -0,0 +1,256 @@
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, func, or_, select, union
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.building_project import BuildingProject
+from models.chat import ChatMessage, ChatReadCursor
+from models.project_members import ProjectMember
+from settings import get_settings
+from utils.loggers import setup_logger
+from utils.redis_client import redis_client
+from utils.ttl_cache import TTLCache
+
+settings = get_settings()
+logger = setup_logger("Chat_Unread_Service")
+
+UNREAD_KEY_PREFIX = "chat:unread:"
+
+# Only bump counters that have been computed; a missing field is recomputed on read.
+_INCR_IF_PRESENT_LUA = """
+if redis.call('HEXISTS', KEYS[1], ARGV[1]) == 1 then
+    return redis.call('HINCRBY', KEYS[1], ARGV[1], ARGV[2])
+end
+return -1
+"""
+
+_incr_if_present = redis_client.register_script(_INCR_IF_PRESENT_LUA)
+
+# project_id -> set of participant user ids (owner + active members)
+_participants_cache = TTLCache(maxsize=4096, ttl=settings.chat_participants_ttl)
+
+
+def _unread_key(user_id: str) -> str:
+    return f"{UNREAD_KEY_PREFIX}{user_id}"
+
+
+class ChatUnreadService:
+    """
+    Per-(user, project) unread counts.
+
+    ``ChatReadCursor`` records how far each user has read. The counts are kept
+    in a Redis hash per user (``chat:unread:<user_id>`` → ``{project_id: n}``).
+    They are incremented for every other participant when a message is sent,
+    and reset when the user marks the chat read. A missing field is recomputed
+    from Postgres on read, and ``reconcile`` rewrites every cached hash from
+    Postgres.
+    """
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+
+    # ------------------------------------------------------------------
+    # Participants
+    # ------------------------------------------------------------------
+
+    async def participants(self, project_ids: Iterable[str]) -> Dict[str, Set[str]]:
+        project_ids = {str(pid) for pid in project_ids}
+        result = {pid: _participants_cache.get(pid) for pid in project_ids}
+        missing = [pid for pid, users in result.items() if users is None]
+
+        if missing:
+            owners = select(
+                BuildingProject.id.label("project_id"),
+                BuildingProject.owner_id.label("user_id"),
+            ).where(BuildingProject.id.in_(missing))
+            members = select(ProjectMember.project_id, ProjectMember.user_id).where(
+                ProjectMember.project_id.in_(missing),
+                ProjectMember.is_active.is_(True),
+            )
+            loaded: Dict[str, Set[str]] = {pid: set() for pid in missing}
+            for project_id, user_id in (await self.db.execute(union(owners, members))).all():
+                if user_id is not None:
+                    loaded[str(project_id)].add(str(user_id))
+
+            for pid, users in loaded.items():
+                _participants_cache.set(pid, users)
+            result.update(loaded)
+
+        return result
+
+    async def user_project_ids(self, user_id: str) -> List[str]:
+        owned = select(BuildingProject.id).where(BuildingProject.owner_id == user_id)
+        member_of = select(ProjectMember.project_id).where(
+            ProjectMember.user_id == user_id, ProjectMember.is_active.is_(True)
+        )
+        rows = (await self.db.execute(union(owned, member_of))).scalars().all()
+        return [str(pid) for pid in rows]
+
+    # ------------------------------------------------------------------
+    # Write side
+    # ------------------------------------------------------------------
+
+    async def record_sent(self, messages: Iterable[Tuple[str, str]]) -> None:
+        """Bump counters for ``(project_id, sender_id)`` messages that were just committed."""
+        per_project: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        for project_id, sender_id in messages:
+            per_project[str(project_id)][str(sender_id)] += 1
+
+        try:
+            participants = await self.participants(per_project.keys())
+            pipe = redis_client.pipeline(transaction=False)
+            for project_id, senders in per_project.items():
+                total = sum(senders.values())
+                for user_id in participants.get(project_id, ()):
+                    amount = total - senders.get(user_id, 0)
+                    if amount:
+                        _incr_if_present(
+                            keys=[_unread_key(user_id)],
+                            args=[project_id, amount],
+                            client=pipe,
+                        )
+            await pipe.execute()
+        except Exception as e:
+            # The next reconcile (or a cache miss) corrects the counts
+            logger.error(f"[Unread] Failed to bump counters: {e}")
+
+    async def mark_read(self, user_id: str, project_id: str) -> None:
+        """Move the user's cursor to the newest message of the project and zero the counter."""
+        latest = (
+            await self.db.execute(
+                select(ChatMessage.created_at, ChatMessage.id)
+                .where(ChatMessage.project_id == project_id)
+                .order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+                .limit(1)
+            )
+        ).first()
+
+        now = datetime.now(timezone.utc)
+        last_read_at = latest.created_at if latest else now
+        stmt = pg_insert(ChatReadCursor).values(
+            user_id=user_id,
+            project_id=project_id,
+            last_read_at=last_read_at,
+            last_read_message_id=latest.id if latest else None,
+            created_at=now,
+            updated_at=now,
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_chatreadcursor_user_project",
+            set_={
+                "last_read_at": func.greatest(
+                    ChatReadCursor.last_read_at, stmt.excluded.last_read_at
+                ),
+                "last_read_message_id": stmt.excluded.last_read_message_id,
+                "updated_at": now,
+            },
+        )
+        await self.db.execute(stmt)
+        await self.db.commit()
+
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.hset(_unread_key(user_id), str(project_id), 0)
+            pipe.expire(_unread_key(user_id), settings.chat_unread_ttl)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"[Unread] Failed to reset counter for user={user_id}: {e}")
+
+    # ------------------------------------------------------------------
+    # Read side
+    # ------------------------------------------------------------------
+
+    async def last_read_at(self, user_id: str, project_id: str) -> Optional[datetime]:
+        return await self.db.scalar(
+            select(ChatReadCursor.last_read_at).where(
+                ChatReadCursor.user_id == user_id,
+                ChatReadCursor.project_id == project_id,
+            )
+        )
+
+    async def _count_from_db(self, user_id: str, project_ids: List[str]) -> Dict[str, int]:
+        if not project_ids:
+            return {}
+
+        stmt = (
+            select(ChatMessage.project_id, func.count())
+            .select_from(ChatMessage)
+            .outerjoin(
+                ChatReadCursor,
+                and_(
+                    ChatReadCursor.project_id == ChatMessage.project_id,
+                    ChatReadCursor.user_id == user_id,
+                ),
+            )
+            .where(
+                ChatMessage.project_id.in_(project_ids),
+                ChatMessage.sender_id != user_id,
+                or_(
+                    ChatReadCursor.last_read_at.is_(None),
+                    ChatMessage.created_at > ChatReadCursor.last_read_at,
+                ),
+            )
+            .group_by(ChatMessage.project_id)
+        )
+        counts = {pid: 0 for pid in project_ids}
+        for project_id, count in (await self.db.execute(stmt)).all():
+            counts[str(project_id)] = count
+        return counts
+
+    async def unread_counts(self, user_id: str, project_ids: List[str]) -> Dict[str, int]:
+        """Unread count per project; O(1) per project from Redis, recomputing only misses."""
+        user_id = str(user_id)
+        project_ids = [str(pid) for pid in project_ids]
+        if not project_ids:
+            return {}
+
+        try:
+            cached = await redis_client.hmget(_unread_key(user_id), project_ids)
+        except Exception as e:
+            logger.warning(f"[Unread] Redis read failed, counting in Postgres: {e}")
+            return await self._count_from_db(user_id, project_ids)
+
+        counts = {
+            pid: max(int(value), 0)
+            for pid, value in zip(project_ids, cached)
+            if value is not None
+        }
+        missing = [pid for pid in project_ids if pid not in counts]
+        if missing:
+            recomputed = await self._count_from_db(user_id, missing)
+            counts.update(recomputed)
+            try:
+                pipe = redis_client.pipeline(transaction=False)
+                pipe.hset(_unread_key(user_id), mapping=recomputed)
+                pipe.expire(_unread_key(user_id), settings.chat_unread_ttl)
+                await pipe.execute()
+            except Exception as e:
+                logger.warning(f"[Unread] Failed to cache counts for user={user_id}: {e}")
+
+        return counts
+
+    # ------------------------------------------------------------------
+    # Reconciliation
+    # ------------------------------------------------------------------
+
+    async def reconcile(self, batch_size: int = 200) -> int:
+        """Rewrite every cached counter hash from Postgres. Returns users reconciled."""
+        reconciled = 0
+        async for key in redis_client.scan_iter(match=f"{UNREAD_KEY_PREFIX}*", count=batch_size):
+            user_id = key[len(UNREAD_KEY_PREFIX):]
+            project_ids = await self.user_project_ids(user_id)
+            counts = await self._count_from_db(user_id, project_ids)
+
+            pipe = redis_client.pipeline(transaction=True)
+            pipe.delete(key)
+            if counts:
+                pipe.hset(key, mapping=counts)
+                pipe.expire(key, settings.chat_unread_ttl)
+            await pipe.execute()
+            reconciled += 1
+
+        logger.info(f"[Unread] Reconciled counters for {reconciled} users")
+        return reconciled
@@ -1,10 +1,10 @@
 import base64
 import logging
 import time
-import httpx
+from utils.http_client import http_clients
 from utils.loggers import setup_logger
 from settings import get_settings
-from typing import Dict, Any
+from typing import Any, BinaryIO, Dict, Union
 
 settings = get_settings()
 
@@ -29,11 +29,12 @@ class CloudinaryService:
 
     async def upload_file_async(
         self,
-        file_bytes: bytes,
+        file: Union[bytes, BinaryIO],
         public_id: str,
         folder: str,
         resource_type: str = "image",
-    ) -> str:
+    ) -> Dict[str, Any]:
+        """Upload one file; returns Cloudinary's response (``secure_url``, ``public_id``, ...)."""
         timestamp = int(time.time())
 
         params_to_sign = {
@@ -45,7 +46,8 @@ class CloudinaryService:
 
         signature = await self.cloudinary_signature(params_to_sign, self.api_secret)
 
-        files = {"file": ("file", file_bytes)}
+        # A file object is streamed in chunks by httpx instead of being buffered
+        files = {"file": ("file", file)}
         data = {
             **params_to_sign,
             "api_key": self.api_key,
@@ -53,14 +55,38 @@ class CloudinaryService:
             "resource_type": resource_type,
         }
 
-        async with httpx.AsyncClient(timeout=60) as client:
-            resp = await client.post(self.upload_url, files=files, data=data)
+        # Uploads overwrite the same public_id, so a retry cannot duplicate the asset
+        resp = await http_clients.request(
+            "cloudinary",
+            "POST",
+            self.upload_url,
+            files=files,
+            data=data,
+            idempotent=True,
+        )
 
         if resp.status_code != 200:
             logger.error(f"Cloudinary upload failed [{resp.status_code}]: {resp.text}")
             raise Exception("Cloudinary upload failed")
 
-        return resp.json()["secure_url"]
+        return resp.json()
+
+    async def destroy_file_async(self, public_id: str, resource_type: str = "image") -> None:
+        """Delete an uploaded asset, e.g. one whose database write failed."""
+        params_to_sign = {"public_id": public_id, "timestamp": int(time.time())}
+        signature = await self.cloudinary_signature(params_to_sign, self.api_secret)
+
+        resp = await http_clients.request(
+            "cloudinary",
+            "POST",
+            f"https://api.cloudinary.com/v1_1/{self.cloud_name}/{resource_type}/destroy",
+            data={**params_to_sign, "api_key": self.api_key, "signature": signature},
+            idempotent=True,
+        )
+
+        if resp.status_code != 200:
+            logger.error(f"Cloudinary destroy failed [{resp.status_code}]: {resp.text}")
+            raise Exception("Cloudinary destroy failed")
 
     async def cloudinary_signature(self, params: dict, api_secret: str) -> str:
         """
@@ -0,0 +1,241 @@
+import asyncio
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.email_outbox import EmailOutbox
+from services.email_service import MAX_PERSONALIZATIONS, get_email_service
+from settings import get_settings
+from utils.loggers import setup_logger
+
+settings = get_settings()
+logger = setup_logger("Email_Outbox")
+
+DRAIN_TASK = "drain_email_outbox"
+
+
+def queue_email(
+    db: AsyncSession,
+    subject: str,
+    recipient: List[str],
+    template_name: str,
+    context: dict,
+) -> EmailOutbox:
+    """
+    Add an email to the outbox on ``db``. It is only sent if the caller's
+    transaction commits.
+    """
+    row = EmailOutbox(
+        subject=subject,
+        recipients=[str(email) for email in recipient],
+        template_name=template_name,
+        context=context,
+        status="PENDING",
+        attempts=0,
+        next_attempt_at=datetime.now(timezone.utc),
+    )
+    db.add(row)
+    return row
+
+
+async def kick_email_outbox() -> None:
+    """Ask a worker to drain now instead of waiting for the beat (best effort)."""
+    from worker.celery_worker import celery
+
+    try:
+        await asyncio.to_thread(celery.send_task, DRAIN_TASK)
+    except Exception as e:
+        logger.warning(f"[Outbox] Failed to trigger drain: {e}")
+
+
+class _RatePacer:
+    """Spaces SendGrid calls ``1 / rate`` seconds apart within this worker process."""
+
+    def __init__(self, rate_per_second: float) -> None:
+        self.interval = 1 / rate_per_second if rate_per_second > 0 else 0.0
+        self._next_at = 0.0
+
+    async def wait(self) -> None:
+        now = time.monotonic()
+        if self._next_at > now:
+            await asyncio.sleep(self._next_at - now)
+        self._next_at = max(now, self._next_at) + self.interval
+
+    def hold(self, seconds: float) -> None:
+        """Back off after a 429 from the provider."""
+        self._next_at = max(self._next_at, time.monotonic() + seconds)
+
+
+class EmailOutboxService:
+    """
+    Drains ``EmailOutbox`` in batches.
+
+    Due rows are claimed with ``FOR UPDATE SKIP LOCKED``, so several workers can
+    drain concurrently without sending a row twice. Rows whose rendered subject
+    and body are identical are sent in one SendGrid request with one
+    personalization each. Failures back off exponentially. After
+    ``email_max_attempts``, or on a permanent 4xx, the row is marked ``DEAD``.
+    """
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+        self.email_service = get_email_service()
+        self.pacer = _RatePacer(settings.email_rate_per_second)
+        self._pending_updates: List[tuple] = []
+
+    async def _claim(self, limit: int) -> List[EmailOutbox]:
+        now = datetime.now(timezone.utc)
+        stale = now - timedelta(seconds=settings.email_lock_timeout)
+        due = (
+            select(EmailOutbox.id)
+            .where(
+                or_(
+                    and_(
+                        EmailOutbox.status.in_(("PENDING", "FAILED")),
+                        EmailOutbox.next_attempt_at <= now,
+                    ),
+                    # Worker died mid-send; at-least-once beats never
+                    and_(
+                        EmailOutbox.status == "SENDING",
+                        EmailOutbox.locked_at < stale,
+                    ),
+                )
+            )
+            .order_by(EmailOutbox.next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        rows = await self.db.scalars(
+            update(EmailOutbox)
+            .where(EmailOutbox.id.in_(due.scalar_subquery()))
+            .values(
+                status="SENDING",
+                attempts=EmailOutbox.attempts + 1,
+                locked_at=now,
+                updated_at=now,
+            )
+            .returning(EmailOutbox)
+            .execution_options(synchronize_session=False)
+        )
+        claimed = list(rows.all())
+        await self.db.commit()
+        return claimed
+
+    def _group(self, rows: List[EmailOutbox]) -> Dict[Tuple[str, str], List[EmailOutbox]]:
+        groups: Dict[Tuple[str, str], List[EmailOutbox]] = defaultdict(list)
+        for row in rows:
+            try:
+                html = self.email_service.render(row.template_name, row.context or {})
+            except Exception as e:
+                # Template bug: retrying will not help
+                self._pending_updates.append((row, "DEAD", f"Render failed: {e}", None))
+                continue
+            groups[(row.subject, html)].append(row)
+        return groups
+
+    async def drain_batch(self, limit: Optional[int] = None) -> int:
+        """Claim and send one batch. Returns the number of rows claimed."""
+        rows = await self._claim(limit or settings.email_outbox_batch_size)
+        if not rows:
+            return 0
+
+        self._pending_updates = []
+        for (subject, html), group in self._group(rows).items():
+            for start in range(0, len(group), MAX_PERSONALIZATIONS):
+                chunk = group[start:start + MAX_PERSONALIZATIONS]
+                await self._send(subject, html, chunk)
+
+        await self._apply_updates()
+        return len(rows)
+
+    async def _send(self, subject: str, html: str, rows: List[EmailOutbox]) -> None:
+        await self.pacer.wait()
+        try:
+            response = await self.email_service.send_personalized(
+                subject, html, [row.recipients for row in rows]
+            )
+        except httpx.HTTPError as e:
+            for row in rows:
+                self._pending_updates.append((row, "FAILED", str(e), None))
+            return
+
+        code = response.status_code
+        if code < 300:
+            for row in rows:
+                self._pending_updates.append((row, "SENT", None, None))
+            return
+
+        error = f"SendGrid {code}: {response.text[:500]}"
+        if code == 429:
+            try:
+                retry_after = float(response.headers.get("Retry-After") or 60)
+            except ValueError:
+                retry_after = 60.0
+            self.pacer.hold(retry_after)
+            for row in rows:
+                self._pending_updates.append((row, "FAILED", error, retry_after))
+        elif code >= 500:
+            for row in rows:
+                self._pending_updates.append((row, "FAILED", error, None))
+        elif len(rows) > 1:
+            # One bad address rejects the whole request; isolate it
+            for row in rows:
+                await self._send(subject, html, [row])
+        else:
+            # Bad address / payload: the same request will fail again
+            for row in rows:
+                self._pending_updates.append((row, "DEAD", error, None))
+
+    async def _apply_updates(self) -> None:
+        now = datetime.now(timezone.utc)
+        sent_ids = []
+        for row, new_status, error, retry_after in self._pending_updates:
+            if new_status == "SENT":
+                sent_ids.append(row.id)
+                continue
+
+            values = {"status": new_status, "last_error": error, "next_attempt_at": None}
+            if new_status == "FAILED" and row.attempts >= settings.email_max_attempts:
+                values["status"] = "DEAD"
+            elif new_status == "FAILED":
+                delay = retry_after or min(
+                    settings.email_retry_base_seconds * 2 ** (row.attempts - 1),
+                    settings.email_retry_max_seconds,
+                )
+                values["next_attempt_at"] = now + timedelta(seconds=delay)
+
+            logger.warning(f"[Outbox] {row.id} to {row.recipients} -> {values['status']}: {error}")
+            await self.db.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id == row.id)
+                .values(locked_at=None, updated_at=now, **values)
+            )
+
+        if sent_ids:
+            await self.db.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id.in_(sent_ids))
+                .values(
+                    status="SENT",
+                    sent_at=now,
+                    last_error=None,
+                    locked_at=None,
+                    updated_at=now,
+                )
+            )
+        await self.db.commit()
+
+    async def drain(self, max_batches: int = 20) -> int:
+        """Drain until the outbox is empty or ``max_batches`` were processed."""
+        total = 0
+        for _ in range(max_batches):
+            claimed = await self.drain_batch()
+            total += claimed
+            if claimed < settings.email_outbox_batch_size:
+                break
+        return total
@@ -1,23 +1,35 @@
 import os
-import asyncio
 from pathlib import Path
+from typing import List
 from jinja2 import Environment, FileSystemLoader
-from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Mail
+import httpx
 from settings import get_settings
+from utils.http_client import http_clients
 
 BASE_DIR = Path(__file__).resolve().parent.parent
+# Compiled templates are cached for the life of the process; templates ship with
+# the image, so skip the per-render mtime check.
 template_env = Environment(
-    loader=FileSystemLoader(os.path.join(BASE_DIR, "templates/"))
+    loader=FileSystemLoader(os.path.join(BASE_DIR, "templates/")),
+    cache_size=100,
+    auto_reload=False,
 )
 
 settings = get_settings()
 
 EMAIL_LOGO = "https://res.cloudinary.com/dxzjdyf5z/image/upload/v1769970393/vogydvsazh9etigf9ww5.png"
 
+# SendGrid accepts at most 1000 personalizations per request
+MAX_PERSONALIZATIONS = 1000
+
 
 class EmailService:
 
+    def render(self, template_name: str, context: dict) -> str:
+        template = template_env.get_template(template_name)
+        return template.render(**{**context, "logo_url": EMAIL_LOGO})
+
     async def send_emails(
         self,
         subject: str,
@@ -25,9 +37,7 @@ class EmailService:
         template_name: str,
         context: dict,
     ):
-        template = template_env.get_template(template_name)
-        context["logo_url"] = EMAIL_LOGO
-        html_content = template.render(**context)
+        html_content = self.render(template_name, context)
 
         message = Mail(
             from_email=settings.sendgrid_from_email,
@@ -36,11 +46,40 @@ class EmailService:
             html_content=html_content,
         )
 
-        def _send():
-            sg = SendGridAPIClient(settings.sendgrid_api_key)
-            sg.send(message)
+        # Same request SendGridAPIClient.send() makes, over the shared pooled client
+        response = await http_clients.request(
+            "sendgrid",
+            "POST",
+            "/v3/mail/send",
+            json=message.get(),
+            headers={"Authorization": f"Bearer {settings.sendgrid_api_key}"},
+        )
+        response.raise_for_status()
 
-        await asyncio.to_thread(_send)
+    async def send_personalized(
+        self, subject: str, html_content: str, recipient_groups: List[List[str]]
+    ) -> httpx.Response:
+        """
+        Send one message body to several independent recipient groups in a single
+        request. Each group is its own personalization, so groups never see each
+        other's addresses. The caller inspects the response.
+        """
+        payload = {
+            "personalizations": [
+                {"to": [{"email": email} for email in group]}
+                for group in recipient_groups[:MAX_PERSONALIZATIONS]
+            ],
+            "from": {"email": settings.sendgrid_from_email},
+            "subject": subject,
+            "content": [{"type": "text/html", "value": html_content}],
+        }
+        return await http_clients.request(
+            "sendgrid",
+            "POST",
+            "/v3/mail/send",
+            json=payload,
+            headers={"Authorization": f"Bearer {settings.sendgrid_api_key}"},
+        )
 
 
 def get_email_service() -> EmailService:
@@ -0,0 +1,503 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import delete, func, insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.building_project import BuildingProject
+from models.plans import Package, Plan, PlanPackageUsageCount
+from services.access_service import ProjectAccess
+from settings import get_settings
+from utils.loggers import setup_logger
+from utils.redis_client import redis_client
+from utils.ttl_cache import TTLCache
+
+settings = get_settings()
+logger = setup_logger("Entitlement_Service")
+
+USAGE_KEY_PREFIX = "usage:"
+USAGE_DIRTY_KEY = "usage:dirty"
+# Per project: the value of each counter as last written to (or seeded from)
+# Postgres. Postgres moving away from it means a change Redis never saw.
+USAGE_FLUSHED_PREFIX = "usage:flushed:"
+
+INACTIVE_PAYMENT_STATUSES = ("Pending", "Expired")
+
+# Seconds between attempts to reach Redis about counters changed while it was down
+PENDING_RETRY_INTERVAL = 1.0
+
+# KEYS[1] usage hash of the project, KEYS[2] dirty set
+# ARGV[1] package tag, ARGV[2] limit (-1 = unlimited), ARGV[3] amount, ARGV[4] project id
+# Returns -1 when the counter is not seeded yet, -2 when the limit would be exceeded,
+# otherwise the new usage value.
+_RESERVE_LUA = """
+local current = redis.call('HGET', KEYS[1], ARGV[1])
+if not current then
+    return -1
+end
+local limit = tonumber(ARGV[2])
+local amount = tonumber(ARGV[3])
+if limit >= 0 and tonumber(current) + amount > limit then
+    return -2
+end
+local value = redis.call('HINCRBY', KEYS[1], ARGV[1], amount)
+redis.call('SADD', KEYS[2], ARGV[4])
+return value
+"""
+
+# Same keys/args as above, never goes below zero.
+_RELEASE_LUA = """
+local current = tonumber(redis.call('HGET', KEYS[1], ARGV[1]) or '0')
+if current <= 0 then
+    return 0
+end
+local amount = math.min(current, tonumber(ARGV[3]))
+local value = redis.call('HINCRBY', KEYS[1], ARGV[1], -amount)
+redis.call('SADD', KEYS[2], ARGV[4])
+return value
+"""
+
+# KEYS[1] usage hash, KEYS[2] flushed hash; ARGV = ttl, then tag/delta/flushed triples.
+# Folds Postgres-side changes into a counter that still exists (a reset may have
+# dropped it meanwhile) and records what Postgres now holds.
+_REBASE_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    redis.call('DEL', KEYS[2])
+    return 0
+end
+for i = 2, #ARGV, 3 do
+    local delta = tonumber(ARGV[i + 1])
+    if delta ~= 0 then
+        redis.call('HINCRBY', KEYS[1], ARGV[i], delta)
+    end
+    redis.call('HSET', KEYS[2], ARGV[i], ARGV[i + 2])
+end
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+redis.call('EXPIRE', KEYS[2], ARGV[1])
+return 1
+"""
+
+_reserve_script = redis_client.register_script(_RESERVE_LUA)
+_release_script = redis_client.register_script(_RELEASE_LUA)
+_rebase_script = redis_client.register_script(_REBASE_LUA)
+
+
+def _usage_key(project_id: str) -> str:
+    return f"{USAGE_KEY_PREFIX}{project_id}"
+
+
+def _flushed_key(project_id: str) -> str:
+    return f"{USAGE_FLUSHED_PREFIX}{project_id}"
+
+
+# Projects whose usage changed in Postgres while Redis was unreachable (a
+# fallback reservation, a failed reset), mapped to what Redis needs once it
+# answers: "flush" puts them on the dirty set, so the next flush_usage folds the
+# Postgres change into every process's view; "reseed" drops counters whose
+# flushed baseline could not be recorded, so they load again from Postgres.
+_pending: Dict[str, str] = {}
+_pending_task: Optional[asyncio.Task] = None
+
+
+async def _forget(project_ids: Iterable[str]) -> None:
+    project_ids = list(project_ids)
+    pipe = redis_client.pipeline()
+    for project_id in project_ids:
+        pipe.delete(_usage_key(project_id), _flushed_key(project_id))
+    pipe.srem(USAGE_DIRTY_KEY, *project_ids)
+    await pipe.execute()
+
+
+def _mark_pending(project_id: str, action: str) -> None:
+    global _pending_task
+    if _pending.get(project_id) != "reseed":
+        _pending[project_id] = action
+    try:
+        running = _pending_task is not None and not _pending_task.done()
+        if not running:
+            _pending_task = asyncio.create_task(_retry_pending())
+    except RuntimeError:
+        pass  # no running loop; the next usage call or flush applies it
+
+
+async def _apply_pending() -> None:
+    if not _pending:
+        return
+    pending = dict(_pending)
+    reseed = [pid for pid, action in pending.items() if action == "reseed"]
+    flush = [pid for pid, action in pending.items() if action == "flush"]
+    if reseed:
+        await _forget(reseed)
+    if flush:
+        await redis_client.sadd(USAGE_DIRTY_KEY, *flush)
+    for project_id, action in pending.items():
+        if _pending.get(project_id) == action:
+            del _pending[project_id]
+    logger.info(f"[Usage] Resynced counters of {len(pending)} projects with Redis")
+
+
+async def _retry_pending() -> None:
+    """Retry until Redis is reachable again."""
+    while _pending:
+        # Also lets a fallback's own transaction commit before the flush sees it
+        await asyncio.sleep(PENDING_RETRY_INTERVAL)
+        try:
+            await _apply_pending()
+        except Exception as e:
+            logger.warning(f"[Usage] Redis still unavailable for pending counters: {e}")
+
+
+class PlanCatalogue:
+    """In-process cache of every plan and its packages, keyed by plan id."""
+
+    _KEY = "catalogue"
+
+    def __init__(self, ttl: int) -> None:
+        self._cache = TTLCache(maxsize=1, ttl=ttl)
+
+    async def load(self, db: AsyncSession) -> Dict[str, Dict[str, Any]]:
+        catalogue = self._cache.get(self._KEY)
+        if catalogue is not None:
+            return catalogue
+
+        plans = (await db.execute(select(Plan))).scalars().all()
+        packages = (await db.execute(select(Package))).scalars().all()
+
+        catalogue = {
+            str(plan.id): {
+                "plan": {
+                    column.name: getattr(plan, column.name)
+                    for column in Plan.__table__.columns
+                },
+                "packages": {},
+            }
+            for plan in plans
+        }
+        for package in packages:
+            entry = catalogue.get(str(package.plan_id))
+            if entry is None or not package.tag:
+                continue
+            entry["packages"][package.tag] = {
+                "name": package.name,
+                "tag": package.tag,
+                "limit": package.count,
+                "is_unlimited": bool(package.is_unlimited),
+            }
+
+        self._cache.set(self._KEY, catalogue)
+        logger.info(f"[Catalogue] Loaded {len(catalogue)} plans")
+        return catalogue
+
+    async def package(
+        self, db: AsyncSession, plan_id: Any, tag: str
+    ) -> Optional[Dict[str, Any]]:
+        entry = (await self.load(db)).get(str(plan_id))
+        return entry["packages"].get(tag) if entry else None
+
+    def invalidate(self) -> None:
+        self._cache.clear()
+
+
+plan_catalogue = PlanCatalogue(ttl=settings.plan_catalogue_ttl)
+
+
+@dataclass(frozen=True)
+class UsageReservation:
+    project_id: str
+    tag: str
+    amount: int = 1
+    # False when Redis was unavailable and the usage row was updated in the
+    # caller's transaction instead; a rollback then undoes it.
+    via_redis: bool = True
+
+
+class EntitlementService:
+    """
+    Plan entitlement checks and usage accounting.
+
+    Limits come from the in-process ``plan_catalogue``. Usage lives in a Redis
+    hash per project (``usage:<project_id>`` → ``{tag: count}``) and is changed
+    only through an atomic check-and-increment script. Changed projects are added
+    to ``usage:dirty`` and written behind to ``PlanPackageUsageCount`` by
+    ``flush_usage``. If Redis is unavailable, the checks fall back to Postgres;
+    the next flush of the project folds those Postgres-side changes back in.
+    """
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+
+    # ------------------------------------------------------------------
+    # Checks
+    # ------------------------------------------------------------------
+
+    async def project_access(self, project_id: str) -> ProjectAccess:
+        """Plan fields of a project for callers that have no user context."""
+        row = (
+            await self.db.execute(
+                select(BuildingProject.plan_id, BuildingProject.payment_status).where(
+                    BuildingProject.id == project_id
+                )
+            )
+        ).first()
+
+        return ProjectAccess(
+            user_id="",
+            project_id=str(project_id),
+            project_exists=row is not None,
+            plan_id=row.plan_id if row else None,
+            payment_status=row.payment_status if row else None,
+        )
+
+    async def _package_for(self, access: ProjectAccess, tag: str):
+        if not access.project_exists or not access.plan_id:
+            return None
+
+        if access.payment_status in INACTIVE_PAYMENT_STATUSES:
+            return None
+
+        return await plan_catalogue.package(self.db, access.plan_id, tag)
+
+    async def _db_usage(self, project_id: str, tag: str) -> int:
+        return await self.db.scalar(
+            select(func.coalesce(func.sum(PlanPackageUsageCount.usage_count), 0)).where(
+                PlanPackageUsageCount.project_id == project_id,
+                PlanPackageUsageCount.package_tag == tag,
+            )
+        )
+
+    async def _seed(self, project_id: str, tag: str) -> None:
+        """Load the persisted usage into Redis unless another process already did."""
+        usage = await self._db_usage(project_id, tag)
+        pipe = redis_client.pipeline()
+        pipe.hsetnx(_usage_key(project_id), tag, usage)
+        pipe.hsetnx(_flushed_key(project_id), tag, usage)
+        pipe.expire(_usage_key(project_id), settings.usage_counter_ttl)
+        pipe.expire(_flushed_key(project_id), settings.usage_counter_ttl)
+        await pipe.execute()
+
+    async def usage(self, project_id: str, tag: str) -> int:
+        project_id = str(project_id)
+        try:
+            await _apply_pending()
+            value = await redis_client.hget(_usage_key(project_id), tag)
+            if value is None:
+                await self._seed(project_id, tag)
+                value = await redis_client.hget(_usage_key(project_id), tag)
+            return int(value or 0)
+        except Exception as e:
+            logger.warning(f"[Usage] Redis unavailable, reading Postgres: {e}")
+            return await self._db_usage(project_id, tag)
+
+    async def has_package(self, access: ProjectAccess, tag: str) -> bool:
+        package = await self._package_for(access, tag)
+        if not package:
+            return False
+
+        if package["is_unlimited"]:
+            return True
+
+        used = await self.usage(access.project_id, tag)
+        allowed = used < (package["limit"] or 0)
+        logger.info(
+            f"[Entitlement] project={access.project_id} tag={tag} "
+            f"usage={used} limit={package['limit']} allowed={allowed}"
+        )
+        return allowed
+
+    # ------------------------------------------------------------------
+    # Usage accounting
+    # ------------------------------------------------------------------
+
+    async def reserve(
+        self, access: ProjectAccess, tag: str, amount: int = 1
+    ) -> Optional[UsageReservation]:
+        """
+        Atomically check the limit and consume ``amount`` units of ``tag``.
+        Returns ``None`` when the plan does not allow it. Call ``release`` if the
+        work the reservation was taken for is not committed.
+        """
+        package = await self._package_for(access, tag)
+        if not package:
+            return None
+
+        project_id = str(access.project_id)
+        limit = -1 if package["is_unlimited"] else int(package["limit"] or 0)
+        keys = [_usage_key(project_id), USAGE_DIRTY_KEY]
+        args = [tag, limit, amount, project_id]
+
+        try:
+            await _apply_pending()
+            result = await _reserve_script(keys=keys, args=args)
+            if result == -1:
+                await self._seed(project_id, tag)
+                result = await _reserve_script(keys=keys, args=args)
+        except Exception as e:
+            logger.warning(f"[Usage] Redis unavailable, reserving in Postgres: {e}")
+            reservation = await self._reserve_in_db(project_id, tag, limit, amount)
+            if reservation is not None:
+                _mark_pending(project_id, "flush")
+            return reservation
+
+        if result < 0:
+            logger.info(f"[Usage] Limit reached project={project_id} tag={tag}")
+            return None
+
+        return UsageReservation(project_id=project_id, tag=tag, amount=amount)
+
+    async def _reserve_in_db(
+        self, project_id: str, tag: str, limit: int, amount: int
+    ) -> Optional[UsageReservation]:
+        usage = (
+            await self.db.execute(
+                select(PlanPackageUsageCount)
+                .where(
+                    PlanPackageUsageCount.project_id == project_id,
+                    PlanPackageUsageCount.package_tag == tag,
+                )
+                .with_for_update()
+            )
+        ).scalars().first()
+
+        current = usage.usage_count if usage else 0
+        if limit >= 0 and current + amount > limit:
+            return None
+
+        if usage:
+            usage.usage_count = current + amount
+        else:
+            self.db.add(
+                PlanPackageUsageCount(
+                    project_id=project_id, package_tag=tag, usage_count=amount
+                )
+            )
+
+        return UsageReservation(
+            project_id=project_id, tag=tag, amount=amount, via_redis=False
+        )
+
+    async def release(self, reservation: Optional[UsageReservation]) -> None:
+        if reservation is None or not reservation.via_redis:
+            return
+
+        try:
+            await _release_script(
+                keys=[_usage_key(reservation.project_id), USAGE_DIRTY_KEY],
+                args=[
+                    reservation.tag,
+                    -1,
+                    reservation.amount,
+                    reservation.project_id,
+                ],
+            )
+        except Exception as e:
+            logger.error(f"[Usage] Failed to release {reservation}: {e}")
+
+    async def flush_usage(self, batch_size: int = 500) -> int:
+        """
+        Write dirty Redis counters behind to Postgres. Returns projects flushed.
+
+        Postgres may have moved since the last flush (a reservation that fell
+        back to it, a reset whose Redis cleanup failed). That difference from the
+        flushed baseline is added to the Redis value instead of being overwritten.
+        """
+        await _apply_pending()
+        project_ids = await redis_client.spop(USAGE_DIRTY_KEY, batch_size) or []
+        if not project_ids:
+            return 0
+
+        try:
+            pipe = redis_client.pipeline()
+            for project_id in project_ids:
+                pipe.hgetall(_usage_key(project_id))
+                pipe.hgetall(_flushed_key(project_id))
+            fetched = await pipe.execute()
+            counters = {
+                (project_id, tag): (int(value), flushed.get(tag))
+                for project_id, usage, flushed in zip(
+                    project_ids, fetched[::2], fetched[1::2]
+                )
+                for tag, value in usage.items()
+            }
+
+            rows, rebase = [], {}
+            if counters:
+                existing = (
+                    await self.db.execute(
+                        select(PlanPackageUsageCount)
+                        .where(
+                            tuple_(
+                                PlanPackageUsageCount.project_id,
+                                PlanPackageUsageCount.package_tag,
+                            ).in_(list(counters))
+                        )
+                        .with_for_update()
+                    )
+                ).scalars().all()
+                persisted: Dict[tuple, tuple] = {}
+                for usage in existing:
+                    key = (str(usage.project_id), usage.package_tag)
+                    total, history = persisted.get(key, (0, None))
+                    persisted[key] = (total + usage.usage_count, history or usage.payment_history)
+
+                for (project_id, tag), (value, flushed) in counters.items():
+                    in_db, payment_history = persisted.get((project_id, tag), (0, None))
+                    delta = in_db - int(flushed) if flushed is not None else 0
+                    value = max(value + delta, 0)
+                    rows.append(
+                        {
+                            "project_id": project_id,
+                            "package_tag": tag,
+                            "usage_count": value,
+                            "payment_history": payment_history,
+                        }
+                    )
+                    rebase.setdefault(project_id, []).extend([tag, delta, value])
+
+                # Collapse to one row per (project, tag)
+                await self.db.execute(
+                    delete(PlanPackageUsageCount).where(
+                        tuple_(
+                            PlanPackageUsageCount.project_id,
+                            PlanPackageUsageCount.package_tag,
+                        ).in_(list(counters))
+                    )
+                )
+                await self.db.execute(insert(PlanPackageUsageCount), rows)
+                await self.db.commit()
+
+        except Exception:
+            await self.db.rollback()
+            await redis_client.sadd(USAGE_DIRTY_KEY, *project_ids)
+            raise
+
+        for project_id, args in rebase.items():
+            try:
+                await _rebase_script(
+                    keys=[_usage_key(project_id), _flushed_key(project_id)],
+                    args=[settings.usage_counter_ttl, *args],
+                )
+            except Exception as e:
+                # Committed, but Redis would apply the same delta again next time
+                logger.error(f"[Usage] Failed to rebase counters for project={project_id}: {e}")
+                _mark_pending(project_id, "reseed")
+
+        logger.info(f"[Usage] Flushed {len(rows)} counters for {len(project_ids)} projects")
+        return len(project_ids)
+
+
+async def reset_project_usage(project_id: str) -> None:
+    """
+    Forget the cached counters of a project whose usage rows are being cleared.
+
+    Call it before the delete commits, so ``flush_usage`` cannot write the old
+    counts back in between, and again after the commit to drop a hash re-seeded
+    from the not yet deleted rows. If Redis is down, the next flush subtracts the
+    cleared rows from the kept counters instead.
+    """
+    project_id = str(project_id)
+    try:
+        await _forget([project_id])
+    except Exception as e:
+        logger.error(f"[Usage] Failed to reset counters for project={project_id}: {e}")
+        _mark_pending(project_id, "flush")
@@ -20,6 +20,8 @@ from sqlalchemy import select, func, exists, update, delete
 from helpers.payments import handle_success_payment, handle_failed_payment
 from services.email_service import get_email_service
 from helpers.constant import get_next_cycle_date
+from services.entitlement_service import reset_project_usage
+from utils.http_client import http_clients
 import uuid
 
 
@@ -98,7 +100,11 @@ class PaystackServiceBaseAPIClient:
 
         logger.info("Triggered Make request method")
 
-        timeout = httpx.Timeout(timeout_seconds, connect=10.0)
+        timeout = httpx.Timeout(
+            timeout_seconds,
+            connect=settings.http_connect_timeout,
+            pool=settings.http_pool_timeout,
+        )
         provider = self.provider
 
         # RESOLVE BASE_URL
@@ -110,10 +116,15 @@ class PaystackServiceBaseAPIClient:
             logger.info(f"Resolved Total URL: {url}")
             headers = await self.generated_request_headers()
 
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.request(
-                    method=method, url=url, headers=headers, json=json, params=params
-                )
+            response = await http_clients.request(
+                "paystack",
+                method,
+                url,
+                headers=headers,
+                json=json,
+                params=params,
+                timeout=timeout,
+            )
 
             # Use the centralized response handler
             return await self._handle_response(response, json, url)
@@ -623,6 +634,7 @@ class PaymentService:
             )
 
             await self.db.execute(delete_stmt)
+            await reset_project_usage(project_id)
 
         # -------------------------
         # Payment history handling
@@ -676,6 +688,9 @@ class PaymentService:
         await self.db.commit()
         await self.db.refresh(payment_history)
 
+        if plan.plan_status == "Free":
+            await reset_project_usage(project_id)
+
         return payment_history
 
     async def log_transaction(self, data: dict):
@@ -13,7 +13,7 @@ from sqlalchemy import select
 from utils.loggers import setup_logger
 from typing import Optional
 from uuid import UUID
-from models.users import User
+from services.access_service import AccessService, SUPER_ADMIN, INSPECTOR
 
 logger = setup_logger("Load_Permission")
 
@@ -135,33 +135,24 @@ class PermissionService:
 
     async def is_system_admin(self, user_id: UUID):
         try:
-            user = await self.db.get(User, user_id)
-            if user_id and user.role == "SUPER_ADMIN":
-                return True
-            return False
+            role = await AccessService(self.db).user_role(user_id)
+            return bool(user_id) and role == SUPER_ADMIN
         except Exception as e:
             raise e
 
     async def is_inspector(self, user_id: UUID):
         try:
-            user = await self.db.get(User, user_id)
-            if user_id and user.role == "INSPECTOR":
-                return True
-            return False
+            role = await AccessService(self.db).user_role(user_id)
+            return bool(user_id) and role == INSPECTOR
         except Exception as e:
             raise e
 
     # super admin:
     async def has_project_permission(self, user_id: str):
         try:
-            # 1. System user → allow
-            if await self.is_system_admin(user_id):
-                return True
-
-            if await self.is_inspector(user_id):
-                return True
-
-            return False
+            # System user or inspector → allow (role is loaded once per request)
+            role = await AccessService(self.db).user_role(user_id)
+            return role in (SUPER_ADMIN, INSPECTOR)
         except Exception as e:
             raise e
 
@@ -10,6 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from utils.loggers import setup_logger
 from helpers.slugify import generate_slug
+from services.entitlement_service import plan_catalogue
 
 logger = setup_logger("Load_Plan")
 
@@ -67,6 +68,7 @@ class PlansService:
                 logger.info(f"🔹 Package added: {pkg['name']} → {plan.name}")
 
         await self.db.commit()
+        plan_catalogue.invalidate()
         logger.info("✅ All plans & packages seeded successfully")
 
 
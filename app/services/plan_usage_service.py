@@ -1,350 +1,331 @@
+import json
+import time
+import uuid
+from typing import Awaitable, Callable, List
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from utils.loggers import setup_logger
-from sqlalchemy import select, exists, update
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from models.building_project import BuildingProject
-from models.plans import PlanPackageUsageCount, Package
 from fastapi import HTTPException, status
-from models.plans import PaymentHistory, Plan
+from models.plans import ExpirationReminder, PaymentHistory, Plan
 from datetime import datetime, timezone, timedelta
 from models.users import User
-from services.email_service import get_email_service
+from services.email_outbox import kick_email_outbox, queue_email
+from services.entitlement_service import EntitlementService, reset_project_usage
+from settings import get_settings
+from utils.redis_client import redis_client
 
+settings = get_settings()
 logger = setup_logger("Project_Plan_Usage_Service")
 
+# Subscriptions in these states lapse once their end / billing date passes
+EXPIRABLE_STATUSES = ("Active", "Paid")
 
-class ProjectPlanUsageService:
-    def __init__(self, db: AsyncSession) -> None:
-        self.db = db
-
-    async def has_storage_package(self, project_id: str) -> bool:
-        try:
-            logger.info(
-                f"[StorageCheck] Checking storage access for project={project_id}"
-            )
-
-            # 1. Fetch project
-            project = await self.db.get(BuildingProject, project_id)
-
-            if not project:
-                logger.warning(f"[StorageCheck] Project not found: {project_id}")
-                return False
-
-            if not project.plan_id:
-                logger.warning(
-                    f"[StorageCheck] No plan attached to project={project_id}"
-                )
-                return False
-
-            if project.payment_status in ("Pending", "Expired"):
-                logger.info(
-                    f"[StorageCheck] Payment inactive for project={project_id}, "
-                    f"status={project.payment_status}"
-                )
-                return False
-
-            # 2. Fetch storage package for plan
-            stmt_package = select(Package).where(
-                Package.plan_id == project.plan_id,
-                Package.tag == "storage",
-            )
-            package = await self.db.scalar(stmt_package)
+# Reminders go out this many days before the subscription end date
+REMINDER_DAYS = (1, 2)
 
-            if not package:
-                logger.info(
-                    f"[StorageCheck] No storage package for plan={project.plan_id}"
-                )
-                return False
+PROJECTS_EXPIRED_CHANNEL = "projects:expired"
+EXPIRATION_STATS_KEY = "plan_expiration:last_run"
 
-            if package.is_unlimited:
-                logger.info(
-                    f"[StorageCheck] Unlimited storage granted for project={project_id}"
-                )
-                return True
+# In-process callbacks run with the ids of projects that just expired
+_expiry_hooks: List[Callable[[List[str]], Awaitable[None]]] = []
 
-            # 3. Fetch usage
-            stmt_usage = select(PlanPackageUsageCount.usage_count).where(
-                PlanPackageUsageCount.project_id == project_id,
-                PlanPackageUsageCount.package_id == package.id,
-            )
-            usage = (await self.db.scalar(stmt_usage)) or 0
 
-            allowed = usage < (package.count or 0)
+def on_projects_expired(hook: Callable[[List[str]], Awaitable[None]]):
+    """Register ``async hook(project_ids)``; usable as a decorator."""
+    _expiry_hooks.append(hook)
+    return hook
 
-            logger.info(
-                f"[StorageCheck] project={project_id} "
-                f"usage={usage} limit={package.count} allowed={allowed}"
-            )
 
-            return allowed
+async def notify_projects_expired(project_ids: List) -> None:
+    """Run local hooks and publish the ids so other processes can drop their caches."""
+    if not project_ids:
+        return
+    project_ids = [str(pid) for pid in project_ids]
 
-        except Exception as e:
-            logger.exception(
-                f"[StorageCheck] Unexpected error for project={project_id}: {e}"
-            )
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Unable to validate storage package",
-            )
-
-    async def has_report_package(self, project_id: str) -> bool:
+    for hook in _expiry_hooks:
         try:
-            logger.info(
-                f"[ReportCheck] Checking report access for project={project_id}"
-            )
-
-            project = await self.db.get(BuildingProject, project_id)
-
-            if not project:
-                logger.warning(f"[ReportCheck] Project not found: {project_id}")
-                return False
-
-            if not project.plan_id:
-                logger.warning(
-                    f"[ReportCheck] No plan attached to project={project_id}"
-                )
-                return False
-
-            if project.payment_status in ("Pending", "Expired"):
-                logger.info(
-                    f"[ReportCheck] Payment inactive for project={project_id}, "
-                    f"status={project.payment_status}"
-                )
-                return False
-
-            stmt_package = select(Package).where(
-                Package.plan_id == project.plan_id,
-                Package.tag == "reports",
-            )
-            package = await self.db.scalar(stmt_package)
+            await hook(project_ids)
+        except Exception as e:
+            logger.error(f"[Expiration] Hook {hook.__name__} failed: {e}")
 
-            if not package:
-                logger.info(
-                    f"[ReportCheck] No report package for plan={project.plan_id}"
-                )
-                return False
+    try:
+        await redis_client.publish(PROJECTS_EXPIRED_CHANNEL, json.dumps(project_ids))
+    except Exception as e:
+        logger.error(f"[Expiration] Failed to publish expired projects: {e}")
 
-            if package.is_unlimited:
-                logger.info(
-                    f"[ReportCheck] Unlimited reports granted for project={project_id}"
-                )
-                return True
 
-            stmt_usage = select(PlanPackageUsageCount.usage_count).where(
-                PlanPackageUsageCount.project_id == project_id,
-                PlanPackageUsageCount.package_tag == "reports",
-            )
-            usage = (await self.db.scalar(stmt_usage)) or 0
+@on_projects_expired
+async def _drop_usage_counters(project_ids: List[str]) -> None:
+    # Expired projects have no package access; counters restart on renewal
+    for project_id in project_ids:
+        await reset_project_usage(project_id)
 
-            allowed = usage < (package.count or 0)
 
-            logger.info(
-                f"[ReportCheck] project={project_id} "
-                f"usage={usage} limit={package.count} allowed={allowed}"
-            )
+async def record_expiration_run(stats: dict) -> None:
+    try:
+        await redis_client.hset(
+            EXPIRATION_STATS_KEY, mapping={k: str(v) for k, v in stats.items()}
+        )
+    except Exception as e:
+        logger.warning(f"[Expiration] Failed to record run stats: {e}")
 
-            return allowed
 
-        except Exception as e:
-            logger.exception(
-                f"[ReportCheck] Unexpected error for project={project_id}: {e}"
-            )
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Unable to validate report package",
-            )
+class ProjectPlanUsageService:
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
 
-    async def has_member_invitation_package(self, project_id: str) -> bool:
+    async def has_package(self, project_id: str, tag: str) -> bool:
         try:
-            logger.info(
-                f"[MemberInviteCheck] Checking member invite access for project={project_id}"
-            )
-
-            project = await self.db.get(BuildingProject, project_id)
-
-            if not project:
-                logger.warning(f"[MemberInviteCheck] Project not found: {project_id}")
-                return False
-
-            if not project.plan_id:
-                logger.warning(
-                    f"[MemberInviteCheck] No plan attached to project={project_id}"
-                )
-                return False
-
-            if project.payment_status in ("Pending", "Expired"):
-                logger.info(
-                    f"[MemberInviteCheck] Payment inactive for project={project_id}, "
-                    f"status={project.payment_status}"
-                )
-                return False
-
-            stmt_package = select(Package).where(
-                Package.plan_id == project.plan_id,
-                Package.tag == "members",
-            )
-            package = await self.db.scalar(stmt_package)
-
-            if not package:
-                logger.info(
-                    f"[MemberInviteCheck] No member package for plan={project.plan_id}"
-                )
+            entitlements = EntitlementService(self.db)
+            access = await entitlements.project_access(project_id)
+            if not access.project_exists:
+                logger.warning(f"[PackageCheck] Project not found: {project_id}")
                 return False
 
-            if package.is_unlimited:
-                logger.info(
-                    f"[MemberInviteCheck] Unlimited members granted for project={project_id}"
-                )
-                return True
-
-            stmt_usage = select(PlanPackageUsageCount.usage_count).where(
-                PlanPackageUsageCount.project_id == project_id,
-                PlanPackageUsageCount.package_id == package.id,
-            )
-            usage = (await self.db.scalar(stmt_usage)) or 0
-
-            allowed = usage < (package.count or 0)
-
-            logger.info(
-                f"[MemberInviteCheck] project={project_id} "
-                f"usage={usage} limit={package.count} allowed={allowed}"
-            )
-
-            return allowed
+            return await entitlements.has_package(access, tag)
 
         except Exception as e:
             logger.exception(
-                f"[MemberInviteCheck] Unexpected error for project={project_id}: {e}"
+                f"[PackageCheck] Unexpected error for project={project_id} tag={tag}: {e}"
             )
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Unable to validate member invitation package",
+                detail=f"Unable to validate {tag} package",
             )
 
-    async def increment_report_usage(self, project_id: str):
-        stmt = (
-            select(PlanPackageUsageCount)
+    async def has_storage_package(self, project_id: str) -> bool:
+        return await self.has_package(project_id, "storage")
+
+    async def has_report_package(self, project_id: str) -> bool:
+        return await self.has_package(project_id, "reports")
+
+    async def has_member_invitation_package(self, project_id: str) -> bool:
+        return await self.has_package(project_id, "team_members")
+
+    async def _expire_chunk(self, model, status_column, due_column, today, after_id):
+        """
+        Expire one keyset-ordered chunk of ``model`` rows and commit. Rows locked
+        by live traffic are skipped and picked up on the next run.
+        """
+        due = (
+            select(model.id)
             .where(
-                PlanPackageUsageCount.project_id == project_id,
-                PlanPackageUsageCount.package_tag == "reports",
+                status_column.in_(EXPIRABLE_STATUSES),
+                due_column <= today,
             )
-            .with_for_update()
+            .order_by(model.id)
+            .limit(settings.plan_expiration_chunk_size)
+            .with_for_update(skip_locked=True)
         )
+        if after_id is not None:
+            due = due.where(model.id > after_id)
 
-        result = await self.db.execute(stmt)
-        usage = result.scalar_one_or_none()
-
-        if not usage:
-            self.db.add(
-                PlanPackageUsageCount(
-                    project_id=project_id, package_tag="reports", usage_count=1
-                )
+        values = (
+            {"payment_status": "Expired"}
+            if model is BuildingProject
+            else {"status": "Expired"}
+        )
+        result = await self.db.execute(
+            update(model)
+            .where(model.id.in_(due.scalar_subquery()))
+            .values(**values)
+            .returning(model.id, due_column)
+            .execution_options(synchronize_session=False)
+        )
+        rows = result.all()
+        await self.db.commit()
+        return rows
+
+    async def _expire_all(
+        self, model, status_column, due_column, today, stats, key, on_chunk=None
+    ):
+        after_id = None
+        while True:
+            rows = await self._expire_chunk(
+                model, status_column, due_column, today, after_id
             )
-            # create it new
-        else:
-            usage.usage_count += 1
-            self.db.add(usage)
-
-    async def schedule_plan_expiration(self):
+            if not rows:
+                break
+
+            stats["chunks"] += 1
+            stats[key] += len(rows)
+            oldest = min(row[1] for row in rows)
+            stats["max_lag_days"] = max(stats["max_lag_days"], (today - oldest).days)
+            if on_chunk is not None:
+                # The chunk is committed; don't hold cache invalidation for the rest of the run
+                await on_chunk([row[0] for row in rows])
+
+            after_id = max(row[0] for row in rows)
+            if len(rows) < settings.plan_expiration_chunk_size:
+                break
+
+    async def schedule_plan_expiration(self) -> dict:
+        """
+        Expire due projects and payment histories in short, keyset-ordered
+        transactions. ``FOR UPDATE SKIP LOCKED`` lets parallel runs split the
+        work. Expired project ids are announced for cache invalidation as each
+        chunk commits.
+        """
         try:
-            now = datetime.now(timezone.utc).date()
-            logger.info(f"Running schedule_plan_expiration task for date: {now}")
-
-            # 1. Update BuildingProjects directly
-            # The database handles the locking and filtering in one step
-            project_stmt = (
-                update(BuildingProject)
-                .where(
-                    BuildingProject.payment_status == "Active",
-                    BuildingProject.subscription_end_date <= now,
-                )
-                .values(payment_status="Expired")
-                # This returns the count of rows affected
-                .execution_options(synchronize_session=False)
+            today = datetime.now(timezone.utc).date()
+            logger.info(f"Running schedule_plan_expiration task for date: {today}")
+
+            started = time.perf_counter()
+            stats = {"projects": 0, "histories": 0, "chunks": 0, "max_lag_days": 0}
+
+            await self._expire_all(
+                BuildingProject,
+                BuildingProject.payment_status,
+                BuildingProject.subscription_end_date,
+                today,
+                stats,
+                "projects",
+                on_chunk=notify_projects_expired,
             )
-
-            project_result = await self.db.execute(project_stmt)
-            logger.info(f"Expired {project_result.rowcount} BuildingProjects")
-
-            # 2. Update PaymentHistory directly
-            history_stmt = (
-                update(PaymentHistory)
-                .where(
-                    PaymentHistory.status.in_(["Active", "Paid"]),
-                    PaymentHistory.next_billing_date <= now,
-                )
-                .values(status="Expired")
-                .execution_options(synchronize_session=False)
+            logger.info(f"Expired {stats['projects']} BuildingProjects")
+
+            await self._expire_all(
+                PaymentHistory,
+                PaymentHistory.status,
+                PaymentHistory.next_billing_date,
+                today,
+                stats,
+                "histories",
             )
-
-            history_result = await self.db.execute(history_stmt)
-            logger.info(f"Expired {history_result.rowcount} PaymentHistory records")
-
-            # Commit both updates
-            await self.db.commit()
-            logger.info("schedule_plan_expiration task completed successfully")
+            logger.info(f"Expired {stats['histories']} PaymentHistory records")
+
+            elapsed = time.perf_counter() - started
+            rows = stats["projects"] + stats["histories"]
+            stats.update(
+                run_date=str(today),
+                seconds=round(elapsed, 3),
+                rows_per_sec=round(rows / elapsed, 1) if elapsed else 0.0,
+            )
+            await record_expiration_run(stats)
+            logger.info(f"schedule_plan_expiration task completed successfully: {stats}")
+            return stats
 
         except Exception as e:
             logger.exception(f"Unexpected error in schedule_plan_expiration: {e}")
             await self.db.rollback()
             raise e
 
-    async def send_plan_expiration_reminders(self):
+    async def _reminder_page(self, today, after_id):
+        stmt = (
+            select(
+                BuildingProject.id.label("project_id"),
+                BuildingProject.name.label("project_name"),
+                BuildingProject.subscription_end_date.label("end_date"),
+                User.email,
+                User.first_name,
+                Plan.name.label("plan_name"),
+            )
+            .join(User, BuildingProject.owner_id == User.id)
+            .join(Plan, BuildingProject.plan_id == Plan.id)
+            .where(
+                BuildingProject.payment_status.in_(EXPIRABLE_STATUSES),
+                BuildingProject.subscription_end_date.in_(
+                    [today + timedelta(days=days) for days in REMINDER_DAYS]
+                ),
+            )
+            .order_by(BuildingProject.id)
+            .limit(settings.reminder_batch_size)
+        )
+        if after_id is not None:
+            stmt = stmt.where(BuildingProject.id > after_id)
+        return (await self.db.execute(stmt)).all()
+
+    async def _claim_reminders(self, today, records) -> set:
+        """Insert ledger rows; returns the ``(project_id, days_left)`` pairs not sent before."""
+        values = [
+            {
+                "id": uuid.uuid4(),
+                "project_id": record.project_id,
+                "expiry_date": record.end_date,
+                "days_left": (record.end_date - today).days,
+                "email": record.email,
+            }
+            for record in records
+        ]
+        result = await self.db.execute(
+            pg_insert(ExpirationReminder)
+            .values(values)
+            .on_conflict_do_nothing(
+                constraint="uq_expirationreminder_project_expiry_days_left"
+            )
+            .returning(ExpirationReminder.project_id, ExpirationReminder.days_left)
+        )
+        return {(row.project_id, row.days_left) for row in result.all()}
+
+    async def send_plan_expiration_reminders(self) -> dict:
+        """
+        Queue "about to expire" emails, reading projects in keyset pages. Each page
+        records its reminders in ``ExpirationReminder`` and queues the emails in
+        the same transaction. A rerun on the same day therefore skips anyone
+        already reminded. The outbox worker batches the actual sends.
+        """
         try:
             today = datetime.now(timezone.utc).date()
             logger.info(f"Running plan expiration reminders for date: {today}")
 
-            day_1 = today + timedelta(days=1)
-            day_2 = today + timedelta(days=2)
-            logger.debug(f"Checking subscriptions ending on: {day_1} and {day_2}")
-
-            stmt = (
-                select(
-                    BuildingProject.name.label("project_name"),
-                    BuildingProject.subscription_end_date.label("end_date"),
-                    User.email,
-                    User.first_name,
-                    Plan.name.label("plan_name"),
-                )
-                .join(User, BuildingProject.owner_id == User.id)
-                .join(Plan, BuildingProject.plan_id == Plan.id)
-                .where(
-                    BuildingProject.payment_status.in_(["Active", "Paid"]),
-                    BuildingProject.subscription_end_date.in_([day_1, day_2]),
-                )
+            started = time.perf_counter()
+            stats = {"scanned": 0, "queued": 0, "already_sent": 0, "pages": 0}
+            after_id = None
+
+            while True:
+                records = await self._reminder_page(today, after_id)
+                if not records:
+                    break
+
+                stats["pages"] += 1
+                stats["scanned"] += len(records)
+                after_id = records[-1].project_id
+                last_page = len(records) < settings.reminder_batch_size
+
+                records = [record for record in records if record.email]
+                claimed = await self._claim_reminders(today, records) if records else set()
+
+                for record in records:
+                    days_left = (record.end_date - today).days
+                    if (record.project_id, days_left) not in claimed:
+                        stats["already_sent"] += 1
+                        continue
+
+                    queue_email(
+                        self.db,
+                        subject="Your Subscription Is About to Expire",
+                        recipient=[record.email],
+                        template_name="subscription_expires.html",
+                        context={
+                            "user_name": record.first_name,
+                            "plan_name": record.plan_name,
+                            "project_name": record.project_name,
+                            "days_left": days_left,
+                            # Outbox context is JSON; renders the same as the date
+                            "expiration_date": str(record.end_date),
+                        },
+                    )
+                    stats["queued"] += 1
+
+                await self.db.commit()
+                if last_page:
+                    break
+
+            if stats["queued"]:
+                await kick_email_outbox()
+
+            elapsed = time.perf_counter() - started
+            stats.update(
+                seconds=round(elapsed, 3),
+                rows_per_sec=round(stats["scanned"] / elapsed, 1) if elapsed else 0.0,
             )
-
-            result = await self.db.execute(stmt)
-            records = result.all()
-            logger.info(f"Found {len(records)} subscriptions expiring soon")
-
-            for project_name, end_date, email, first_name, plan_name in records:
-                days_left = (end_date - today).days
-                logger.debug(
-                    f"Preparing reminder for {email} ({project_name}), days left: {days_left}"
-                )
-
-                if email:
-                    context = {
-                        "user_name": first_name,
-                        "plan_name": plan_name,
-                        "project_name": project_name,
-                        "days_left": days_left,
-                        "expiration_date": end_date,
-                    }
-
-                    try:
-                        await get_email_service().send_emails(
-                            subject="Your Subscription Is About to Expire",
-                            recipient=[email],
-                            template_name="subscription_expires.html",
-                            context=context,
-                        )
-                        logger.info(
-                            f"Sent reminder email to {email} for project {project_name}"
-                        )
-                    except Exception as email_error:
-                        logger.error(f"Failed to send email to {email}: {email_error}")
+            logger.info(f"Plan expiration reminders completed: {stats}")
+            return stats
 
         except Exception as e:
             logger.exception(f"Error sending plan expiration reminders: {e}")
+            await self.db.rollback()
             raise e
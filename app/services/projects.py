@@ -1,22 +1,28 @@
-import asyncio
 from typing import Optional
+from uuid import UUID
 from sqlalchemy import exc
 from sqlalchemy.ext.asyncio import AsyncSession
 from models.building_project import BuildingProject
 from models.project_members import ProjectMember
 from utils.loggers import setup_logger
+from utils.db_routing import replica_reads
 from services.upload_service import MediaUploadService
 from schemas.projects_schema import ProjectResponse
 from services.plan_usage_service import ProjectPlanUsageService
 from fastapi import HTTPException, status
 from models.core import Role
-from sqlalchemy import select, func, exists, update, and_, case
-from datetime import date
+from sqlalchemy import select, func, exists, update, or_, tuple_, literal_column
 from constant.roles import PROJECT_OWNER
 from models.project_report import ProjectReport
 from schemas.report_schema import ProjectReportRequest, ProjectReportResponse
-from utils.file_upload import upload_file_optimized
+from utils.file_upload import delete_uploaded_files, upload_files_bounded
+from utils.db_setup import release_connection
 from services.permission_service import PermissionService
+from services.access_service import AccessService, ProjectAccess
+from services.entitlement_service import EntitlementService, plan_catalogue
+from services.analytics_service import AnalyticsService, request_analytics_rebuild
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from utils.pagination import decode_cursor, encode_cursor, normalize_pagination
 from constant.permissions import (
     CAN_MANAGE_PROJECT,
     CAN_VIEW_PROJECT,
@@ -39,6 +45,9 @@ from services.email_service import get_email_service
 
 logger = setup_logger("Project_Service")
 
+PROJECT_STATUSES = ("Active", "Pending", "Draft", "Completed", "Cancelled")
+PROJECT_PAYMENT_STATUSES = ("Expired", "Awaiting_Payment", "Paid")
+
 
 class ProjectSetupService:
     def __init__(self, db: AsyncSession) -> None:
@@ -48,11 +57,18 @@ class ProjectSetupService:
         self.organization_admin = PROJECT_OWNER
         self.permission = "Insufficient permission to complete the action"
         self.perms_role = PermissionService(db)
+        self.access = AccessService(db)
+        self.entitlements = EntitlementService(db)
         self.payment_service = PaymentService(db)
 
     async def create_project(self, project_payload: dict, current_user: dict):
-        """Initializes a new project, assigns ownership, handles media, and generates an invoice."""
+        """
+        Initializes a new project, assigns ownership, handles media, and generates an invoice.
+        ``images`` were uploaded by the caller before any DB work; they are deleted
+        again if the project cannot be saved.
+        """
         user_id = current_user.get("id")
+        orphans = project_payload.get("images", [])
         try:
             logger.info(f"[PROJECT_CREATE] Start: User {user_id} creating new project")
 
@@ -94,6 +110,7 @@ class ProjectSetupService:
             )
 
             await self.db.commit()
+            orphans = []
             await self.db.refresh(project)
 
             project_resp = ProjectResponse.model_validate(project).model_dump()
@@ -106,13 +123,100 @@ class ProjectSetupService:
 
         except HTTPException as http_exec:
             await self.db.rollback()  # IMPORTANT
+            await delete_uploaded_files(orphans)
             raise http_exec
 
         except Exception as e:
             await self.db.rollback()
+            await delete_uploaded_files(orphans)
             logger.error(f"[PROJECT_CREATE] Critical Failure: {str(e)}", exc_info=True)
             raise Exception(f"Failed to create project: {str(e)}")
 
+    # ------------------------------------------------------------------
+    # Project listing
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _status_filter(project_status: str | None):
+        if project_status in PROJECT_STATUSES:
+            return BuildingProject.status == project_status
+        if project_status in PROJECT_PAYMENT_STATUSES:
+            return BuildingProject.payment_status == project_status
+        return None
+
+    async def _list_projects(
+        self, filters: list, page: int, limit: int, project_status: str | None
+    ) -> dict:
+        """
+        One page of projects with their first two images, report count and total
+        in a single query; the plan comes from the in-process plan catalogue.
+        """
+        page, limit, offset = normalize_pagination(page, limit)
+
+        status_filter = self._status_filter(project_status)
+        if status_filter is not None:
+            filters = [*filters, status_filter]
+
+        first_images = (
+            select(ProjectUpload.file_url, ProjectUpload.uploaded_at)
+            .where(ProjectUpload.project_id == BuildingProject.id)
+            .order_by(ProjectUpload.uploaded_at.asc())
+            .limit(2)
+            .correlate(BuildingProject)
+            .subquery("first_images")
+        )
+        images = select(
+            func.array_agg(
+                aggregate_order_by(first_images.c.file_url, first_images.c.uploaded_at)
+            )
+        ).scalar_subquery()
+
+        report_count = (
+            select(func.count(ProjectReport.id))
+            .where(ProjectReport.project_id == BuildingProject.id)
+            .correlate(BuildingProject)
+            .scalar_subquery()
+        )
+
+        stmt = (
+            select(
+                *BuildingProject.__table__.columns,
+                images.label("images"),
+                report_count.label("report_count"),
+                func.count().over().label("total_count"),
+            )
+            .where(*filters)
+            .order_by(BuildingProject.created_at.desc())
+            .offset(offset)
+            .limit(limit)
+        )
+        rows = (await self.db.execute(stmt)).mappings().all()
+
+        if rows:
+            total = rows[0]["total_count"]
+        else:
+            # Past the last page the window has nothing to count
+            total = await self.db.scalar(
+                select(func.count()).select_from(BuildingProject).where(*filters)
+            )
+
+        catalogue = await plan_catalogue.load(self.db)
+        data = []
+        for row in rows:
+            project = dict(row)
+            del project["total_count"]
+            project["images"] = project["images"] or []
+            entry = catalogue.get(str(project["plan_id"]))
+            project["plan"] = entry["plan"] if entry else None
+            data.append(project)
+
+        return {
+            "meta_data": {"limit": limit, "page": page, "total": total},
+            "data": data,
+            "message": "Projects fetched successfully",
+        }
+
+    @replica_reads
     async def get_all_user_project(
         self,
         user_id: str,
@@ -126,134 +230,32 @@ class ProjectSetupService:
                 f"[PROJECT_LIST] Fetching projects for User {user_id} (Page {page})"
             )
 
-            page = max(page, 1)
-            limit = min(limit, 100)
-            offset = (page - 1) * limit
-
-            stmt = select(BuildingProject).where(BuildingProject.owner_id == user_id)
-
-            if project_status:
-                stmt = stmt.where(BuildingProject.status == project_status)
-
-            # Execution
-            result = await self.db.execute(
-                stmt.order_by(BuildingProject.created_at.desc())
-                .offset(offset)
-                .limit(limit)
-            )
-
-            # Count total for meta_data
-            count_stmt = (
-                select(func.count())
-                .select_from(BuildingProject)
-                .where(BuildingProject.owner_id == user_id)
+            return await self._list_projects(
+                [BuildingProject.owner_id == user_id], page, limit, project_status
             )
 
-            if project_status:
-                count_stmt = count_stmt.where(BuildingProject.status == project_status)
-
-            total = await self.db.scalar(count_stmt)  # total count scale
-
-            projects = result.scalars().all()
-            # -------------------------
-            # Get images for projects
-            # -------------------------
-            project_ids = [p.id for p in projects]
-
-            image_stmt = (
-                select(ProjectUpload)
-                .where(ProjectUpload.project_id.in_(project_ids))
-                .order_by(ProjectUpload.uploaded_at.asc())
-            )
-
-            image_result = await self.db.execute(image_stmt)
-            images = image_result.scalars().all()
-
-            # group max 2 images per project
-            project_image_map = {}
-            for img in images:
-                pid = img.project_id
-                if pid not in project_image_map:
-                    project_image_map[pid] = []
-
-                if len(project_image_map[pid]) < 2:
-                    project_image_map[pid].append(img.file_url)
-
-            # attach images to projects
-            data = []
-            for project in projects:
-                project_dict = project.__dict__.copy()
-                project_dict["images"] = project_image_map.get(project.id, [])
-                data.append(project_dict)
-
-            # Get all the plans without fiters
-            plans = await self.db.execute(select(Plan))
-            plans = plans.scalars().all()
-            plan_map = {plan.id: plan for plan in plans}
-
-            # add the plan details to the project as an map
-            for project in data:
-                project["plan"] = plan_map.get(project["plan_id"])
-
-            # add report count
-            report_count_stmt = (
-                select(
-                    ProjectReport.project_id,
-                    func.count(ProjectReport.id).label("report_count"),
-                )
-                .where(ProjectReport.project_id.in_(project_ids))
-                .group_by(ProjectReport.project_id)
-            )
-
-            report_count_result = await self.db.execute(report_count_stmt)
-            report_count_map = {
-                row.project_id: row.report_count for row in report_count_result.all()
-            }
-
-            # Attach report count to each project
-            for project in data:
-                project["report_count"] = report_count_map.get(project["id"], 0)
-
-            return {
-                "meta_data": {"limit": limit, "page": page, "total": total},
-                "data": data,
-                "message": "Projects fetched successfully",
-            }
-
         except Exception as e:
             logger.error(f"[PROJECT_LIST] Error for User {user_id}: {str(e)}")
             raise Exception(f"Failed to fetch projects: {str(e)}")
 
     async def _assert_project_access(
-        self, user_id: str, project_id: str, project: Optional[BuildingProject] = None
-    ) -> None:
+        self, user_id: str, project_id: str
+    ) -> ProjectAccess:
         """
-        Raises HTTP 403 if the user is not the project owner, a project member,
-        or a super admin. Call this after the project has been fetched.
+        Raises HTTP 404/403 unless the user is the project owner, an active
+        project member, or a super admin. Returns the resolved access so callers
+        can reuse role and entitlement without further queries.
         """
+        access = await self.access.resolve(user_id, project_id)
 
-        if project is None:
-            project = await self.db.get(BuildingProject, project_id)
-
-        if not project:
+        if not access.project_exists:
             logger.warning(f"[PROJECT_GET] Not Found: Project {project_id}")
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Project not found",
             )
 
-        if await self.perms_role.is_system_admin(user_id):
-            return
-
-        membership_stmt = select(
-            exists().where(
-                ProjectMember.user_id == user_id,
-                ProjectMember.project_id == project_id,
-            )
-        )
-        is_member = await self.db.scalar(membership_stmt)
-
-        if not (is_member or str(project.owner_id) == user_id):
+        if not access.can_view:
             logger.warning(
                 f"[PROJECT_GET] Access Denied: User {user_id} on Project {project_id}"
             )
@@ -262,13 +264,15 @@ class ProjectSetupService:
                 detail="You do not have permission to view this project",
             )
 
+        return access
+
     async def get_single_project(self, user_id: str, project_id: str):
         """Retrieves full details, media, and package status for a specific project."""
         try:
             logger.info(f"[PROJECT_GET] User {user_id} accessing Project {project_id}")
 
+            access = await self._assert_project_access(user_id, project_id)
             project = await self.db.get(BuildingProject, project_id)
-            await self._assert_project_access(user_id, project_id, project)
 
             # 3. Enrich Data
             stmt_recent_report = (
@@ -289,12 +293,12 @@ class ProjectSetupService:
             )
 
             # Determine is he can still post report for the project
-            project.has_report_package = await self.package_useage.has_report_package(
-                project_id
+            project.has_report_package = await self.entitlements.has_package(
+                access, "reports"
             )
 
             # only the owner has this actions
-            project.has_report_action = await self.perms_role.is_inspector(user_id)
+            project.has_report_action = access.is_inspector
 
             # Only project owner can see this
             project.has_payment_action = (
@@ -314,6 +318,7 @@ class ProjectSetupService:
             logger.error(f"[PROJECT_GET] Critical Error for ID {project_id}: {str(e)}")
             raise Exception(f"Error retrieving project: {str(e)}")
 
+    @replica_reads
     async def get_project_report(
         self, project_id: str, user_id: str, page: int = 1, limit: int = 10
     ):
@@ -321,8 +326,7 @@ class ProjectSetupService:
         try:
             logger.info(f"[REPORTS_GET] Fetching reports for Project {project_id}")
 
-            project = await self.db.get(BuildingProject, project_id)
-            await self._assert_project_access(user_id, project_id, project)
+            await self._assert_project_access(user_id, project_id)
 
             # 2. Query
             page, limit = max(page, 1), min(limit, 100)
@@ -403,8 +407,7 @@ class ProjectSetupService:
                     status_code=status.HTTP_404_NOT_FOUND, detail="Report not found"
                 )
 
-            project = await self.db.get(BuildingProject, project_id)
-            await self._assert_project_access(user_id, project_id, project)
+            await self._assert_project_access(user_id, project_id)
 
             user = await self.db.get(User, report.submitted_by)
 
@@ -427,13 +430,15 @@ class ProjectSetupService:
     ):
         """Creates a new progress report for a project with optimized image uploads."""
         user_id = str(current_user.get("id"))
+        reservation = None
         try:
             logger.info(
                 f"[REPORT_CREATE] Start: User {user_id} creating report for Project {project_id}"
             )
 
             # 1. Permission Check
-            if not await self.perms_role.has_project_permission(user_id):
+            access = await self.access.resolve(user_id, project_id)
+            if not access.has_project_permission:
                 logger.warning(
                     f"[REPORT_CREATE] Permission Denied: User {user_id} on Project {project_id}"
                 )
@@ -441,8 +446,12 @@ class ProjectSetupService:
                     status_code=status.HTTP_403_FORBIDDEN, detail=self.permission
                 )
 
-            # check the usage for report creation:
-            if not await self.package_useage.has_report_package(project_id):
+            # Checks done; the write below opens its own short transaction
+            await release_connection(self.db)
+
+            # Reserve one report unit up front; released again if anything below fails
+            reservation = await self.entitlements.reserve(access, "reports")
+            if reservation is None:
                 logger.warning(
                     f"[REPORT_CREATE] Permission Denied: User {user_id} on Project {project_id}"
                 )
@@ -484,9 +493,6 @@ class ProjectSetupService:
                     uploads=images, report_id=report.id
                 )
 
-            # FINAL ATOMIC USAGE UPDATE (only if everything worked)
-            await self.package_useage.increment_report_usage(project_id)
-
             await self.db.commit()
             await self.db.refresh(report)
 
@@ -497,10 +503,12 @@ class ProjectSetupService:
 
         except HTTPException as http_exc:
             await self.db.rollback()
+            await self.entitlements.release(reservation)
             raise http_exc
 
         except Exception as e:
             await self.db.rollback()
+            await self.entitlements.release(reservation)
             logger.error(f"[REPORT_CREATE] Critical Error: {str(e)}", exc_info=True)
             raise Exception(f"Failed to create project report: {str(e)}")
 
@@ -520,14 +528,15 @@ class ProjectSetupService:
             )
 
             # 1. Permission Check
-            if not await self.perms_role.has_project_permission(user_id):
+            access = await self.access.resolve(user_id, project_id)
+            if not access.has_project_permission:
                 logger.warning(f"[REPORT_UPDATE] Permission Denied: User {user_id}")
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN, detail=self.permission
                 )
 
             # check the usage for report creation:
-            if not await self.package_useage.has_report_package(project_id):
+            if not await self.entitlements.has_package(access, "reports"):
                 logger.warning(
                     f"[REPORT_CREATE] Permission Denied: User {user_id} on Project {project_id}"
                 )
@@ -595,14 +604,15 @@ class ProjectSetupService:
                 f"[REPORT_DELETE] Start: User {user_id} deleting Report {report_id}"
             )
 
-            if not await self.perms_role.has_project_permission(user_id):
+            access = await self.access.resolve(user_id, project_id)
+            if not access.has_project_permission:
                 logger.warning(f"[REPORT_DELETE] Permission Denied: User {user_id}")
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN, detail=self.permission
                 )
 
             # check the usage for report creation:
-            if not await self.package_useage.has_report_package(project_id):
+            if not await self.entitlements.has_package(access, "reports"):
                 logger.warning(
                     f"[REPORT_CREATE] Permission Denied: User {user_id} on Project {project_id}"
                 )
@@ -642,6 +652,7 @@ class ProjectSetupService:
         current_user: dict = {},
     ):
         """Updates project details, handles image uploads, and manages existing media."""
+        new_images = orphans = []
         try:
             logger.info(
                 f"[PROJECT_UPDATE] Start: User {user_id} updating Project {project_id}"
@@ -680,33 +691,29 @@ class ProjectSetupService:
                     val.value if hasattr(val, "value") else str(val)
                 )
 
-            # Apply updates to model
-            for key, value in project_dict.items():
-                setattr(project_stmt, key, value)
-
-            await self.db.flush()
+            # Checks done; give the connection back for the uploads
+            await release_connection(self.db)
 
             # 4. Handle New Media Uploads
-            new_images = []
             if images:
                 logger.info(
                     f"[PROJECT_UPDATE] Uploading {len(images)} new images for Project {project_id}"
                 )
-                new_images = await asyncio.gather(
-                    *(
-                        upload_file_optimized(
-                            img, "project_image", user_id, current_user, "PROJECT"
-                        )
-                        for img in images
-                    )
+                new_images = orphans = await upload_files_bounded(
+                    images, "project_image", user_id, current_user, "PROJECT"
                 )
 
+            # 5. One short write transaction: fields and media together
+            for key, value in project_dict.items():
+                setattr(project_stmt, key, value)
+
             # Sync media (Remove old, add new)
             await self.media_upload.update_uploaded_project_media(
                 project_id, existing_image_ids, new_images
             )
 
             await self.db.commit()
+            orphans = []
             await self.db.refresh(project_stmt)
 
             logger.info(
@@ -716,9 +723,11 @@ class ProjectSetupService:
 
         except HTTPException as http_exc:
             await self.db.rollback()
+            await delete_uploaded_files(orphans)
             raise http_exc
         except Exception as e:
             await self.db.rollback()
+            await delete_uploaded_files(orphans)
             logger.error(f"[PROJECT_UPDATE] Critical Error: {str(e)}", exc_info=True)
             raise Exception(f"An error occurred while updating the project: {str(e)}")
 
@@ -763,103 +772,156 @@ class ProjectSetupService:
             logger.error(f"[PROJECT_DELETE] Critical Error: {str(e)}", exc_info=True)
             raise Exception(f"An error occurred while deleting the project: {str(e)}")
 
+    @staticmethod
+    def _payment_history_stmt():
+        """
+        ``PaymentHistory`` + ``Plan`` rows with the plan's package usage as one
+        JSON column, so a page of history is a single round-trip. Usage is only
+        reported for Active/Paid periods; other rows get an empty list.
+        """
+        used = (
+            select(func.coalesce(func.max(PlanPackageUsageCount.usage_count), 0))
+            .where(
+                PlanPackageUsageCount.project_id == PaymentHistory.project_id,
+                PlanPackageUsageCount.package_tag == Package.tag,
+                or_(
+                    PlanPackageUsageCount.payment_history == PaymentHistory.id,
+                    # Counters written back from Redis are per project, not per period
+                    PlanPackageUsageCount.payment_history.is_(None),
+                ),
+            )
+            .correlate(PaymentHistory, Package)
+            .scalar_subquery()
+        )
+        packages_usage = (
+            select(
+                func.coalesce(
+                    func.json_agg(
+                        aggregate_order_by(
+                            func.json_build_object(
+                                "name", Package.name,
+                                "tag", Package.tag,
+                                "limit", Package.count,
+                                "is_unlimited", Package.is_unlimited,
+                                "used", used,
+                            ),
+                            Package.tag,
+                        )
+                    ),
+                    literal_column("'[]'::json"),
+                )
+            )
+            .where(
+                Package.plan_id == Plan.id,
+                PaymentHistory.status.in_(["Active", "Paid"]),
+            )
+            .correlate(PaymentHistory, Plan)
+            .scalar_subquery()
+        )
+        return select(
+            PaymentHistory, Plan, packages_usage.label("packages_usage")
+        ).join(Plan, PaymentHistory.plan_id == Plan.id)
+
+    @staticmethod
+    def _serialize_payment(payment: PaymentHistory) -> dict:
+        data = {
+            column.key: getattr(payment, column.key)
+            for column in PaymentHistory.__table__.columns
+        }
+        data["cursor"] = (
+            encode_cursor(payment.updated_at, payment.id) if payment.updated_at else None
+        )
+        return data
+
     async def payments_history(
-        self, project_id: str, user_id: str, page: int = 1, limit: int = 20
+        self,
+        project_id: str,
+        user_id: str,
+        page: int = 1,
+        limit: int = 20,
+        cursor: Optional[str] = None,
     ):
-        """Fetches the full payment history for a specific project."""
+        """
+        Fetches the payment history of a project, newest first, in one query.
+
+        Pass ``meta_data.next_cursor`` back as ``cursor`` for a keyset seek on
+        ``(updated_at, id)``; ``page`` and ``total`` apply only without a cursor.
+        """
         try:
             logger.info(
                 f"[PAYMENTS] Fetching history for Project: {project_id} by User: {user_id}"
             )
-            page = max(page, 1)
-            limit = min(limit, 100)
-            offset = (page - 1) * limit
+            page, limit, offset = normalize_pagination(page, limit)
 
-            # Permission Check
-            # has_permission = await self.perms_role.has_project_permission(user_id)
-            # if not has_permission:
-            #     logger.warning(
-            #         f"[PAYMENTS] Access Denied: User {user_id} lacks permission for Project {project_id}"
-            #     )
-            #     raise HTTPException(
-            #         status_code=status.HTTP_403_FORBIDDEN, detail=self.permission
-            #     )
+            await self._assert_project_access(user_id, project_id)
 
-            project = await self.db.get(BuildingProject, project_id)
-            await self._assert_project_access(user_id, project_id, project)
-
-            # Query building
-            payments_stmt = (
-                select(PaymentHistory, Plan)
-                .join(Plan, PaymentHistory.plan_id == Plan.id)
-                .where(PaymentHistory.project_id == project_id)
-                .order_by(PaymentHistory.updated_at.desc())
-                .offset(offset)
-                .limit(limit)
+            stmt = self._payment_history_stmt().where(
+                PaymentHistory.project_id == project_id
             )
-            # attach the invoice it with it
+            if cursor:
+                try:
+                    updated_at, payment_id = decode_cursor(cursor)
+                except ValueError:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Invalid cursor",
+                    )
+                stmt = stmt.where(
+                    tuple_(PaymentHistory.updated_at, PaymentHistory.id)
+                    < tuple_(updated_at, UUID(payment_id))
+                )
+            else:
+                stmt = stmt.add_columns(func.count().over().label("total")).offset(offset)
 
-            result = await self.db.execute(payments_stmt)
-            rows = result.all()
+            # One extra row tells us whether another page exists
+            stmt = stmt.order_by(
+                PaymentHistory.updated_at.desc(), PaymentHistory.id.desc()
+            ).limit(limit + 1)
+            rows = (await self.db.execute(stmt)).all()
 
-            # Get Package and Package Usage For
+            has_more = len(rows) > limit
+            rows = rows[:limit]
 
             payments = []
-
-            packages_list = []
-
-            for payment, plan in rows:
-                if payment.status in ["Active", "Paid"]:
-                    usage_stmt = (
-                        select(Package, PlanPackageUsageCount.usage_count)
-                        .outerjoin(
-                            PlanPackageUsageCount,
-                            and_(
-                                PlanPackageUsageCount.package_tag == Package.tag,
-                                PlanPackageUsageCount.payment_history == payment.id,
-                                PlanPackageUsageCount.project_id == project_id,
-                            ),
-                        )
-                        .where(Package.plan_id == plan.id)
-                    )
-                    usage_result = await self.db.execute(usage_stmt)
-                    for pkg, used_count in usage_result.all():
-                        packages_list.append(
-                            {
-                                "name": pkg.name,
-                                "tag": pkg.tag,
-                                "limit": pkg.count,
-                                "is_unlimited": pkg.is_unlimited,
-                                "used": used_count
-                                or 0,  # Default to 0 if record doesn't exist
-                            }
-                        )
-
+            for row in rows:
+                plan = row.Plan
                 payments.append(
                     {
-                        **payment.__dict__,
+                        **self._serialize_payment(row.PaymentHistory),
                         "plan": {
                             "id": plan.id,
                             "name": plan.name,
                             "amount": plan.amount,
                             "currency": plan.currency,
                             "frequency": plan.frequency,
-                            "packages_usage": packages_list,
+                            "packages_usage": row.packages_usage,
                         },
                     }
                 )
 
-            count_stmt = (
-                select(func.count())
-                .select_from(PaymentHistory)
-                .where(PaymentHistory.project_id == project_id)
-            )
+            meta_data = {
+                "limit": limit,
+                "page": page,
+                "has_more": has_more,
+                "next_cursor": payments[-1]["cursor"] if has_more else None,
+            }
+            if not cursor:
+                # Past the last page the window is empty; fall back to a count
+                meta_data["total"] = (
+                    rows[0].total
+                    if rows
+                    else await self.db.scalar(
+                        select(func.count())
+                        .select_from(PaymentHistory)
+                        .where(PaymentHistory.project_id == project_id)
+                    )
+                )
+
             logger.info(
                 f"[PAYMENTS] Successfully retrieved {len(payments)} records for Project: {project_id}"
             )
-            total = await self.db.scalar(count_stmt)
             return {
-                "meta_data": {"limit": limit, "page": page, "total": total},
+                "meta_data": meta_data,
                 "data": payments,
                 "message": "Payment History fetched successfully",
             }
@@ -879,36 +941,24 @@ class ProjectSetupService:
     async def single_payments_history(
         self, project_id: str, user_id: str, payment_id: str
     ):
-        """Fetches a specific payment record by ID."""
+        """Fetches a specific payment record of the project by ID."""
         try:
             logger.info(
                 f"[PAYMENTS] Fetching Record: {payment_id} for Project: {project_id}"
             )
 
-            # Permission Check
-            # has_permission = await self.perms_role.has_project_permission(user_id)
-            # if not has_permission:
-            #     logger.warning(
-            #         f"[PAYMENTS] Access Denied: User {user_id} lacks permission to view record {payment_id}"
-            #     )
-            #     raise HTTPException(
-            #         status_code=status.HTTP_403_FORBIDDEN, detail=self.permission
-            #     )
-
-            project = await self.db.get(BuildingProject, project_id)
-            await self._assert_project_access(user_id, project_id, project)
-
-            stmt = (
-                select(PaymentHistory, Plan)
-                .join(Plan, PaymentHistory.plan_id == Plan.id)
-                .where(PaymentHistory.id == payment_id)
-            )
+            await self._assert_project_access(user_id, project_id)
 
-            result = await self.db.execute(stmt)
-
-            result_payment, plan = result.first()
+            row = (
+                await self.db.execute(
+                    self._payment_history_stmt().where(
+                        PaymentHistory.id == payment_id,
+                        PaymentHistory.project_id == project_id,
+                    )
+                )
+            ).first()
 
-            if not result_payment:
+            if row is None:
                 logger.warning(
                     f"[PAYMENTS] Not Found: Payment record {payment_id} does not exist"
                 )
@@ -921,38 +971,14 @@ class ProjectSetupService:
                 f"[PAYMENTS] Successfully retrieved payment record: {payment_id}"
             )
 
-            packages_list = []
-            if result_payment.status in ["Active", "Paid"]:
-                usage_stmt = (
-                    select(Package, PlanPackageUsageCount.usage_count)
-                    .outerjoin(
-                        PlanPackageUsageCount,
-                        and_(
-                            PlanPackageUsageCount.package_tag == Package.tag,
-                            PlanPackageUsageCount.payment_history == result_payment.id,
-                            PlanPackageUsageCount.project_id == project_id,
-                        ),
-                    )
-                    .where(Package.plan_id == plan.id)
-                )
-                usage_result = await self.db.execute(usage_stmt)
-                for pkg, used_count in usage_result.all():
-                    packages_list.append(
-                        {
-                            "name": pkg.name,
-                            "tag": pkg.tag,
-                            "limit": pkg.count,
-                            "is_unlimited": pkg.is_unlimited,
-                            "used": used_count
-                            or 0,  # Default to 0 if record doesn't exist
-                        }
-                    )
-            # Add to package
-            plan.package_usage = packages_list
-
-            # add to full payment
-            result_payment.plan = plan
-            return result_payment
+            plan = row.Plan
+            return {
+                **self._serialize_payment(row.PaymentHistory),
+                "plan": {
+                    **{column.key: getattr(plan, column.key) for column in Plan.__table__.columns},
+                    "package_usage": row.packages_usage,
+                },
+            }
 
         except HTTPException as http_exc:
             raise http_exc
@@ -1043,6 +1069,7 @@ class ProjectSetupService:
                 f"Internal server error while fetching single payment record: {str(e)}"
             )
 
+    @replica_reads
     async def get_all_project(
         self,
         user_id: str,
@@ -1056,87 +1083,13 @@ class ProjectSetupService:
                 f"[PROJECT_LIST] Fetching projects for User {user_id} (Page {page})"
             )
 
-            page = max(page, 1)
-            limit = min(limit, 100)
-            offset = (page - 1) * limit
-
-            # check the user permission
-
-            stmt = select(BuildingProject)
-
-            if project_status and project_status in [
-                "Active",
-                "Pending",
-                "Draft",
-                "Completed",
-                "Cancelled",
-            ]:
-                stmt = stmt.where(BuildingProject.status == project_status)
-
-            if project_status and project_status in [
-                "Expired",
-                "Awaiting_Payment",
-                "Paid",
-            ]:  # payment_status
-                stmt = stmt.where(BuildingProject.status == project_status)
-
-            # Execution
-            result = await self.db.execute(
-                stmt.order_by(BuildingProject.created_at.desc())
-                .offset(offset)
-                .limit(limit)
-            )
-
-            # Count total for meta_data
-            count_stmt = select(func.count()).select_from(BuildingProject)
-
-            if project_status:
-                count_stmt = count_stmt.where(BuildingProject.status == project_status)
-
-            total = await self.db.scalar(count_stmt)  # total count scale
-
-            projects = result.scalars().all()
-            # -------------------------
-            # Get images for projects
-            # -------------------------
-            project_ids = [p.id for p in projects]
-
-            image_stmt = (
-                select(ProjectUpload)
-                .where(ProjectUpload.project_id.in_(project_ids))
-                .order_by(ProjectUpload.uploaded_at.asc())
-            )
-
-            image_result = await self.db.execute(image_stmt)
-            images = image_result.scalars().all()
-
-            # group max 2 images per project
-            project_image_map = {}
-            for img in images:
-                pid = img.project_id
-                if pid not in project_image_map:
-                    project_image_map[pid] = []
-
-                if len(project_image_map[pid]) < 2:
-                    project_image_map[pid].append(img.file_url)
-
-            # attach images to projects
-            data = []
-            for project in projects:
-                project_dict = project.__dict__.copy()
-                project_dict["images"] = project_image_map.get(project.id, [])
-                data.append(project_dict)
-
-            return {
-                "meta_data": {"limit": limit, "page": page, "total": total},
-                "data": data,
-                "message": "Projects fetched successfully",
-            }
+            return await self._list_projects([], page, limit, project_status)
 
         except Exception as e:
             logger.error(f"[PROJECT_LIST] Error for User {user_id}: {str(e)}")
             raise Exception(f"Failed to fetch projects: {str(e)}")
 
+    @replica_reads
     async def get_inspector_project(
         self,
         user_id: str,
@@ -1150,111 +1103,13 @@ class ProjectSetupService:
                 f"[PROJECT_LIST] Fetching projects for User {user_id} (Page {page})"
             )
 
-            page = max(page, 1)
-            limit = min(limit, 100)
-            offset = (page - 1) * limit
-
-            # Filter by membership
-            subquery = select(ProjectMember.project_id).where(
+            memberships = select(ProjectMember.project_id).where(
                 ProjectMember.user_id == user_id
             )
-
-            stmt = select(BuildingProject).where(BuildingProject.id.in_(subquery))
-
-            if project_status and project_status in [
-                "Active",
-                "Pending",
-                "Draft",
-                "Completed",
-                "Cancelled",
-            ]:
-                stmt = stmt.where(BuildingProject.status == project_status)
-
-            # Execution
-            result = await self.db.execute(
-                stmt.order_by(BuildingProject.created_at.desc())
-                .offset(offset)
-                .limit(limit)
-            )
-
-            # Count total for meta_data
-            count_stmt = (
-                select(func.count())
-                .select_from(BuildingProject)
-                .where(BuildingProject.id.in_(subquery))
+            return await self._list_projects(
+                [BuildingProject.id.in_(memberships)], page, limit, project_status
             )
 
-            if project_status:
-                count_stmt = count_stmt.where(BuildingProject.status == project_status)
-
-            total = await self.db.scalar(count_stmt)  # total count scale
-
-            projects = result.scalars().all()
-            # -------------------------
-            # Get images for projects
-            # -------------------------
-            project_ids = [p.id for p in projects]
-
-            image_stmt = (
-                select(ProjectUpload)
-                .where(ProjectUpload.project_id.in_(project_ids))
-                .order_by(ProjectUpload.uploaded_at.asc())
-            )
-
-            image_result = await self.db.execute(image_stmt)
-            images = image_result.scalars().all()
-
-            # group max 2 images per project
-            project_image_map = {}
-            for img in images:
-                pid = img.project_id
-                if pid not in project_image_map:
-                    project_image_map[pid] = []
-
-                if len(project_image_map[pid]) < 2:
-                    project_image_map[pid].append(img.file_url)
-
-            # attach images to projects
-            data = []
-            for project in projects:
-                project_dict = project.__dict__.copy()
-                project_dict["images"] = project_image_map.get(project.id, [])
-                data.append(project_dict)
-
-            # Get all the plans without fiters
-            plans = await self.db.execute(select(Plan))
-            plans = plans.scalars().all()
-            plan_map = {plan.id: plan for plan in plans}
-
-            # add the plan details to the project as an map
-            for project in data:
-                project["plan"] = plan_map.get(project["plan_id"])
-
-            # add report count
-            report_count_stmt = (
-                select(
-                    ProjectReport.project_id,
-                    func.count(ProjectReport.id).label("report_count"),
-                )
-                .where(ProjectReport.project_id.in_(project_ids))
-                .group_by(ProjectReport.project_id)
-            )
-
-            report_count_result = await self.db.execute(report_count_stmt)
-            report_count_map = {
-                row.project_id: row.report_count for row in report_count_result.all()
-            }
-
-            # Attach report count to each project
-            for project in data:
-                project["report_count"] = report_count_map.get(project["id"], 0)
-
-            return {
-                "meta_data": {"limit": limit, "page": page, "total": total},
-                "data": data,
-                "message": "Projects fetched successfully",
-            }
-
         except Exception as e:
             logger.error(f"[PROJECT_LIST] Error for User {user_id}: {str(e)}")
             raise Exception(f"Failed to fetch projects: {str(e)}")
@@ -1265,91 +1120,8 @@ class ProjectSetupService:
             if not await self.perms_role.is_system_admin(user_id):
                 raise HTTPException(status_code=403, detail="Permission denied")
 
-            # -----------------------------
-            # 1. PROJECT ANALYTICS
-            # -----------------------------
-            project_stmt = select(
-                func.count().label("total_projects"),
-                func.count(case((BuildingProject.status == "Active", 1))).label(
-                    "active"
-                ),
-                func.count(case((BuildingProject.status == "Completed", 1))).label(
-                    "completed"
-                ),
-                func.count(case((BuildingProject.status == "Pending", 1))).label(
-                    "pending"
-                ),
-                func.count(case((BuildingProject.status == "Draft", 1))).label("draft"),
-            )
-
-            project_result = await self.db.execute(project_stmt)
-            project_data = project_result.first()
-
-            # -----------------------------
-            # 2. REPORT ANALYTICS
-            # -----------------------------
-            report_stmt = select(
-                func.count(ProjectReport.id).label("total_reports"),
-                func.count(case((ProjectReport.approved == False, 1))).label(
-                    "pending_reports"
-                ),
-            )
-
-            report_result = await self.db.execute(report_stmt)
-            report_data = report_result.first()
-
-            # -----------------------------
-            # 3. PAYMENT HISTORY ANALYTICS
-            # -----------------------------
-            payment_stmt = select(
-                func.count(PaymentHistory.id).label("total_payments"),
-                func.count(case((PaymentHistory.status == "Pending", 1))).label(
-                    "pending"
-                ),
-                func.count(
-                    case((PaymentHistory.status.in_(["Overdue", "Expired"]), 1))
-                ).label("overdue"),
-                func.count(
-                    case((PaymentHistory.status.in_(["Active", "Paid"]), 1))
-                ).label("paid"),
-                # Real-time late detection
-                func.count(
-                    case(
-                        (
-                            (PaymentHistory.next_billing_date < date.today())
-                            & (PaymentHistory.status != "Paid"),
-                            1,
-                        )
-                    )
-                ).label("late_payments"),
-            )
-
-            payment_result = await self.db.execute(payment_stmt)
-            payment_data = payment_result.first()
-
-            # -----------------------------
-            # FINAL RESPONSE
-            # -----------------------------
-            return {
-                "projects": {
-                    "total": project_data.total_projects,
-                    "active": project_data.active,
-                    "completed": project_data.completed,
-                    "pending": project_data.pending,
-                    "draft": project_data.draft,
-                },
-                "reports": {
-                    "total": report_data.total_reports,
-                    "pending": report_data.pending_reports,
-                },
-                "billing": {
-                    "total": payment_data.total_payments,
-                    "paid": payment_data.paid,
-                    "pending": payment_data.pending,
-                    "overdue": payment_data.overdue,
-                    "late_payments": payment_data.late_payments,
-                },
-            }
+            # Precomputed by the analytics refresh job; see AnalyticsService
+            return await AnalyticsService(self.db).global_summary()
 
         except HTTPException as http_e:
             raise http_e
@@ -1367,69 +1139,14 @@ class ProjectSetupService:
             if not await self.perms_role.is_system_admin(user_id):
                 raise HTTPException(status_code=403, detail="Permission denied")
 
-            # 1. Fetch project
-            project_stmt = select(BuildingProject).where(
-                BuildingProject.id == project_id,
+            project_exists = await self.db.scalar(
+                select(exists().where(BuildingProject.id == project_id))
             )
-            project_result = await self.db.execute(project_stmt)
-            project = project_result.scalar_one_or_none()
-
-            if not project:
+            if not project_exists:
                 return None
 
-            # 2. Reports analytics
-            report_stmt = select(
-                func.count(ProjectReport.id).label("total_reports"),
-                func.count(case((ProjectReport.approved == False, 1))).label(
-                    "pending_reports"
-                ),
-            ).where(ProjectReport.project_id == project_id)
-
-            report_result = await self.db.execute(report_stmt)
-            report_data = report_result.first()
-
-            # 3. Payment history analytics
-            payment_stmt = select(
-                func.count(PaymentHistory.id).label("total_payments"),
-                func.count(case((PaymentHistory.status == "Pending", 1))).label(
-                    "pending"
-                ),
-                func.count(
-                    case((PaymentHistory.status.in_(["Overdue", "Expired"]), 1))
-                ).label("overdue"),
-                func.count(
-                    case((PaymentHistory.status.in_(["Active", "Paid"]), 1))
-                ).label("paid"),
-                # Real-time late detection
-                func.count(
-                    case(
-                        (
-                            (PaymentHistory.next_billing_date < date.today())
-                            & (PaymentHistory.status != "Paid"),
-                            1,
-                        )
-                    )
-                ).label("late_payments"),
-            ).where(PaymentHistory.project_id == project_id)
-
-            payment_result = await self.db.execute(payment_stmt)
-            payment_data = payment_result.first()
+            return await AnalyticsService(self.db).project_summary(project_id)
 
-            # 4. Final response
-            return {
-                "project_id": project_id,
-                "reports": {
-                    "total": report_data.total_reports,
-                    "pending": report_data.pending_reports,
-                },
-                "billing": {
-                    "total": payment_data.total_payments,
-                    "paid": payment_data.paid,
-                    "pending": payment_data.pending,
-                    "overdue": payment_data.overdue,
-                    "late_payments": payment_data.late_payments,
-                },
-            }
         except HTTPException as http_e:
             raise http_e
 
@@ -1437,6 +1154,13 @@ class ProjectSetupService:
             logger.error(f"[PROJECT_ANALYTICS] Error for User {user_id}: {str(e)}")
             raise Exception(f"Failed to fetch analytics:")
 
+    async def rebuild_analytics(self, user_id: str):
+        if not await self.perms_role.is_system_admin(user_id):
+            raise HTTPException(status_code=403, detail="Permission denied")
+
+        await request_analytics_rebuild()
+        return {"message": "Analytics rebuild scheduled"}
+
     async def update_project_status(
         self, user_id: str, project_id: str, project_status: str
     ):
@@ -0,0 +1,294 @@
+import asyncio
+import hashlib
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.payments import WebhookEvent
+from services.payment_services import PaymentService
+from services.permission_service import PermissionService
+from settings import get_settings
+from utils.loggers import setup_logger
+from utils.pagination import normalize_pagination
+
+settings = get_settings()
+logger = setup_logger("Webhook_Service")
+
+PROCESS_TASK = "process_webhook_event"
+
+
+def webhook_event_key(provider: str, payload: dict) -> Tuple[str, str]:
+    """
+    ``(event_id, event_type)`` identifying a delivery. Stripe events carry an id;
+    Paystack ones do not, so the event name plus the charge id stands in for it
+    (falling back to a hash of the payload).
+    """
+    if provider == "STRIPE":
+        event_type = payload.get("type", "")
+        event_id = payload.get("id")
+    else:
+        event_type = payload.get("event", "")
+        data_id = (payload.get("data") or {}).get("id")
+        event_id = f"{event_type}:{data_id}" if data_id is not None else None
+
+    if not event_id:
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        event_id = hashlib.sha256(canonical.encode()).hexdigest()
+    return str(event_id), event_type or "unknown"
+
+
+async def enqueue_webhook_event(event_id) -> None:
+    """Hand an event to the Celery workers; the beat sweep retries a failed send."""
+    from worker.celery_worker import celery
+
+    try:
+        await asyncio.to_thread(celery.send_task, PROCESS_TASK, args=[str(event_id)])
+    except Exception as e:
+        logger.error(f"[Webhook] Failed to enqueue event {event_id}: {e}")
+
+
+class WebhookService:
+    """
+    Ledger-backed webhook pipeline.
+
+    ``record`` stores the verified payload and returns straight away; the unique
+    ``(provider, event_id)`` pair drops redeliveries. Celery workers call
+    ``process``. It claims the row with one conditional UPDATE, so only one
+    worker applies an event. Failed attempts back off exponentially until
+    ``webhook_max_attempts``, after which the event is parked as ``DEAD``.
+    """
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+        self.perms_role = PermissionService(db)
+
+    # ------------------------------------------------------------------
+    # Ingestion (request path)
+    # ------------------------------------------------------------------
+
+    async def record(self, provider: str, payload: dict) -> Optional[uuid.UUID]:
+        """Persist an event. Returns its id, or ``None`` for a duplicate delivery."""
+        event_id, event_type = webhook_event_key(provider, payload)
+        now = datetime.now(timezone.utc)
+
+        stmt = (
+            pg_insert(WebhookEvent)
+            .values(
+                id=uuid.uuid4(),
+                provider=provider,
+                event_id=event_id,
+                event_type=event_type,
+                payload=payload,
+                status="RECEIVED",
+                attempts=0,
+                next_attempt_at=now,
+                created_at=now,
+                updated_at=now,
+            )
+            .on_conflict_do_nothing(constraint="uq_webhookevent_provider_event_id")
+            .returning(WebhookEvent.id)
+        )
+        row_id = await self.db.scalar(stmt)
+        await self.db.commit()
+
+        if row_id is None:
+            logger.info(f"[Webhook] Duplicate {provider} event {event_id} ignored")
+            return None
+
+        logger.info(f"[Webhook] Recorded {provider} {event_type} event {event_id}")
+        await enqueue_webhook_event(row_id)
+        return row_id
+
+    # ------------------------------------------------------------------
+    # Processing (Celery)
+    # ------------------------------------------------------------------
+
+    async def _claim(self, row_id: str) -> Optional[WebhookEvent]:
+        now = datetime.now(timezone.utc)
+        stale = now - timedelta(seconds=settings.webhook_lock_timeout)
+        stmt = (
+            update(WebhookEvent)
+            .where(
+                WebhookEvent.id == row_id,
+                or_(
+                    and_(
+                        WebhookEvent.status.in_(("RECEIVED", "FAILED")),
+                        WebhookEvent.next_attempt_at <= now,
+                    ),
+                    # A worker died mid-event; take it over
+                    and_(
+                        WebhookEvent.status == "PROCESSING",
+                        WebhookEvent.locked_at < stale,
+                    ),
+                ),
+            )
+            .values(
+                status="PROCESSING",
+                attempts=WebhookEvent.attempts + 1,
+                locked_at=now,
+                updated_at=now,
+            )
+            .returning(WebhookEvent)
+            .execution_options(synchronize_session=False)
+        )
+        event = await self.db.scalar(stmt)
+        await self.db.commit()
+        return event
+
+    async def process(self, row_id: str) -> str:
+        """Apply one event. Returns the resulting status (``SKIPPED`` if not claimable)."""
+        event = await self._claim(row_id)
+        if event is None:
+            return "SKIPPED"
+
+        provider, payload, attempts = event.provider, event.payload, event.attempts
+        try:
+            await PaymentService(self.db).payment_webhook(payload, provider)
+        except Exception as e:
+            await self.db.rollback()
+            return await self._mark_failed(row_id, attempts, e)
+
+        now = datetime.now(timezone.utc)
+        await self.db.execute(
+            update(WebhookEvent)
+            .where(WebhookEvent.id == row_id)
+            .values(
+                status="PROCESSED",
+                processed_at=now,
+                locked_at=None,
+                last_error=None,
+                updated_at=now,
+            )
+        )
+        await self.db.commit()
+        logger.info(f"[Webhook] Processed {provider} event {row_id} (attempt {attempts})")
+        return "PROCESSED"
+
+    async def _mark_failed(self, row_id: str, attempts: int, error: Exception) -> str:
+        now = datetime.now(timezone.utc)
+        detail = error.detail if isinstance(error, HTTPException) else str(error)
+
+        if attempts >= settings.webhook_max_attempts:
+            new_status, next_attempt_at = "DEAD", None
+            logger.error(f"[Webhook] Event {row_id} dead after {attempts} attempts: {detail}")
+        else:
+            delay = min(
+                settings.webhook_retry_base_seconds * 2 ** (attempts - 1),
+                settings.webhook_retry_max_seconds,
+            )
+            new_status, next_attempt_at = "FAILED", now + timedelta(seconds=delay)
+            logger.warning(
+                f"[Webhook] Event {row_id} failed (attempt {attempts}), retry in {delay}s: {detail}"
+            )
+
+        await self.db.execute(
+            update(WebhookEvent)
+            .where(WebhookEvent.id == row_id)
+            .values(
+                status=new_status,
+                next_attempt_at=next_attempt_at,
+                locked_at=None,
+                last_error=str(detail)[:2000],
+                updated_at=now,
+            )
+        )
+        await self.db.commit()
+        return new_status
+
+    async def due_event_ids(self, limit: int = 100) -> list:
+        """Events a worker should pick up: due retries, unsent events and stale claims."""
+        now = datetime.now(timezone.utc)
+        stale = now - timedelta(seconds=settings.webhook_lock_timeout)
+        rows = await self.db.scalars(
+            select(WebhookEvent.id)
+            .where(
+                or_(
+                    and_(
+                        WebhookEvent.status.in_(("RECEIVED", "FAILED")),
+                        WebhookEvent.next_attempt_at <= now,
+                    ),
+                    and_(
+                        WebhookEvent.status == "PROCESSING",
+                        WebhookEvent.locked_at < stale,
+                    ),
+                )
+            )
+            .order_by(WebhookEvent.next_attempt_at)
+            .limit(limit)
+        )
+        return [str(row_id) for row_id in rows.all()]
+
+    # ------------------------------------------------------------------
+    # Dead letters
+    # ------------------------------------------------------------------
+
+    async def _require_system_admin(self, user_id: str) -> None:
+        # Dead letters carry full provider payment payloads
+        if not await self.perms_role.is_system_admin(user_id):
+            raise HTTPException(status_code=403, detail="Permission denied")
+
+    async def get_dead_letters(self, user_id: str, page: int = 1, limit: int = 20) -> dict:
+        await self._require_system_admin(user_id)
+        page, limit, offset = normalize_pagination(page, limit)
+        rows = (
+            await self.db.execute(
+                select(WebhookEvent, func.count().over().label("total"))
+                .where(WebhookEvent.status == "DEAD")
+                .order_by(WebhookEvent.updated_at.desc())
+                .offset(offset)
+                .limit(limit)
+            )
+        ).all()
+
+        total = rows[0].total if rows else 0
+        data = [
+            {
+                "id": str(event.id),
+                "provider": event.provider,
+                "event_id": event.event_id,
+                "event_type": event.event_type,
+                "attempts": event.attempts,
+                "last_error": event.last_error,
+                "created_at": event.created_at,
+                "updated_at": event.updated_at,
+                "payload": event.payload,
+            }
+            for event, _ in rows
+        ]
+        return {
+            "meta_data": {"limit": limit, "page": page, "total": total},
+            "data": data,
+            "message": "Dead webhook events fetched successfully",
+        }
+
+    async def requeue(self, user_id: str, row_id: str) -> dict:
+        """Give a dead event a fresh set of attempts."""
+        await self._require_system_admin(user_id)
+        now = datetime.now(timezone.utc)
+        requeued = await self.db.scalar(
+            update(WebhookEvent)
+            .where(WebhookEvent.id == row_id, WebhookEvent.status == "DEAD")
+            .values(
+                status="RECEIVED",
+                attempts=0,
+                next_attempt_at=now,
+                updated_at=now,
+            )
+            .returning(WebhookEvent.id)
+        )
+        await self.db.commit()
+
+        if requeued is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Dead webhook event not found",
+            )
+
+        await enqueue_webhook_event(requeued)
+        return {"message": "Webhook event requeued", "data": {"id": str(requeued)}}
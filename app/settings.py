@@ -34,6 +34,84 @@ class Settings(BaseSettings):
     # Async SQLAlchemy pool (per process). Increase if you run many workers × concurrent requests.
     db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "10"))
     db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    # Optional read replica (empty = off); reads fall back to the primary beyond this lag (seconds)
+    async_replica_database_url: str = os.getenv("ASYNC_REPLICA_DATABASE_URL", "")
+    db_replica_pool_size: int = int(os.getenv("DB_REPLICA_POOL_SIZE", "10"))
+    replica_max_lag: float = float(os.getenv("REPLICA_MAX_LAG", "2"))
+    replica_check_interval: float = float(os.getenv("REPLICA_CHECK_INTERVAL", "1"))
+    # Authenticated user principal cache (per-process LRU in front of Redis).
+    user_cache_local_size: int = int(os.getenv("USER_CACHE_LOCAL_SIZE", "2048"))
+    user_cache_local_ttl: int = int(os.getenv("USER_CACHE_LOCAL_TTL", "30"))
+    user_cache_redis_ttl: int = int(os.getenv("USER_CACHE_REDIS_TTL", "900"))
+    # Plan entitlements: in-process plan/package catalogue and Redis usage counters.
+    plan_catalogue_ttl: int = int(os.getenv("PLAN_CATALOGUE_TTL", "300"))
+    usage_counter_ttl: int = int(os.getenv("USAGE_COUNTER_TTL", "604800"))
+    # Shared outbound HTTP clients (Cloudinary, Paystack, SendGrid), per process and provider.
+    http_max_connections: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "50"))
+    http_max_keepalive_connections: int = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    http_keepalive_expiry: float = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+    http_connect_timeout: float = float(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))
+    http_read_timeout: float = float(os.getenv("HTTP_READ_TIMEOUT", "30"))
+    http_pool_timeout: float = float(os.getenv("HTTP_POOL_TIMEOUT", "10"))
+    http_upload_timeout: float = float(os.getenv("HTTP_UPLOAD_TIMEOUT", "60"))
+    http_retries: int = int(os.getenv("HTTP_RETRIES", "2"))
+    http_backoff_base: float = float(os.getenv("HTTP_BACKOFF_BASE", "0.25"))
+    # File uploads: Cloudinary uploads in flight per worker process and per request.
+    upload_global_concurrency: int = int(os.getenv("UPLOAD_GLOBAL_CONCURRENCY", "8"))
+    upload_request_concurrency: int = int(os.getenv("UPLOAD_REQUEST_CONCURRENCY", "3"))
+    # Chat WebSocket fan-out: per-socket send queue and stall limit before eviction.
+    ws_send_queue_size: int = int(os.getenv("WS_SEND_QUEUE_SIZE", "256"))
+    ws_send_timeout: float = float(os.getenv("WS_SEND_TIMEOUT", "5"))
+    # Chat WebSocket ingest: messages are written in micro-batches of this size / delay.
+    chat_ingest_batch_size: int = int(os.getenv("CHAT_INGEST_BATCH_SIZE", "100"))
+    chat_ingest_max_delay_ms: int = int(os.getenv("CHAT_INGEST_MAX_DELAY_MS", "20"))
+    chat_ingest_queue_size: int = int(os.getenv("CHAT_INGEST_QUEUE_SIZE", "5000"))
+    # Chat unread counters: participant list cache (s) and Redis counter hash TTL (s).
+    chat_participants_ttl: int = int(os.getenv("CHAT_PARTICIPANTS_TTL", "30"))
+    chat_unread_ttl: int = int(os.getenv("CHAT_UNREAD_TTL", "604800"))
+    # Password hashing thread pool (0 = one thread per CPU) and max calls waiting on it.
+    password_hash_workers: int = int(os.getenv("PASSWORD_HASH_WORKERS", "0"))
+    password_hash_max_pending: int = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "256"))
+    # Webhook ledger: attempts before dead-lettering, retry backoff and stale claim timeout (seconds)
+    webhook_max_attempts: int = int(os.getenv("WEBHOOK_MAX_ATTEMPTS", "8"))
+    webhook_retry_base_seconds: int = int(os.getenv("WEBHOOK_RETRY_BASE_SECONDS", "30"))
+    webhook_retry_max_seconds: int = int(os.getenv("WEBHOOK_RETRY_MAX_SECONDS", "3600"))
+    webhook_lock_timeout: int = int(os.getenv("WEBHOOK_LOCK_TIMEOUT", "300"))
+    # Email outbox: rows per drain batch, SendGrid calls per second per worker, retries (seconds)
+    email_outbox_batch_size: int = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", "100"))
+    email_rate_per_second: float = float(os.getenv("EMAIL_RATE_PER_SECOND", "10"))
+    email_max_attempts: int = int(os.getenv("EMAIL_MAX_ATTEMPTS", "6"))
+    email_retry_base_seconds: int = int(os.getenv("EMAIL_RETRY_BASE_SECONDS", "60"))
+    email_retry_max_seconds: int = int(os.getenv("EMAIL_RETRY_MAX_SECONDS", "3600"))
+    email_lock_timeout: int = int(os.getenv("EMAIL_LOCK_TIMEOUT", "300"))
+    # Rows expired per short transaction by the plan expiration job
+    plan_expiration_chunk_size: int = int(os.getenv("PLAN_EXPIRATION_CHUNK_SIZE", "500"))
+    # Projects read per page by the expiration reminder job
+    reminder_batch_size: int = int(os.getenv("REMINDER_BATCH_SIZE", "500"))
+    # Rate limiting: shared per-client bucket (tokens per period, seconds) and Redis budget per check
+    rate_limit_enabled: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    rate_limit_capacity: int = int(os.getenv("RATE_LIMIT_CAPACITY", "120"))
+    rate_limit_period: float = float(os.getenv("RATE_LIMIT_PERIOD", "60"))
+    rate_limit_redis_timeout: float = float(os.getenv("RATE_LIMIT_REDIS_TIMEOUT", "0.05"))
+    # Per-IP ceiling on "user"-scoped buckets, as a multiple of their capacity (shared NATs)
+    rate_limit_ip_factor: float = float(os.getenv("RATE_LIMIT_IP_FACTOR", "5"))
+    # Admission control: in-flight requests per route class (initial/min/max), overload targets (seconds)
+    admission_enabled: bool = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+    admission_read_limit: int = int(os.getenv("ADMISSION_READ_LIMIT", "40"))
+    admission_write_limit: int = int(os.getenv("ADMISSION_WRITE_LIMIT", "20"))
+    admission_min_limit: int = int(os.getenv("ADMISSION_MIN_LIMIT", "4"))
+    admission_max_limit: int = int(os.getenv("ADMISSION_MAX_LIMIT", "200"))
+    admission_target_pool_wait: float = float(os.getenv("ADMISSION_TARGET_POOL_WAIT", "0.05"))
+    admission_target_loop_lag: float = float(os.getenv("ADMISSION_TARGET_LOOP_LAG", "0.1"))
+    admission_sample_interval: float = float(os.getenv("ADMISSION_SAMPLE_INTERVAL", "0.5"))
+    # Prometheus: gauge refresh interval (s), bearer token for /metrics and /debug (empty = open;
+    # /debug hidden in production), Celery exporter port
+    metrics_sample_interval: float = float(os.getenv("METRICS_SAMPLE_INTERVAL", "5"))
+    metrics_token: str = os.getenv("METRICS_TOKEN", "")
+    worker_metrics_port: int = int(os.getenv("WORKER_METRICS_PORT", "9808"))
+    # SQL per request: identical statements flagged as N+1 from this count; fail over @query_budget (tests)
+    query_repeat_threshold: int = int(os.getenv("QUERY_REPEAT_THRESHOLD", "5"))
+    query_budget_strict: bool = os.getenv("QUERY_BUDGET_STRICT", "false").lower() == "true"
 
 
 def get_settings() -> Settings:
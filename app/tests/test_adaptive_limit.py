@@ -0,0 +1,52 @@
+"""Stdlib tests only — run from ``app/``: ``python3 -m unittest discover -s tests -p 'test_*.py'``"""
+
+import unittest
+
+from utils.adaptive_limit import AdaptiveLimit, Ewma
+
+
+class TestAdaptiveLimit(unittest.TestCase):
+    def test_rejects_beyond_limit_until_release(self):
+        limit = AdaptiveLimit(initial=2)
+        self.assertTrue(limit.acquire())
+        self.assertTrue(limit.acquire())
+        self.assertFalse(limit.acquire())
+
+        limit.release()
+        self.assertTrue(limit.acquire())
+        self.assertEqual(limit.stats(), {"limit": 2, "in_flight": 2, "admitted": 3, "rejected": 1})
+
+    def test_overload_shrinks_multiplicatively_down_to_min(self):
+        limit = AdaptiveLimit(initial=40, min_limit=4, backoff=0.5)
+        limit.adjust(overloaded=True)
+        self.assertEqual(limit.stats()["limit"], 20)
+        for _ in range(10):
+            limit.adjust(overloaded=True)
+        self.assertEqual(limit.stats()["limit"], 4)
+
+    def test_grows_only_when_limit_is_reached(self):
+        limit = AdaptiveLimit(initial=3, max_limit=4)
+        limit.adjust(overloaded=False)
+        self.assertEqual(limit.stats()["limit"], 3)
+
+        for _ in range(3):
+            limit.acquire()
+        limit.adjust(overloaded=False)
+        limit.adjust(overloaded=False)
+        self.assertEqual(limit.stats()["limit"], 4)
+
+        limit.acquire()
+        limit.adjust(overloaded=False)
+        self.assertEqual(limit.stats()["limit"], 4)
+
+
+class TestEwma(unittest.TestCase):
+    def test_moves_toward_samples(self):
+        avg = Ewma(alpha=0.5)
+        self.assertEqual(avg.add(1.0), 0.5)
+        self.assertEqual(avg.add(1.0), 0.75)
+        self.assertEqual(avg.add(0.0), 0.375)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+"""Stdlib tests only — run from ``app/``: ``python3 -m unittest discover -s tests -p 'test_*.py'``"""
+
+import importlib.util
+import unittest
+
+HAS_DEPS = all(
+    importlib.util.find_spec(name)
+    for name in ("fastapi", "sqlalchemy", "asyncpg", "redis", "prometheus_client")
+)
+
+
+@unittest.skipUnless(HAS_DEPS, "needs the app's dependencies (requirements.txt)")
+class TestIngestRowOrder(unittest.TestCase):
+    def _batch(self, batcher_module, n, start=0):
+        return [
+            batcher_module._PendingMessage(
+                "project-1", {"id": "user-1"}, f"message {start + i}", "text", future=None
+            )
+            for i in range(n)
+        ]
+
+    def test_rows_keep_submission_order(self):
+        from services import chat_ingest
+
+        batcher = chat_ingest.ChatIngestBatcher()
+        rows = batcher._rows(self._batch(chat_ingest, 50))
+        rows += batcher._rows(self._batch(chat_ingest, 50, start=50))
+
+        # History order: (created_at, id)
+        ordered = sorted(rows, key=lambda row: (row["created_at"], str(row["id"])))
+        self.assertEqual(
+            [row["content"] for row in ordered], [f"message {i}" for i in range(100)]
+        )
+        self.assertEqual(len({row["created_at"] for row in rows}), 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
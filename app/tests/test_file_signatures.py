@@ -0,0 +1,24 @@
+"""Stdlib tests only — run from ``app/``: ``python3 -m unittest discover -s tests -p 'test_*.py'``"""
+
+import unittest
+
+from utils.file_signatures import SNIFF_BYTES, sniff_file_type
+
+
+class TestSniffFileType(unittest.TestCase):
+    def test_known_signatures(self):
+        self.assertEqual(sniff_file_type(b"\xff\xd8\xff\xe0\x00\x10JFIF"), "jpg")
+        self.assertEqual(sniff_file_type(b"\x89PNG\r\n\x1a\n\x00\x00"), "png")
+        self.assertEqual(sniff_file_type(b"%PDF-1.7\n"), "pdf")
+
+    def test_rejects_renamed_or_short_files(self):
+        self.assertIsNone(sniff_file_type(b"<html><script>"))
+        self.assertIsNone(sniff_file_type(b"\x89PN"))
+        self.assertIsNone(sniff_file_type(b""))
+
+    def test_sniff_window_covers_longest_signature(self):
+        self.assertEqual(SNIFF_BYTES, 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+"""Stdlib tests only — run from ``app/``: ``python3 -m unittest discover -s tests -p 'test_*.py'``"""
+
+import unittest
+
+from utils.latency_stats import LatencyStats
+
+
+class TestLatencyStats(unittest.TestCase):
+    def test_percentiles_and_counts(self):
+        stats = LatencyStats()
+        for ms in range(1, 101):
+            stats.record("api.example.com", ms / 1000, error=ms > 98)
+
+        snap = stats.snapshot()["api.example.com"]
+        self.assertEqual(snap["count"], 100)
+        self.assertEqual(snap["errors"], 2)
+        self.assertEqual(snap["p50_ms"], 50)
+        self.assertEqual(snap["p95_ms"], 95)
+        self.assertEqual(snap["max_ms"], 100)
+
+    def test_window_keeps_latest_samples(self):
+        stats = LatencyStats(window=2)
+        for seconds in (5.0, 0.001, 0.002):
+            stats.record("host", seconds)
+
+        snap = stats.snapshot()["host"]
+        self.assertEqual(snap["count"], 3)
+        self.assertEqual(snap["max_ms"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
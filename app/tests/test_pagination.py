@@ -1,8 +1,10 @@
 """Stdlib tests only — run from ``app/``: ``python3 -m unittest discover -s tests -p 'test_*.py'``"""
 
 import unittest
+import uuid
+from datetime import datetime, timezone
 
-from utils.pagination import normalize_pagination
+from utils.pagination import decode_cursor, encode_cursor, normalize_pagination
 
 
 class TestNormalizePagination(unittest.TestCase):
@@ -23,5 +25,19 @@ class TestNormalizePagination(unittest.TestCase):
         self.assertEqual(off, 10)
 
 
+class TestCursor(unittest.TestCase):
+    def test_round_trip(self):
+        ts = datetime(2026, 3, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+        row_id = uuid.uuid4()
+        token = encode_cursor(ts, row_id)
+        self.assertNotIn("=", token)
+        self.assertEqual(decode_cursor(token), (ts, str(row_id)))
+
+    def test_rejects_garbage(self):
+        for token in ("", "not-a-cursor", encode_cursor(datetime.now(), "nope")):
+            with self.assertRaises(ValueError):
+                decode_cursor(token)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,110 @@
+"""Stdlib tests only — run from ``app/``: ``python3 -m unittest discover -s tests -p 'test_*.py'``
+
+Endpoint-level check of ``@query_budget`` declarations with strict mode on.
+Uses the same scratch Postgres database and seed as ``test_query_plans``::
+
+    TEST_DATABASE_URL=postgresql+asyncpg://.../query_plans \\
+    python3 -m unittest tests.test_query_budget
+"""
+
+import asyncio
+import importlib.util
+import os
+import unittest
+from unittest import mock
+
+DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+HAS_DEPS = all(
+    importlib.util.find_spec(name)
+    for name in ("fastapi", "httpx", "sqlalchemy", "asyncpg", "redis", "prometheus_client")
+)
+
+
+@unittest.skipUnless(
+    DATABASE_URL and HAS_DEPS,
+    "set TEST_DATABASE_URL to a scratch Postgres database (app dependencies installed)",
+)
+class TestPaymentHistoryQueryBudget(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        from sqlalchemy import event, text
+        from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+        from sqlalchemy.pool import NullPool
+
+        import models  # noqa: F401 - registers every table on Base.metadata
+        from tests.test_query_plans import SEED_SQL
+        from utils import db_setup
+
+        cls.metadata = db_setup.Base.metadata
+        # NullPool: TestClient runs the app on its own event loop
+        cls.engine = create_async_engine(DATABASE_URL, poolclass=NullPool)
+        for name, listener in (
+            ("before_cursor_execute", db_setup._before_cursor_execute),
+            ("after_cursor_execute", db_setup._after_cursor_execute),
+            ("handle_error", db_setup._drop_failed_query_timer),
+        ):
+            event.listen(cls.engine.sync_engine, name, listener)
+        cls.Session = async_sessionmaker(cls.engine, class_=AsyncSession, expire_on_commit=False)
+
+        async def seed():
+            async with cls.engine.begin() as conn:
+                await conn.run_sync(cls.metadata.drop_all)
+                await conn.run_sync(cls.metadata.create_all)
+                for sql in SEED_SQL:
+                    await conn.execute(text(sql))
+                return (await conn.execute(text("SELECT project_id, owner_id FROM hot"))).one()
+
+        hot = asyncio.run(seed())
+        cls.project_id, cls.owner_id = str(hot.project_id), str(hot.owner_id)
+
+    @classmethod
+    def tearDownClass(cls):
+        async def drop():
+            async with cls.engine.begin() as conn:
+                await conn.run_sync(cls.metadata.drop_all)
+            await cls.engine.dispose()
+
+        asyncio.run(drop())
+
+    def setUp(self):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+
+        from dependencies.auth import get_current_user
+        from middlewares import query_stats as query_stats_middleware
+        from middlewares.query_stats import QueryStatsMiddleware
+        from routers.project_router import router
+        from utils.db_setup import get_database
+
+        async def database():
+            async with self.Session() as session:
+                yield session
+
+        app = FastAPI()
+        app.include_router(router)
+        app.add_middleware(QueryStatsMiddleware)
+        app.dependency_overrides[get_database] = database
+        app.dependency_overrides[get_current_user] = lambda: {"id": self.owner_id}
+
+        strict = mock.patch.object(query_stats_middleware.settings, "query_budget_strict", True)
+        strict.start()
+        self.addCleanup(strict.stop)
+        self.client = TestClient(app, raise_server_exceptions=False)
+
+    def test_payment_history_stays_within_budget(self):
+        response = self.client.get(f"/projects/{self.project_id}/payment/history?limit=10")
+        self.assertEqual(response.status_code, 200, response.text)
+        self.assertIsInstance(response.json()["data"], list)
+
+    def test_statement_over_budget_fails_the_request(self):
+        from routers.project_router import get_subscriptions
+
+        # One fewer than the access lookup + page query the endpoint needs
+        with mock.patch.object(get_subscriptions, "__query_budget__", 1):
+            response = self.client.get(f"/projects/{self.project_id}/payment/history")
+        self.assertEqual(response.status_code, 500)
+        self.assertIn("Query budget of 1 exceeded", response.text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,268 @@
+"""Stdlib tests only — run from ``app/``: ``python3 -m unittest discover -s tests -p 'test_*.py'``
+
+EXPLAIN regression check for the hot query shapes. Needs a scratch Postgres
+database (its tables are created and dropped here) and the app's dependencies::
+
+    TEST_DATABASE_URL=postgresql+asyncpg://.../query_plans \\
+    python3 -m unittest tests.test_query_plans
+
+One "hot" project, owner and report hold most of the seeded rows, so using the
+wrong index (or none) means a large sort or scan the planner would avoid.
+"""
+
+import importlib.util
+import json
+import os
+import unittest
+
+DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+HAS_DRIVER = all(importlib.util.find_spec(name) for name in ("sqlalchemy", "asyncpg"))
+
+SEED_SQL = [
+    """
+    INSERT INTO "user" (id, first_name, last_name, email, password, role)
+    SELECT gen_random_uuid(), 'Seed', 'User', 'seed' || g || '@example.com', 'x', 'USER'
+    FROM generate_series(1, 500) g
+    """,
+    # Hot owner: the first user gets 1000 of the 5000 projects
+    """
+    WITH owners AS (SELECT array_agg(id ORDER BY email) AS ids FROM "user")
+    INSERT INTO buildingproject (id, name, project_type, budget, budget_currency, status,
+                                 owner_id, created_at, updated_at)
+    SELECT gen_random_uuid(), 'Project ' || g, 'RESIDENTIAL', 0, 'NGN',
+           (ARRAY['Active', 'Pending', 'Draft', 'Completed'])[1 + g % 4],
+           CASE WHEN g <= 1000 THEN owners.ids[1] ELSE owners.ids[1 + g % 500] END,
+           now() - g * interval '1 minute', now()
+    FROM generate_series(1, 5000) g, owners
+    """,
+    """
+    CREATE TEMP TABLE hot ON COMMIT DROP AS
+    SELECT id AS project_id, owner_id FROM buildingproject ORDER BY created_at DESC LIMIT 1
+    """,
+    # Per project: a few rows everywhere; the hot project gets thousands
+    """
+    INSERT INTO projectupload (id, project_id, file_url, file_type, uploaded_at)
+    SELECT gen_random_uuid(), p.id, 'https://example.com/' || g, 'image',
+           now() - g * interval '1 hour'
+    FROM buildingproject p
+    CROSS JOIN LATERAL generate_series(
+        1, CASE WHEN p.id = (SELECT project_id FROM hot) THEN 3000 ELSE 5 END) g
+    """,
+    """
+    INSERT INTO projectreport (id, project_id, title, report_type, report_date, submitted_by,
+                               created_at, updated_at)
+    SELECT gen_random_uuid(), p.id, 'Report ' || g, 'DAILY', current_date - g, p.owner_id,
+           now() - g * interval '1 day', now() - (g % 30) * interval '1 day' - interval '1 hour'
+    FROM buildingproject p
+    CROSS JOIN LATERAL generate_series(
+        1, CASE WHEN p.id = (SELECT project_id FROM hot) THEN 3000 ELSE 5 END) g
+    """,
+    """
+    INSERT INTO reportupload (id, report_id, file_url, file_type, uploaded_at)
+    SELECT gen_random_uuid(), r.id, 'https://example.com/r/' || g,
+           CASE WHEN g % 4 = 0 THEN 'image' ELSE 'document' END,
+           now() - g * interval '1 minute'
+    FROM projectreport r
+    CROSS JOIN LATERAL generate_series(
+        1, CASE WHEN r.title = 'Report 1' AND r.project_id = (SELECT project_id FROM hot)
+                THEN 2000 ELSE 2 END) g
+    """,
+    """
+    INSERT INTO paymenthistory (id, project_id, currency, amount, months, status,
+                                created_at, updated_at)
+    SELECT gen_random_uuid(), p.id, 'NGN', 1000, 1, 'Paid',
+           now() - g * interval '1 day', now() - g * interval '1 day'
+    FROM buildingproject p
+    CROSS JOIN LATERAL generate_series(
+        1, CASE WHEN p.id = (SELECT project_id FROM hot) THEN 3000 ELSE 5 END) g
+    """,
+    """
+    INSERT INTO planpackageusagecount (id, project_id, package_tag, usage_count)
+    SELECT gen_random_uuid(), p.id, tag, 1
+    FROM buildingproject p, unnest(ARRAY['projects', 'reports', 'storage', 'members']) tag
+    """,
+    """
+    INSERT INTO transaction (id, project_id, provider, provider_reference, currency, amount,
+                             status, payment_method)
+    SELECT gen_random_uuid(), p.id, 'PAYSTACK', 'ref-' || p.name, 'NGN', 1000, 'SUCCESS', 'card'
+    FROM buildingproject p
+    """,
+    """
+    INSERT INTO chatmessage (id, project_id, sender_id, content, message_type, is_read,
+                             created_at, updated_at)
+    SELECT gen_random_uuid(), p.id, p.owner_id, 'Message ' || g, 'text', false,
+           now() - g * interval '1 minute', now()
+    FROM buildingproject p
+    CROSS JOIN LATERAL generate_series(
+        1, CASE WHEN p.id = (SELECT project_id FROM hot) THEN 3000 ELSE 3 END) g
+    """,
+    "ANALYZE",
+]
+
+
+def _index_names(plan) -> set:
+    names = set()
+    nodes = [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if "Index Name" in node:
+            names.add(node["Index Name"])
+        nodes.extend(node.get("Plans", []))
+    return names
+
+
+@unittest.skipUnless(
+    DATABASE_URL and HAS_DRIVER,
+    "set TEST_DATABASE_URL to a scratch Postgres database (sqlalchemy + asyncpg)",
+)
+class TestHotQueryPlans(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        from sqlalchemy import text
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        import models  # noqa: F401 - registers every table on Base.metadata
+        from utils.db_setup import Base
+
+        self.metadata = Base.metadata
+        self.engine = create_async_engine(DATABASE_URL)
+        async with self.engine.begin() as conn:
+            await conn.run_sync(self.metadata.drop_all)
+            await conn.run_sync(self.metadata.create_all)
+            for sql in SEED_SQL:
+                await conn.execute(text(sql))
+            hot = (await conn.execute(text("SELECT project_id, owner_id FROM hot"))).one()
+            self.project_id, self.owner_id = hot.project_id, hot.owner_id
+            self.report_id = await conn.scalar(
+                text("SELECT id FROM projectreport WHERE project_id = :p AND title = 'Report 1'"),
+                {"p": self.project_id},
+            )
+
+    async def asyncTearDown(self):
+        async with self.engine.begin() as conn:
+            await conn.run_sync(self.metadata.drop_all)
+        await self.engine.dispose()
+
+    async def assertUsesIndex(self, stmt, index_name):
+        # Compiled for asyncpg itself: "$n::TYPE" placeholders bound positionally
+        compiled = stmt.compile(dialect=self.engine.dialect)
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+        async with self.engine.connect() as conn:
+            result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params)
+            plan = result.scalar()
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        self.assertIn(index_name, _index_names(plan), json.dumps(plan, indent=1))
+
+    async def test_project_list_first_images(self):
+        from sqlalchemy import select
+        from models.media_upload import ProjectUpload
+
+        await self.assertUsesIndex(
+            select(ProjectUpload.file_url, ProjectUpload.uploaded_at)
+            .where(ProjectUpload.project_id == self.project_id)
+            .order_by(ProjectUpload.uploaded_at.asc())
+            .limit(2),
+            "ix_projectupload_project_id_uploaded_at",
+        )
+
+    async def test_report_cover_image(self):
+        from sqlalchemy import select
+        from models.media_upload import ReportUpload
+
+        await self.assertUsesIndex(
+            select(ReportUpload)
+            .where(ReportUpload.report_id == self.report_id, ReportUpload.file_type == "image")
+            .order_by(ReportUpload.uploaded_at.asc())
+            .limit(1),
+            "ix_reportupload_report_id_uploaded_at_image",
+        )
+
+    async def test_report_listing(self):
+        from sqlalchemy import select
+        from models.project_report import ProjectReport
+
+        await self.assertUsesIndex(
+            select(ProjectReport)
+            .where(ProjectReport.project_id == self.project_id)
+            .order_by(ProjectReport.report_date.desc())
+            .limit(10),
+            "ix_projectreport_project_id_report_date",
+        )
+
+    async def test_payment_history_page(self):
+        from sqlalchemy import select
+        from models.plans import PaymentHistory
+
+        await self.assertUsesIndex(
+            select(PaymentHistory)
+            .where(PaymentHistory.project_id == self.project_id)
+            .order_by(PaymentHistory.updated_at.desc(), PaymentHistory.id.desc())
+            .limit(11),
+            "ix_paymenthistory_project_id_updated_at_id",
+        )
+
+    async def test_analytics_changed_since(self):
+        from datetime import datetime, timedelta, timezone
+        from sqlalchemy import select
+        from models.plans import PaymentHistory
+        from models.project_report import ProjectReport
+
+        since = datetime.now(timezone.utc) - timedelta(minutes=5)
+        await self.assertUsesIndex(
+            select(ProjectReport.project_id).where(ProjectReport.updated_at >= since),
+            "ix_projectreport_updated_at",
+        )
+        await self.assertUsesIndex(
+            select(PaymentHistory.project_id).where(
+                PaymentHistory.updated_at >= since, PaymentHistory.project_id.is_not(None)
+            ),
+            "ix_paymenthistory_updated_at",
+        )
+
+    async def test_owner_project_list(self):
+        from sqlalchemy import select
+        from models.building_project import BuildingProject
+
+        await self.assertUsesIndex(
+            select(BuildingProject.id)
+            .where(BuildingProject.owner_id == self.owner_id, BuildingProject.status == "Active")
+            .order_by(BuildingProject.created_at.desc())
+            .limit(10),
+            "ix_buildingproject_owner_id_status_created_at",
+        )
+
+    async def test_package_usage_sum(self):
+        from sqlalchemy import func, select
+        from models.plans import PlanPackageUsageCount
+
+        await self.assertUsesIndex(
+            select(func.coalesce(func.sum(PlanPackageUsageCount.usage_count), 0)).where(
+                PlanPackageUsageCount.project_id == self.project_id,
+                PlanPackageUsageCount.package_tag == "reports",
+            ),
+            "ix_planpackageusagecount_project_id_package_tag",
+        )
+
+    async def test_transaction_by_provider_reference(self):
+        from sqlalchemy import select
+        from models.payments import Transaction
+
+        await self.assertUsesIndex(
+            select(Transaction).where(Transaction.provider_reference == "ref-Project 42"),
+            "ix_transaction_provider_reference",
+        )
+
+    async def test_chat_history_page(self):
+        from sqlalchemy import select
+        from models.chat import ChatMessage
+
+        await self.assertUsesIndex(
+            select(ChatMessage)
+            .where(ChatMessage.project_id == self.project_id)
+            .order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+            .limit(21),
+            "ix_chatmessage_project_id_created_at_id",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""Stdlib tests only — run from ``app/``: ``python3 -m unittest discover -s tests -p 'test_*.py'``"""
+
+import unittest
+
+from utils import query_stats
+from utils.query_stats import QueryBudgetExceeded, QueryStats, assert_max_queries, query_budget
+
+
+def _run(stats: QueryStats, statement: str, seconds: float = 0.001) -> None:
+    stats.before(statement)
+    stats.after(statement, seconds)
+
+
+class TestQueryStats(unittest.TestCase):
+    def test_totals_slowest_and_server_timing(self):
+        stats = QueryStats()
+        _run(stats, "SELECT 1", 0.002)
+        _run(stats, "SELECT\n    2", 0.010)
+        stats.held(0.030)
+
+        self.assertEqual(stats.summary(), {
+            "queries": 2,
+            "db_ms": 12.0,
+            "slowest_ms": 10.0,
+            "slowest": "SELECT 2",
+            "transactions": 1,
+            "connection_ms": 30.0,
+        })
+        self.assertEqual(
+            stats.server_timing(),
+            'db;dur=12.0;desc="2 queries", db-conn;dur=30.0;desc="1 checkouts"',
+        )
+
+    def test_repeated_statements_are_n_plus_one_suspects(self):
+        stats = QueryStats()
+        for _ in range(5):
+            _run(stats, "SELECT * FROM report WHERE id = $1")
+        _run(stats, "SELECT * FROM project")
+
+        self.assertEqual(stats.repeated(5), [("SELECT * FROM report WHERE id = $1", 5)])
+
+    def test_budget_rejects_the_statement_over_it(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            with assert_max_queries(2) as stats:
+                for _ in range(3):
+                    stats.before("SELECT 1")
+        self.assertIsNone(query_stats.current())
+
+    def test_budget_source_reads_the_endpoint_declaration(self):
+        @query_budget(1)
+        async def endpoint():
+            pass
+
+        stats = QueryStats(budget_source=lambda: query_stats.endpoint_budget(endpoint))
+        stats.before("SELECT 1")
+        self.assertRaises(QueryBudgetExceeded, stats.before, "SELECT 1")
+
+    def test_no_budget_by_default(self):
+        stats, token = query_stats.begin()
+        try:
+            self.assertIs(query_stats.current(), stats)
+            for _ in range(100):
+                stats.before("SELECT 1")
+        finally:
+            query_stats.end(token)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+"""Stdlib tests only — run from ``app/``: ``python3 -m unittest discover -s tests -p 'test_*.py'``"""
+
+import importlib.util
+import unittest
+
+HAS_DEPS = all(importlib.util.find_spec(name) for name in ("starlette", "redis"))
+
+
+def _scope(path, token=None, ip="203.0.113.7", method="GET"):
+    headers = [(b"authorization", f"Bearer {token}".encode())] if token else []
+    return {"type": "http", "method": method, "path": path, "headers": headers, "client": (ip, 1234)}
+
+
+@unittest.skipUnless(HAS_DEPS, "needs starlette and redis")
+class TestRateLimitSpecs(unittest.TestCase):
+    def setUp(self):
+        from middlewares.rate_limiter import RateLimitMiddleware, RateLimitRule
+
+        self.middleware = RateLimitMiddleware(
+            app=None, rules=[RateLimitRule("api", 10, 60, scope="user")]
+        )
+
+    def test_rotating_tokens_share_an_ip_ceiling(self):
+        from settings import get_settings
+
+        ceiling = 10 * get_settings().rate_limit_ip_factor
+        allowed = sum(
+            self.middleware.local.take(self.middleware._specs(_scope("/api/v1/projects", f"x{n}")))[0]
+            for n in range(int(ceiling) + 5)
+        )
+        self.assertEqual(allowed, ceiling)
+
+    def test_anonymous_requests_use_the_ip_bucket(self):
+        keys = [spec.key for spec in self.middleware._specs(_scope("/api/v1/projects"))]
+        self.assertEqual(keys, ["rl:api:ip:203.0.113.7"])
+
+    def test_provider_webhooks_are_exempt(self):
+        import asyncio
+
+        from middlewares.rate_limiter import EXEMPT_PATHS
+
+        calls = []
+
+        async def app(scope, receive, send):
+            calls.append(scope["path"])
+
+        self.middleware.app = app
+        self.middleware.local.take = lambda specs: (False, 1.0)
+        for path in EXEMPT_PATHS:
+            asyncio.run(self.middleware(_scope(path, method="POST"), None, None))
+        self.assertEqual(sorted(calls), sorted(EXEMPT_PATHS))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+"""Stdlib tests only — run from ``app/``: ``python3 -m unittest discover -s tests -p 'test_*.py'``
+
+Needs two scratch Postgres databases standing in for primary and replica::
+
+    TEST_PRIMARY_DATABASE_URL=postgresql+asyncpg://.../routing_primary \\
+    TEST_REPLICA_DATABASE_URL=postgresql+asyncpg://.../routing_replica \\
+    python3 -m unittest tests.test_replica_routing
+
+Each database gets a ``routing_probe`` table whose single row names it, so a
+read shows which engine served it.
+"""
+
+import importlib.util
+import os
+import unittest
+
+PRIMARY_URL = os.getenv("TEST_PRIMARY_DATABASE_URL")
+REPLICA_URL = os.getenv("TEST_REPLICA_DATABASE_URL")
+HAS_DRIVER = all(importlib.util.find_spec(name) for name in ("sqlalchemy", "asyncpg"))
+
+
+@unittest.skipUnless(
+    PRIMARY_URL and REPLICA_URL and HAS_DRIVER,
+    "set TEST_PRIMARY_DATABASE_URL and TEST_REPLICA_DATABASE_URL (sqlalchemy + asyncpg)",
+)
+class TestReplicaRouting(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        from sqlalchemy import Column, Integer, MetaData, String, Table
+        from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+        from utils.db_routing import ReplicaMonitor, RoutingSession
+
+        self.probe = Table(
+            "routing_probe",
+            MetaData(),
+            Column("id", Integer, primary_key=True),
+            Column("source", String),
+        )
+        self.primary = create_async_engine(PRIMARY_URL)
+        self.replica = create_async_engine(REPLICA_URL)
+        for engine, source in ((self.primary, "primary"), (self.replica, "replica")):
+            async with engine.begin() as conn:
+                await conn.run_sync(self.probe.metadata.drop_all)
+                await conn.run_sync(self.probe.metadata.create_all)
+                await conn.execute(self.probe.insert().values(source=source))
+
+        self.monitor = ReplicaMonitor(self.replica, max_lag=5, interval=1)
+        self.assertTrue(await self.monitor.check())
+        self.Session = async_sessionmaker(
+            self.primary,
+            class_=AsyncSession,
+            sync_session_class=RoutingSession,
+            replica=self.replica.sync_engine,
+            replica_available=self.monitor.available,
+            expire_on_commit=False,
+        )
+
+    async def asyncTearDown(self):
+        for engine in (self.primary, self.replica):
+            async with engine.begin() as conn:
+                await conn.run_sync(self.probe.metadata.drop_all)
+            await engine.dispose()
+
+    async def _sources(self, session, for_update=False):
+        from sqlalchemy import select
+
+        stmt = select(self.probe.c.source).order_by(self.probe.c.id)
+        if for_update:
+            stmt = stmt.with_for_update()
+        return list((await session.scalars(stmt)).all())
+
+    async def test_reads_use_primary_unless_opted_in(self):
+        from utils.db_routing import use_replica
+
+        async with self.Session() as session:
+            self.assertEqual(await self._sources(session), ["primary"])
+            with use_replica(session):
+                self.assertEqual(await self._sources(session), ["replica"])
+            self.assertEqual(await self._sources(session), ["primary"])
+
+    async def test_session_reads_its_own_writes_after_a_write(self):
+        from utils.db_routing import use_replica
+
+        async with self.Session() as session:
+            with use_replica(session):
+                self.assertEqual(await self._sources(session), ["replica"])
+                await session.execute(self.probe.insert().values(source="written"))
+                self.assertEqual(await self._sources(session), ["primary", "written"])
+                await session.commit()
+                # Still sticky after the commit, for the rest of the request
+                self.assertEqual(await self._sources(session), ["primary", "written"])
+
+    async def test_locking_reads_go_to_primary(self):
+        from utils.db_routing import use_replica
+
+        async with self.Session() as session:
+            with use_replica(session):
+                self.assertEqual(await self._sources(session, for_update=True), ["primary"])
+
+    async def test_lagging_replica_falls_back_to_primary(self):
+        from utils.db_routing import use_replica
+
+        self.monitor.max_lag = -1
+        self.assertFalse(await self.monitor.check())
+        async with self.Session() as session:
+            with use_replica(session):
+                self.assertEqual(await self._sources(session), ["primary"])
+        self.assertEqual(self.monitor.stats()["primary_fallbacks"], 1)
+
+    async def test_replica_reads_decorator(self):
+        from utils.db_routing import replica_reads
+
+        test = self
+
+        class ReportService:
+            def __init__(self, db):
+                self.db = db
+
+            @replica_reads
+            async def list_sources(self):
+                return await test._sources(self.db)
+
+        async with self.Session() as session:
+            self.assertEqual(await ReportService(session).list_sources(), ["replica"])
+            self.assertEqual(await self._sources(session), ["primary"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""Stdlib tests only — run from ``app/``: ``python3 -m unittest discover -s tests -p 'test_*.py'``"""
+
+import unittest
+
+from utils.client_ip import client_ip
+from utils.token_bucket import BucketSpec, LocalTokenBuckets
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLocalTokenBuckets(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.buckets = LocalTokenBuckets(maxsize=2, clock=self.clock)
+
+    def test_burst_then_refill(self):
+        spec = BucketSpec("ip:1", capacity=2, rate=1)
+        self.assertEqual(self.buckets.take([spec]), (True, 0.0))
+        self.assertEqual(self.buckets.take([spec]), (True, 0.0))
+        allowed, retry_after = self.buckets.take([spec])
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(retry_after, 1.0)
+        self.clock.now = 1.0
+        self.assertTrue(self.buckets.take([spec])[0])
+
+    def test_cost_weight(self):
+        spec = BucketSpec("ip:1", capacity=10, rate=1, cost=6)
+        self.assertTrue(self.buckets.take([spec])[0])
+        allowed, retry_after = self.buckets.take([spec])
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(retry_after, 2.0)
+
+    def test_all_or_nothing(self):
+        loose = BucketSpec("api:1", capacity=5, rate=1)
+        tight = BucketSpec("otp:1", capacity=1, rate=0.1)
+        self.assertTrue(self.buckets.take([loose, tight])[0])
+        allowed, retry_after = self.buckets.take([loose, tight])
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(retry_after, 10.0)
+        # The loose bucket was not charged by the rejected request
+        for _ in range(4):
+            self.assertTrue(self.buckets.take([loose])[0])
+        self.assertFalse(self.buckets.take([loose])[0])
+
+    def test_evicted_key_starts_full(self):
+        a = BucketSpec("a", capacity=1, rate=0.01)
+        self.assertTrue(self.buckets.take([a])[0])
+        self.buckets.take([BucketSpec("b", capacity=1, rate=1)])
+        self.buckets.take([BucketSpec("c", capacity=1, rate=1)])
+        self.assertTrue(self.buckets.take([a])[0])
+
+
+class TestClientIp(unittest.TestCase):
+    def test_header_precedence(self):
+        headers = {"cf-connecting-ip": "1.1.1.1", "x-real-ip": "2.2.2.2"}
+        self.assertEqual(client_ip(headers, "10.0.0.1"), "1.1.1.1")
+        self.assertEqual(client_ip({"x-real-ip": "2.2.2.2"}, "10.0.0.1"), "2.2.2.2")
+
+    def test_forwarded_for_chain_uses_first_hop(self):
+        headers = {"x-forwarded-for": "3.3.3.3, 10.0.0.2"}
+        self.assertEqual(client_ip(headers, "10.0.0.1"), "3.3.3.3")
+
+    def test_falls_back_to_socket_peer(self):
+        self.assertEqual(client_ip({}, "10.0.0.1"), "10.0.0.1")
+        self.assertEqual(client_ip({}, None), "unknown")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+"""Stdlib tests only — run from ``app/``: ``python3 -m unittest discover -s tests -p 'test_*.py'``"""
+
+import unittest
+
+from utils.ttl_cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = TTLCache(maxsize=2, ttl=10, clock=self.clock)
+
+    def test_entry_expires_after_ttl(self):
+        self.cache.set("a", 1)
+        self.clock.now = 9.9
+        self.assertEqual(self.cache.get("a"), 1)
+        self.clock.now = 10
+        self.assertIsNone(self.cache.get("a"))
+
+    def test_evicts_least_recently_used(self):
+        self.cache.set("a", 1)
+        self.cache.set("b", 2)
+        self.cache.get("a")
+        self.cache.set("c", 3)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.get("a"), 1)
+
+    def test_discard_where(self):
+        self.cache.set(("u1", "100"), {})
+        self.cache.set(("u2", "100"), {})
+        removed = self.cache.discard_where(lambda key: key[0] == "u1")
+        self.assertEqual(removed, 1)
+        self.assertIsNone(self.cache.get(("u1", "100")))
+        self.assertIsNotNone(self.cache.get(("u2", "100")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+"""Stdlib tests only — run from ``app/``: ``python3 -m unittest discover -s tests -p 'test_*.py'``
+
+Needs the app's dependencies; the database is never reached because the admin
+check fails first.
+"""
+
+import importlib.util
+import unittest
+from unittest import mock
+
+HAS_DEPS = all(
+    importlib.util.find_spec(name)
+    for name in ("fastapi", "sqlalchemy", "asyncpg", "httpx", "stripe", "dateutil")
+)
+
+
+@unittest.skipUnless(HAS_DEPS, "needs the app's dependencies (requirements.txt)")
+class TestDeadLetterAdminOnly(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        from services.permission_service import PermissionService
+        from services.webhook_service import WebhookService
+
+        patcher = mock.patch.object(
+            PermissionService, "is_system_admin", mock.AsyncMock(return_value=False)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.db = mock.AsyncMock()
+        self.service = WebhookService(db=self.db)
+
+    async def test_non_admin_cannot_list_dead_letters(self):
+        from fastapi import HTTPException
+
+        with self.assertRaises(HTTPException) as ctx:
+            await self.service.get_dead_letters(user_id="user-1")
+        self.assertEqual(ctx.exception.status_code, 403)
+        self.db.execute.assert_not_called()
+
+    async def test_non_admin_cannot_requeue(self):
+        from fastapi import HTTPException
+
+        with self.assertRaises(HTTPException) as ctx:
+            await self.service.requeue(user_id="user-1", row_id="event-1")
+        self.assertEqual(ctx.exception.status_code, 403)
+        self.db.scalar.assert_not_called()
+        self.db.commit.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import math
+from typing import Any, Dict
+
+
+class Ewma:
+    """Exponentially weighted moving average; ``alpha`` is the weight of a new sample."""
+
+    def __init__(self, alpha: float = 0.3) -> None:
+        self.alpha = alpha
+        self.value = 0.0
+
+    def add(self, sample: float) -> float:
+        self.value += self.alpha * (sample - self.value)
+        return self.value
+
+
+class AdaptiveLimit:
+    """
+    AIMD concurrency limit (no I/O).
+
+    ``acquire`` admits while fewer than ``limit`` calls are in flight. ``adjust``
+    is fed one overload verdict per sampling tick: the limit shrinks by
+    ``backoff`` when overloaded and grows by one slot per tick while healthy and
+    actually used, between ``min_limit`` and ``max_limit``.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        min_limit: int = 1,
+        max_limit: int = 1000,
+        backoff: float = 0.75,
+    ) -> None:
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.limit = float(min(max(initial, min_limit), max_limit))
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    def acquire(self) -> bool:
+        if self.in_flight >= math.floor(self.limit):
+            self.rejected += 1
+            return False
+        self.in_flight += 1
+        self.admitted += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        return True
+
+    def release(self) -> None:
+        self.in_flight = max(self.in_flight - 1, 0)
+
+    def adjust(self, overloaded: bool) -> None:
+        if overloaded:
+            self.limit = max(self.limit * self.backoff, self.min_limit)
+        elif self.peak_in_flight >= math.floor(self.limit) - 1:
+            # Only grow a limit that is being reached, so an idle period does
+            # not ratchet it up to max_limit
+            self.limit = min(self.limit + 1, self.max_limit)
+        self.peak_in_flight = self.in_flight
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": math.floor(self.limit),
+            "in_flight": self.in_flight,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,18 @@
+from typing import Mapping, Optional
+
+
+def client_ip(headers: Mapping[str, str], client_host: Optional[str]) -> str:
+    """
+    Real client address behind Cloudflare / Caddy (no I/O). Header names are
+    matched case-insensitively by Starlette's ``Headers``; pass lowercase keys
+    otherwise. ``X-Forwarded-For`` may list a proxy chain; the first entry is
+    the client.
+    """
+    forwarded_for = headers.get("x-forwarded-for")
+    return (
+        headers.get("cf-connecting-ip")  # real IP from Cloudflare
+        or headers.get("x-real-ip")
+        or (forwarded_for.split(",")[0].strip() if forwarded_for else None)
+        or client_host
+        or "unknown"
+    )
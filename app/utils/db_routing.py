@@ -0,0 +1,150 @@
+import asyncio
+import functools
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from sqlalchemy import Engine, Select, event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+
+from utils.loggers import setup_logger
+
+logger = setup_logger("DB_Routing")
+
+# Seconds behind the primary; 0 when caught up or not a streaming standby
+REPLICA_LAG_SQL = text(
+    """
+    SELECT COALESCE(
+        CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+             ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+        END, 0)
+    """
+)
+
+
+class RoutingSession(Session):
+    """
+    Session that sends plain SELECTs to a read replica inside ``use_replica``.
+
+    Everything else goes to the primary: DML, ``FOR UPDATE``, flushes, and every
+    statement after the session's first write, so a request reads its own
+    writes. Reads also stay on the primary while ``replica_available`` says the
+    replica is down or lagging.
+    """
+
+    def __init__(
+        self,
+        *args: Any,
+        replica: Optional[Engine] = None,
+        replica_available: Optional[Callable[[], bool]] = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.replica = replica
+        self.replica_available = replica_available or (lambda: True)
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.replica is not None and self._reads_from_replica(clause):
+            return self.replica
+        if clause is not None and not isinstance(clause, Select):
+            self.info["read_your_writes"] = True
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+    def _reads_from_replica(self, clause) -> bool:
+        if not self.info.get("use_replica") or self.info.get("read_your_writes") or self._flushing:
+            return False
+        if not isinstance(clause, Select) or clause._for_update_arg is not None:
+            return False
+        return self.replica_available()
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _stick_to_primary(session, flush_context):
+    session.info["read_your_writes"] = True
+
+
+@contextmanager
+def use_replica(session: AsyncSession) -> Iterator[None]:
+    """Route this block's reads on ``session`` to the replica (see ``RoutingSession``)."""
+    previous = session.info.get("use_replica", False)
+    session.info["use_replica"] = True
+    try:
+        yield
+    finally:
+        session.info["use_replica"] = previous
+
+
+def replica_reads(method: Callable) -> Callable:
+    """Run a read-only service method (on ``self.db``) against the replica."""
+
+    @functools.wraps(method)
+    async def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+        with use_replica(self.db):
+            return await method(self, *args, **kwargs)
+
+    return wrapper
+
+
+class ReplicaMonitor:
+    """
+    Polls the replica's replay lag every ``interval`` seconds. The replica is
+    used only while the last check succeeded within ``max_lag``; it starts out
+    unavailable until the first check passes.
+    """
+
+    def __init__(self, engine: AsyncEngine, max_lag: float, interval: float) -> None:
+        self.engine = engine
+        self.max_lag = max_lag
+        self.interval = interval
+        self.healthy = False
+        self.lag: Optional[float] = None
+        self.fallbacks = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def available(self) -> bool:
+        if not self.healthy:
+            self.fallbacks += 1
+        return self.healthy
+
+    async def check(self) -> bool:
+        try:
+            async with self.engine.connect() as conn:
+                self.lag = float(await conn.scalar(REPLICA_LAG_SQL))
+            healthy = self.lag <= self.max_lag
+        except Exception as e:
+            logger.warning(f"[Replica] Lag check failed: {e}")
+            self.lag = None
+            healthy = False
+
+        if healthy != self.healthy:
+            logger.warning(
+                f"[Replica] {'Using' if healthy else 'Bypassing'} replica (lag={self.lag})"
+            )
+        self.healthy = healthy
+        return healthy
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "healthy": self.healthy,
+            "lag_seconds": self.lag,
+            "max_lag_seconds": self.max_lag,
+            "primary_fallbacks": self.fallbacks,
+        }
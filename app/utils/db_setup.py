@@ -1,11 +1,17 @@
 from utils.loggers import setup_logger
+import time
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     create_async_engine,
     async_sessionmaker,
 )
-from sqlalchemy.orm import declarative_base
+from sqlalchemy import TextClause, event
+from sqlalchemy.orm import Session, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from settings import get_settings
+from utils.metrics import DB_CONNECTION_HOLD, DB_POOL_CHECKOUT_WAIT
+from utils import query_stats
+from utils.db_routing import ReplicaMonitor, RoutingSession
 
 
 # initialize settings
@@ -16,19 +22,145 @@ logger = setup_logger("Database Setup")
 # Initial Setup
 ASYNC_DATABASE_URL = settings.async_database_url
 
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that exposes checkout pressure: checkouts currently blocked on an
+    empty pool, and the longest completed wait since it was last read.
+    """
+
+    waiting = 0
+    worst_wait = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        TimedQueuePool.waiting += 1
+        try:
+            return super()._do_get()
+        finally:
+            TimedQueuePool.waiting -= 1
+            waited = time.perf_counter() - started
+            DB_POOL_CHECKOUT_WAIT.observe(waited)
+            if waited > TimedQueuePool.worst_wait:
+                TimedQueuePool.worst_wait = waited
+
+    @classmethod
+    def take_worst_wait(cls) -> float:
+        waited, cls.worst_wait = cls.worst_wait, 0.0
+        return waited
+
+
 # create database engine
 engine = create_async_engine(
     ASYNC_DATABASE_URL,
     echo=False,
     pool_pre_ping=True,
+    poolclass=TimedQueuePool,
     pool_size=settings.db_pool_size,
     max_overflow=settings.db_max_overflow,
 )
 
+# Optional read replica for service methods marked @replica_reads (utils/db_routing.py)
+replica_engine = (
+    create_async_engine(
+        settings.async_replica_database_url,
+        echo=False,
+        pool_pre_ping=True,
+        poolclass=TimedQueuePool,
+        pool_size=settings.db_replica_pool_size,
+        max_overflow=settings.db_max_overflow,
+    )
+    if settings.async_replica_database_url
+    else None
+)
+replica_monitor = (
+    ReplicaMonitor(
+        replica_engine,
+        max_lag=settings.replica_max_lag,
+        interval=settings.replica_check_interval,
+    )
+    if replica_engine is not None
+    else None
+)
+
+
+# Per-request statement counts and timings (middlewares/query_stats.py); the
+# context variable reaches these sync events through SQLAlchemy's greenlet bridge
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = query_stats.current()
+    if stats is not None:
+        stats.before(statement)
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = query_stats.current()
+    started = conn.info.get("query_started")
+    if stats is not None and started:
+        stats.after(statement, time.perf_counter() - started.pop())
+
+
+def _drop_failed_query_timer(exception_context):
+    conn = exception_context.connection
+    started = conn.info.get("query_started") if conn is not None else None
+    if started:
+        started.pop()
+
+
+for _engine in filter(None, (engine, replica_engine)):
+    event.listen(_engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(_engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(_engine.sync_engine, "handle_error", _drop_failed_query_timer)
+
+
+# Connection hold time: a session takes a pooled connection at its first statement
+# and gives it back when the transaction ends (commit, rollback or close)
+@event.listens_for(Session, "after_begin")
+def _connection_acquired(session, transaction, connection):
+    session.info.setdefault("connection_acquired_at", time.perf_counter())
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_written(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_executed_write(orm_execute_state):
+    # Core DML and text() never flush; locking reads keep their locks until commit
+    statement = orm_execute_state.statement
+    if orm_execute_state.is_select:
+        writes = getattr(statement, "_for_update_arg", None) is not None
+    elif isinstance(statement, TextClause):
+        writes = not statement.text.lstrip().lower().startswith("select")
+    else:
+        writes = True
+    if writes:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _connection_released(session, transaction):
+    if transaction.parent is not None:
+        return
+    session.info.pop("wrote", None)
+    started = session.info.pop("connection_acquired_at", None)
+    if started is None:
+        return
+    held = time.perf_counter() - started
+    DB_CONNECTION_HOLD.observe(held)
+    stats = query_stats.current()
+    if stats is not None:
+        stats.held(held)
+
+
 # create database session
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    replica=replica_engine.sync_engine if replica_engine is not None else None,
+    replica_available=replica_monitor.available if replica_monitor is not None else None,
     expire_on_commit=False,
 )
 
@@ -36,11 +168,32 @@ AsyncSessionLocal = async_sessionmaker(
 Base = declarative_base()
 
 
-# Database dependency function
+# Database dependency function. Creating the session is free: it checks out a
+# pool connection at its first statement and returns it when that transaction ends.
 async def get_database() -> AsyncSession:
     async with AsyncSessionLocal() as session:
-        logger.info("Starting Database Session..........")
+        logger.debug("Starting Database Session..........")
         try:
             yield session
         finally:
-            logger.info("Close Database Session..........")
+            logger.debug("Close Database Session..........")
+
+
+async def release_connection(session: AsyncSession) -> None:
+    """
+    End a read-only transaction so its connection goes back to the pool before
+    slow non-DB work (uploads, provider calls). The session stays usable and
+    loaded objects stay populated (``expire_on_commit=False``); the next
+    statement checks out a connection again. A transaction that wrote (ORM
+    flush, Core DML, ``text()`` or a locking read) or has unflushed changes is
+    left to its owner.
+    """
+    if (
+        not session.in_transaction()
+        or session.info.get("wrote")
+        or session.new
+        or session.dirty
+        or session.deleted
+    ):
+        return
+    await session.commit()
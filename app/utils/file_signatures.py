@@ -0,0 +1,19 @@
+from typing import Optional
+
+# Leading bytes of each upload type we accept (no I/O)
+SIGNATURES = (
+    (b"\xff\xd8\xff", "jpg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"%PDF-", "pdf"),
+)
+
+# Enough bytes to tell every signature above apart
+SNIFF_BYTES = max(len(magic) for magic, _ in SIGNATURES)
+
+
+def sniff_file_type(head: bytes) -> Optional[str]:
+    """Return ``"jpg"``, ``"png"`` or ``"pdf"`` from the file's first bytes, else ``None``."""
+    for magic, file_type in SIGNATURES:
+        if head.startswith(magic):
+            return file_type
+    return None
@@ -4,9 +4,11 @@ from fastapi import UploadFile, HTTPException
 from settings import get_settings
 import logging
 import asyncio
+from typing import List
 
 # import cloudinary.uploader
 from services.cloudinary_service import get_cloudinary
+from utils.file_signatures import SNIFF_BYTES, sniff_file_type
 
 # Initialize settings
 settings = get_settings()
@@ -14,6 +16,19 @@ settings = get_settings()
 cloudinary_upload = get_cloudinary()
 logger = logging.getLogger(__name__)
 
+ALLOWED_FILE_TYPES = {"jpg", "png", "pdf"}
+MAX_IMAGE_SIZE = 2 * 1024 * 1024  # 2MB
+MAX_PDF_SIZE = 5 * 1024 * 1024  # 5MB
+
+# Caps Cloudinary uploads in flight across every request of this worker process
+_upload_slots = asyncio.Semaphore(settings.upload_global_concurrency)
+
+
+def _check_size(file: UploadFile, limit: int, label: str) -> None:
+    """Reject uploads over ``limit`` using the size Starlette records while spooling."""
+    if file.size is not None and file.size > limit:
+        raise HTTPException(400, f"{label} exceeds {limit // (1024 * 1024)}MB limit")
+
 
 async def upload_file_optimized(
     file: UploadFile,
@@ -22,17 +37,15 @@ async def upload_file_optimized(
     current_user: dict,
     folder_name: str = "PROJECT",
 ) -> str:
-    ALLOWED_EXTENSIONS = {"jpg", "jpeg", "png", "pdf"}
-    MAX_IMAGE_SIZE = 2 * 1024 * 1024  # 2MB
-    MAX_PDF_SIZE = 5 * 1024 * 1024  # 5MB
-
-    # Extension validation
-    ext = file.filename.rsplit(".", 1)[-1].lower() if file.filename else ""
-    if ext not in ALLOWED_EXTENSIONS:
+    # Type validation from the file's magic bytes, not its name
+    head = await file.read(SNIFF_BYTES)
+    file_type = sniff_file_type(head)
+    if file_type not in ALLOWED_FILE_TYPES:
         raise HTTPException(
             status_code=400,
             detail=f"{label} must be JPG, JPEG, PNG or PDF",
         )
+    await file.seek(0)
 
     # Safe public_id
     timestamp = int(time.time())
@@ -42,26 +55,28 @@ async def upload_file_optimized(
     public_id = f"{user_id}/{safe_first}_{safe_last}_{label}_{timestamp}"
 
     try:
-        # 🔴 READ FILE ONCE (ONLY HERE)
-        content = await file.read()
-
         # Size validation
-        if ext == "pdf" and len(content) > MAX_PDF_SIZE:
-            raise HTTPException(400, f"{label} exceeds 5MB limit")
-
-        if ext != "pdf" and len(content) > MAX_IMAGE_SIZE:
-            raise HTTPException(400, f"{label} exceeds 2MB limit")
+        _check_size(
+            file, MAX_PDF_SIZE if file_type == "pdf" else MAX_IMAGE_SIZE, label
+        )
 
-        resource_type = "raw" if ext == "pdf" else "image"
+        resource_type = "raw" if file_type == "pdf" else "image"
 
         logger.info(f"Uploading {label} for user {user_id}")
 
-        result = await cloudinary_upload.upload_file_async(
-            content, public_id, folder_name, resource_type=resource_type
-        )
+        # Stream straight from Starlette's spooled temp file; no in-memory copy
+        async with _upload_slots:
+            result = await cloudinary_upload.upload_file_async(
+                file.file, public_id, folder_name, resource_type=resource_type
+            )
 
         logger.info(f"{label} uploaded successfully for user {user_id}")
-        return {"image_url": result, "file_type": ext}
+        return {
+            "image_url": result["secure_url"],
+            "file_type": file_type,
+            "public_id": result["public_id"],
+            "resource_type": resource_type,
+        }
 
     except HTTPException:
         raise
@@ -75,3 +90,37 @@ async def upload_file_optimized(
             status_code=500,
             detail=f"Failed to upload {label}",
         )
+
+
+async def upload_files_bounded(
+    files: List[UploadFile],
+    label: str,
+    user_id: str,
+    current_user: dict,
+    folder_name: str = "PROJECT",
+) -> List[dict]:
+    """``upload_file_optimized`` for many files, at most ``upload_request_concurrency`` at a time."""
+    request_slots = asyncio.Semaphore(settings.upload_request_concurrency)
+
+    async def _upload(file: UploadFile) -> dict:
+        async with request_slots:
+            return await upload_file_optimized(
+                file, label, user_id, current_user, folder_name
+            )
+
+    return list(await asyncio.gather(*(_upload(file) for file in files)))
+
+
+async def delete_uploaded_files(uploads: List[dict]) -> None:
+    """Best-effort removal of assets from ``upload_files_bounded`` whose DB write failed."""
+    uploads = [upload for upload in uploads or [] if upload.get("public_id")]
+
+    async def _destroy(upload: dict) -> None:
+        try:
+            await cloudinary_upload.destroy_file_async(
+                upload["public_id"], upload.get("resource_type", "image")
+            )
+        except Exception as e:
+            logger.error(f"Failed to delete orphaned upload {upload['public_id']}: {e}")
+
+    await asyncio.gather(*(_destroy(upload) for upload in uploads))
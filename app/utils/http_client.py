@@ -0,0 +1,167 @@
+import asyncio
+import importlib.util
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from settings import get_settings
+from utils.latency_stats import LatencyStats
+from utils.loggers import setup_logger
+
+settings = get_settings()
+logger = setup_logger("Http_Client")
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+# HTTP/2 needs the optional ``h2`` package (``httpx[http2]``)
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+@dataclass(frozen=True)
+class ProviderConfig:
+    base_url: str = ""
+    read_timeout: float = settings.http_read_timeout
+    http2: bool = True
+
+
+PROVIDERS: Dict[str, ProviderConfig] = {
+    "cloudinary": ProviderConfig(
+        base_url="https://api.cloudinary.com",
+        read_timeout=settings.http_upload_timeout,
+    ),
+    "paystack": ProviderConfig(base_url="https://api.paystack.co"),
+    "sendgrid": ProviderConfig(base_url="https://api.sendgrid.com"),
+}
+
+
+def _rewind_files(files: Any) -> None:
+    """Seek streamed multipart file objects back to the start before a retry."""
+    entries = files.values() if isinstance(files, dict) else files or ()
+    for entry in entries:
+        # (filename, fileobj[, content_type[, headers]]) or a bare fileobj
+        fileobj = entry[1] if isinstance(entry, tuple) else entry
+        if hasattr(fileobj, "seek"):
+            fileobj.seek(0)
+
+
+class HTTPClientRegistry:
+    """
+    One keep-alive ``httpx.AsyncClient`` per outbound provider, shared by every
+    request in the process and closed from the app lifespan.
+
+    Clients are bound to the event loop that created them; a caller on another
+    loop (e.g. a Celery task using ``asyncio.run``) transparently gets its own.
+    """
+
+    def __init__(self) -> None:
+        self._clients: Dict[str, Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+        self.latency = LatencyStats()
+
+    def _build(self, provider: str) -> httpx.AsyncClient:
+        config = PROVIDERS.get(provider, ProviderConfig())
+        return httpx.AsyncClient(
+            base_url=config.base_url,
+            http2=config.http2 and HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_keepalive_connections,
+                keepalive_expiry=settings.http_keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(
+                config.read_timeout,
+                connect=settings.http_connect_timeout,
+                pool=settings.http_pool_timeout,
+            ),
+        )
+
+    def client(self, provider: str) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        entry = self._clients.get(provider)
+        if entry is None or entry[0] is not loop or entry[1].is_closed:
+            entry = (loop, self._build(provider))
+            self._clients[provider] = entry
+            logger.info(f"[HTTP] Opened client for {provider}")
+        return entry[1]
+
+    async def request(
+        self,
+        provider: str,
+        method: str,
+        url: str,
+        *,
+        idempotent: Optional[bool] = None,
+        retries: Optional[int] = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """
+        Send a request through the provider's pooled client.
+
+        Idempotent calls (by method, or ``idempotent=True``) are retried on transport
+        errors and 429/502/503/504 with full-jitter exponential backoff. Every call
+        is retried when the connection could not be established at all, since the
+        request never reached the server.
+        """
+        method = method.upper()
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        attempts = 1 + (settings.http_retries if retries is None else retries)
+
+        client = self.client(provider)
+        host = client.base_url.host or httpx.URL(url).host
+
+        for attempt in range(1, attempts + 1):
+            if attempt > 1:
+                _rewind_files(kwargs.get("files"))
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                self.latency.record(host, time.perf_counter() - started, error=True)
+                retryable = idempotent or isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+                if not retryable or attempt == attempts:
+                    raise
+                logger.warning(
+                    f"[HTTP] {method} {host}{url} failed ({type(e).__name__}), "
+                    f"attempt {attempt}/{attempts}"
+                )
+            else:
+                self.latency.record(
+                    host, time.perf_counter() - started, error=response.status_code >= 500
+                )
+                if (
+                    not idempotent
+                    or response.status_code not in RETRY_STATUS_CODES
+                    or attempt == attempts
+                ):
+                    return response
+                logger.warning(
+                    f"[HTTP] {method} {host}{url} returned {response.status_code}, "
+                    f"attempt {attempt}/{attempts}"
+                )
+                await response.aclose()
+
+            await asyncio.sleep(
+                random.uniform(0, settings.http_backoff_base * 2 ** (attempt - 1))
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "http2_available": HTTP2_AVAILABLE,
+            "open_clients": sorted(p for p, (_, c) in self._clients.items() if not c.is_closed),
+            "hosts": self.latency.snapshot(),
+        }
+
+    async def aclose(self) -> None:
+        clients, self._clients = self._clients, {}
+        for provider, (_, client) in clients.items():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"[HTTP] Failed to close client for {provider}: {e}")
+
+
+http_clients = HTTPClientRegistry()
@@ -0,0 +1,45 @@
+import math
+from collections import deque
+from threading import Lock
+from typing import Any, Dict
+
+
+class LatencyStats:
+    """Per-key call counters and a sliding window of latencies for percentiles (no I/O)."""
+
+    def __init__(self, window: int = 512) -> None:
+        self.window = window
+        self._samples: Dict[str, deque] = {}
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._lock = Lock()
+
+    def record(self, key: str, seconds: float, error: bool = False) -> None:
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+                self._counts[key] = {"count": 0, "errors": 0}
+            samples.append(seconds)
+            self._counts[key]["count"] += 1
+            if error:
+                self._counts[key]["errors"] += 1
+
+    @staticmethod
+    def _percentile(ordered: list, pct: float) -> float:
+        index = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+        return ordered[index]
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            items = {key: (sorted(s), dict(self._counts[key])) for key, s in self._samples.items()}
+
+        result = {}
+        for key, (ordered, counts) in items.items():
+            result[key] = {
+                **counts,
+                "p50_ms": round(self._percentile(ordered, 50) * 1000, 2),
+                "p95_ms": round(self._percentile(ordered, 95) * 1000, 2),
+                "p99_ms": round(self._percentile(ordered, 99) * 1000, 2),
+                "max_ms": round(ordered[-1] * 1000, 2),
+            }
+        return result
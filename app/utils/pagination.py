@@ -1,3 +1,10 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+
 def normalize_pagination(
     page: int, limit: int, *, max_limit: int = 100
 ) -> tuple[int, int, int]:
@@ -6,3 +13,21 @@ def normalize_pagination(
     safe_limit = min(max(limit, 1), max_limit)
     offset = (safe_page - 1) * safe_limit
     return safe_page, safe_limit, offset
+
+
+def encode_cursor(created_at: datetime, row_id: Any) -> str:
+    """Opaque keyset token for a ``(created_at, id)`` position (no I/O)."""
+    raw = json.dumps({"t": created_at.isoformat(), "i": str(row_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> tuple[datetime, str]:
+    """Inverse of ``encode_cursor``; raises ``ValueError`` on a malformed token."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created_at = datetime.fromisoformat(data["t"])
+        row_id = str(UUID(data["i"]))
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    return created_at, row_id
@@ -0,0 +1,190 @@
+import asyncio
+import json
+from typing import Any, Dict, Iterable, Optional, Set
+
+from fastapi import WebSocket
+
+from settings import get_settings
+from utils.loggers import setup_logger
+from utils.redis_client import redis_client
+
+settings = get_settings()
+logger = setup_logger("PubSub_Hub")
+
+# Close code for a socket dropped because it could not keep up ("Try Again Later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+_STOP = object()
+
+
+class Subscriber:
+    """One local WebSocket behind a bounded send queue, drained by ``run``."""
+
+    def __init__(self, hub: "PubSubHub", channel: str, websocket: WebSocket) -> None:
+        self.hub = hub
+        self.channel = channel
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.ws_send_queue_size)
+        self.evicted = False
+        self._skip_ids: Set[str] = set()
+
+    def offer(self, data: str) -> bool:
+        """Queue ``data`` without waiting; ``False`` means the queue is full."""
+        if self.evicted:
+            return True
+        try:
+            self.queue.put_nowait(data)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def skip(self, message_ids: Iterable[str]) -> None:
+        """Drop queued/future messages with these ids (already sent by a replay)."""
+        self._skip_ids.update(message_ids)
+
+    def _is_skipped(self, data: str) -> bool:
+        if not self._skip_ids:
+            return False
+        try:
+            message_id = json.loads(data).get("id")
+        except (ValueError, AttributeError):
+            return False
+        if message_id in self._skip_ids:
+            self._skip_ids.discard(message_id)
+            return True
+        return False
+
+    async def run(self) -> None:
+        """Forward queued messages to the socket until stopped or evicted."""
+        while True:
+            data = await self.queue.get()
+            if data is _STOP:
+                return
+            if self._is_skipped(data):
+                continue
+            try:
+                await asyncio.wait_for(
+                    self.websocket.send_text(data), settings.ws_send_timeout
+                )
+            except asyncio.TimeoutError:
+                await self.hub.evict(self, reason="send timeout")
+                return
+            self.hub.messages_sent += 1
+
+    def stop(self) -> None:
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(_STOP)
+
+
+class PubSubHub:
+    """
+    Per-process fan-out from Redis Pub/Sub to local WebSockets.
+
+    The process holds one Redis connection with one subscription per channel
+    that has at least one local socket. Each message is read once and copied
+    into every local subscriber's bounded queue. A subscriber whose queue is
+    full, or whose send stalls past ``ws_send_timeout``, is evicted and its
+    socket closed with 1013, so one slow client never delays the others.
+    """
+
+    def __init__(self) -> None:
+        self._rooms: Dict[str, Set[Subscriber]] = {}
+        self._pubsub = None
+        self._reader: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.messages_received = 0
+        self.messages_sent = 0
+        self.evictions = 0
+
+    async def join(self, channel: str, websocket: WebSocket) -> Subscriber:
+        """Register a socket on ``channel``. Queue draining starts with ``Subscriber.run``."""
+        subscriber = Subscriber(self, channel, websocket)
+        async with self._lock:
+            if self._pubsub is None:
+                self._pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+
+            room = self._rooms.get(channel)
+            if room is None:
+                room = self._rooms[channel] = set()
+                await self._pubsub.subscribe(channel)
+                logger.info(f"[Hub] Subscribed {channel}")
+            room.add(subscriber)
+
+            if self._reader is None or self._reader.done():
+                self._reader = asyncio.create_task(self._read())
+        return subscriber
+
+    async def leave(self, subscriber: Subscriber) -> None:
+        subscriber.stop()
+        async with self._lock:
+            room = self._rooms.get(subscriber.channel)
+            if room is None or subscriber not in room:
+                return
+            room.discard(subscriber)
+            if not room:
+                del self._rooms[subscriber.channel]
+                try:
+                    await self._pubsub.unsubscribe(subscriber.channel)
+                    logger.info(f"[Hub] Unsubscribed {subscriber.channel}")
+                except Exception as e:
+                    logger.warning(f"[Hub] Unsubscribe {subscriber.channel} failed: {e}")
+
+    async def evict(self, subscriber: Subscriber, reason: str) -> None:
+        if subscriber.evicted:
+            return
+        subscriber.evicted = True
+        self.evictions += 1
+        logger.warning(f"[Hub] Evicting slow consumer on {subscriber.channel}: {reason}")
+        await self.leave(subscriber)
+        try:
+            await subscriber.websocket.close(
+                code=SLOW_CONSUMER_CLOSE_CODE, reason="Slow consumer"
+            )
+        except Exception:
+            pass
+
+    def _fan_out(self, channel: str, data: str) -> None:
+        for subscriber in list(self._rooms.get(channel, ())):
+            if not subscriber.offer(data):
+                asyncio.create_task(self.evict(subscriber, reason="send queue full"))
+
+    async def _read(self) -> None:
+        while self._rooms:
+            try:
+                message = await self._pubsub.get_message(timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # redis-py reconnects and re-subscribes on the next call
+                logger.error(f"[Hub] Pub/Sub read failed: {e}")
+                await asyncio.sleep(1.0)
+                continue
+
+            if message and message["type"] == "message":
+                self.messages_received += 1
+                self._fan_out(message["channel"], message["data"])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "connections": sum(len(room) for room in self._rooms.values()),
+            "subscriptions": len(self._rooms),
+            "messages_received": self.messages_received,
+            "messages_sent": self.messages_sent,
+            "evictions": self.evictions,
+        }
+
+    async def aclose(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.aclose()
+            except Exception as e:
+                logger.warning(f"[Hub] Failed to close Pub/Sub: {e}")
+        self._rooms.clear()
+        self._pubsub = None
+        self._reader = None
+
+
+chat_hub = PubSubHub()
@@ -0,0 +1,124 @@
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+_current: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@dataclass
+class QueryStats:
+    """
+    Statements issued within one unit of work (a request, a test block).
+
+    ``budget`` turns the stats into an assertion: the statement that would
+    exceed it raises ``QueryBudgetExceeded`` before it reaches the database.
+    ``budget_source`` supplies a budget known only later, e.g. once the request
+    has been routed to an endpoint.
+    """
+
+    budget: Optional[int] = None
+    budget_source: Optional[Callable[[], Optional[int]]] = None
+    count: int = 0
+    seconds: float = 0.0
+    slowest_seconds: float = 0.0
+    slowest_statement: Optional[str] = None
+    statements: Counter = field(default_factory=Counter)
+    transactions: int = 0
+    connection_seconds: float = 0.0
+
+    def before(self, statement: str) -> None:
+        self.count += 1
+        budget = self.budget
+        if budget is None and self.budget_source is not None:
+            budget = self.budget_source()
+        if budget is not None and self.count > budget:
+            raise QueryBudgetExceeded(
+                f"Query budget of {budget} exceeded by: {_normalize(statement)[:200]}"
+            )
+
+    def after(self, statement: str, seconds: float) -> None:
+        statement = _normalize(statement)
+        self.seconds += seconds
+        self.statements[statement] += 1
+        if seconds >= self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+
+    def held(self, seconds: float) -> None:
+        """A session returned its pooled connection after ``seconds``."""
+        self.transactions += 1
+        self.connection_seconds += seconds
+
+    def repeated(self, min_count: int) -> List[Tuple[str, int]]:
+        """Identical statements run ``min_count`` times or more: N+1 suspects."""
+        return [(stmt, n) for stmt, n in self.statements.most_common() if n >= min_count]
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.seconds * 1000:.1f};desc="{self.count} queries", '
+            f'db-conn;dur={self.connection_seconds * 1000:.1f};desc="{self.transactions} checkouts"'
+        )
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "queries": self.count,
+            "db_ms": round(self.seconds * 1000, 2),
+            "slowest_ms": round(self.slowest_seconds * 1000, 2),
+            "slowest": (self.slowest_statement or "")[:200],
+            "transactions": self.transactions,
+            "connection_ms": round(self.connection_seconds * 1000, 2),
+        }
+
+
+def _normalize(statement: str) -> str:
+    # Bound parameters are placeholders already, so equal text means the same query shape
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def begin(
+    budget: Optional[int] = None,
+    budget_source: Optional[Callable[[], Optional[int]]] = None,
+) -> Tuple[QueryStats, Token]:
+    stats = QueryStats(budget=budget, budget_source=budget_source)
+    return stats, _current.set(stats)
+
+
+def end(token: Token) -> None:
+    _current.reset(token)
+
+
+def current() -> Optional[QueryStats]:
+    return _current.get()
+
+
+@contextmanager
+def assert_max_queries(max_queries: int) -> Iterator[QueryStats]:
+    """Fail the block if it issues more than ``max_queries`` statements."""
+    stats, token = begin(budget=max_queries)
+    try:
+        yield stats
+    finally:
+        end(token)
+
+
+def query_budget(max_queries: int) -> Callable:
+    """Declare an endpoint's statement budget, enforced per request when ``query_budget_strict`` is on."""
+
+    def decorator(fn: Callable) -> Callable:
+        fn.__query_budget__ = max_queries
+        return fn
+
+    return decorator
+
+
+def endpoint_budget(endpoint: Any) -> Optional[int]:
+    return getattr(endpoint, "__query_budget__", None)
@@ -1,5 +1,15 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
 from pwdlib import PasswordHash
 
+from settings import get_settings
+
+settings = get_settings()
 
 password_hash = PasswordHash.recommended()
 
@@ -10,3 +20,92 @@ def verify_password(plain_password, hashed_password) -> bool:
 
 def get_password_hash(password) -> str:
     return password_hash.hash(password)
+
+
+# ---------------------------------------------------------------------------
+# Off-event-loop hashing
+# ---------------------------------------------------------------------------
+# Argon2 (argon2-cffi) releases the GIL while hashing, so a thread pool gives
+# real parallelism without pickling requests to worker processes.
+
+_workers = settings.password_hash_workers or os.cpu_count() or 1
+_executor = ThreadPoolExecutor(max_workers=_workers, thread_name_prefix="pwhash")
+
+_stats = {
+    "submitted": 0,
+    "rejected": 0,
+    "pending": 0,
+    "max_pending": 0,
+    "wait_seconds": 0.0,
+    "run_seconds": 0.0,
+    "completed": 0,
+}
+
+
+async def _run_in_pool(fn: Callable[..., Any], *args: Any) -> Any:
+    if _stats["pending"] >= settings.password_hash_max_pending:
+        _stats["rejected"] += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please try again shortly",
+        )
+
+    _stats["submitted"] += 1
+    _stats["pending"] += 1
+    _stats["max_pending"] = max(_stats["max_pending"], _stats["pending"])
+    submitted_at = time.perf_counter()
+
+    def _timed() -> Tuple[Any, float, float]:
+        started = time.perf_counter()
+        result = fn(*args)
+        return result, started - submitted_at, time.perf_counter() - started
+
+    try:
+        result, waited, ran = await asyncio.get_running_loop().run_in_executor(
+            _executor, _timed
+        )
+    finally:
+        _stats["pending"] -= 1
+
+    _stats["completed"] += 1
+    _stats["wait_seconds"] += waited
+    _stats["run_seconds"] += ran
+    return result
+
+
+async def verify_password_async(plain_password, hashed_password) -> bool:
+    return await _run_in_pool(verify_password, plain_password, hashed_password)
+
+
+async def verify_and_update_password(
+    plain_password, hashed_password
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify off the event loop. The second item is a fresh hash when the stored
+    one uses outdated parameters (or another algorithm) and should be saved.
+    """
+    return await _run_in_pool(
+        password_hash.verify_and_update, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password) -> str:
+    return await _run_in_pool(get_password_hash, password)
+
+
+def password_hasher_stats() -> Dict[str, Any]:
+    completed = _stats["completed"]
+    return {
+        "workers": _workers,
+        "pending": _stats["pending"],
+        "queued": max(_stats["pending"] - _workers, 0),
+        "max_pending": _stats["max_pending"],
+        "submitted": _stats["submitted"],
+        "rejected": _stats["rejected"],
+        "avg_wait_ms": round(_stats["wait_seconds"] / completed * 1000, 2) if completed else 0.0,
+        "avg_run_ms": round(_stats["run_seconds"] / completed * 1000, 2) if completed else 0.0,
+    }
+
+
+def shutdown_password_hasher() -> None:
+    _executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,58 @@
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Callable, Iterable, Tuple
+
+
+@dataclass(frozen=True)
+class BucketSpec:
+    """One bucket to charge: ``capacity`` tokens, refilled at ``rate`` per second."""
+
+    key: str
+    capacity: float
+    rate: float
+    cost: float = 1.0
+
+
+class LocalTokenBuckets:
+    """
+    In-process token buckets with LRU eviction (no I/O).
+
+    ``take`` charges several buckets atomically: either every bucket has enough
+    tokens and all are charged, or none is and the wait until all would be is
+    returned.
+    """
+
+    def __init__(self, maxsize: int = 10_000, clock: Callable[[], float] = time.monotonic) -> None:
+        self.maxsize = maxsize
+        self.clock = clock
+        self._state: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = Lock()
+
+    def _tokens(self, spec: BucketSpec, now: float) -> float:
+        tokens, updated = self._state.get(spec.key, (spec.capacity, now))
+        return min(spec.capacity, tokens + max(now - updated, 0.0) * spec.rate)
+
+    def take(self, specs: Iterable[BucketSpec]) -> Tuple[bool, float]:
+        """Returns ``(allowed, retry_after_seconds)``."""
+        specs = list(specs)
+        with self._lock:
+            now = self.clock()
+            levels = [self._tokens(spec, now) for spec in specs]
+
+            retry_after = 0.0
+            for spec, tokens in zip(specs, levels):
+                if tokens < spec.cost:
+                    wait = (spec.cost - tokens) / spec.rate if spec.rate > 0 else math.inf
+                    retry_after = max(retry_after, wait)
+            if retry_after > 0:
+                return False, retry_after
+
+            for spec, tokens in zip(specs, levels):
+                self._state[spec.key] = (tokens - spec.cost, now)
+                self._state.move_to_end(spec.key)
+            while len(self._state) > self.maxsize:
+                self._state.popitem(last=False)
+            return True, 0.0
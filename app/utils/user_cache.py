@@ -0,0 +1,96 @@
+import json
+from typing import Any, Dict, Optional
+
+from settings import get_settings
+from utils.loggers import setup_logger
+from utils.redis_client import redis_client
+from utils.ttl_cache import TTLCache
+
+settings = get_settings()
+logger = setup_logger("User_Cache")
+
+USER_CACHE_PREFIX = "auth:user:"
+
+
+def _redis_key(user_id: str) -> str:
+    return f"{USER_CACHE_PREFIX}{user_id}"
+
+
+class UserPrincipalCache:
+    """
+    Two-tier cache for the authenticated user principal.
+
+    Tier 1 is a per-process LRU keyed by ``(user_id, iat)``; tier 2 is a Redis hash
+    ``auth:user:<user_id>`` with one field per token ``iat``. Deleting the hash
+    invalidates every token of the user across processes; other processes drop
+    their local copy at most ``user_cache_local_ttl`` seconds later.
+    """
+
+    def __init__(self) -> None:
+        self.local = TTLCache(
+            maxsize=settings.user_cache_local_size,
+            ttl=settings.user_cache_local_ttl,
+        )
+        self.redis_ttl = settings.user_cache_redis_ttl
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    async def get(self, user_id: str, iat: Any) -> Optional[Dict[str, Any]]:
+        key = (user_id, str(iat))
+
+        cached = self.local.get(key)
+        if cached is not None:
+            self.local_hits += 1
+            return dict(cached)
+
+        try:
+            raw = await redis_client.hget(_redis_key(user_id), str(iat))
+        except Exception as e:
+            logger.warning(f"[UserCache] Redis read failed for user={user_id}: {e}")
+            raw = None
+
+        if raw is None:
+            self.misses += 1
+            return None
+
+        self.redis_hits += 1
+        principal = json.loads(raw)
+        self.local.set(key, principal)
+        return dict(principal)
+
+    async def set(self, user_id: str, iat: Any, principal: Dict[str, Any]) -> None:
+        """``principal`` must already be JSON-safe (``model_dump(mode="json")``)."""
+        self.local.set((user_id, str(iat)), principal)
+
+        try:
+            pipe = redis_client.pipeline()
+            pipe.hset(_redis_key(user_id), str(iat), json.dumps(principal))
+            pipe.expire(_redis_key(user_id), self.redis_ttl)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"[UserCache] Redis write failed for user={user_id}: {e}")
+
+    async def invalidate(self, user_id: str) -> None:
+        """Drop every cached token of ``user_id``. Call after any write to the user row."""
+        user_id = str(user_id)
+        self.local.discard_where(lambda key: key[0] == user_id)
+
+        try:
+            await redis_client.delete(_redis_key(user_id))
+        except Exception as e:
+            logger.warning(f"[UserCache] Redis invalidation failed for user={user_id}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.local_hits + self.redis_hits + self.misses
+        hits = self.local_hits + self.redis_hits
+        return {
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "local_size": len(self.local),
+        }
+
+
+user_cache = UserPrincipalCache()
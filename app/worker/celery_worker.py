@@ -1,8 +1,20 @@
 import logging
+import os
+import sys
 from celery import Celery
 from celery.schedules import crontab
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 from settings import get_settings
-import asyncio
+from services.analytics_service import AnalyticsService
+from services.chat_unread_service import ChatUnreadService
+from services.email_outbox import EmailOutboxService
+from services.entitlement_service import EntitlementService
+from services.plan_usage_service import ProjectPlanUsageService
+from services.webhook_service import WebhookService
+from utils.db_setup import AsyncSessionLocal
+from worker.runtime import async_task, runtime
 
 logger = logging.getLogger("celery_worker")
 
@@ -40,58 +52,135 @@ celery.conf.beat_schedule = {
         "task": "schedule_plan_expire_notification_email",
         "schedule": crontab(hour=1, minute=30),  
     },
+
+    # Rebuild cached chat unread counters from read cursors every 15 minutes
+    "reconcile-chat-unread": {
+        "task": "reconcile_chat_unread",
+        "schedule": crontab(minute="*/15"),
+    },
+
+    # Pick up webhook events that are due a retry or were never enqueued
+    "dispatch-webhook-events": {
+        "task": "dispatch_webhook_events",
+        "schedule": 30.0,
+    },
+
+    # Send queued transactional emails
+    "drain-email-outbox": {
+        "task": "drain_email_outbox",
+        "schedule": 15.0,
+    },
+
+    # Admin dashboard counters: changed projects every 5 minutes, everything nightly
+    "refresh-analytics-summary": {
+        "task": "refresh_analytics_summary",
+        "schedule": crontab(minute="*/5"),
+    },
+    "rebuild-analytics-summary": {
+        "task": "rebuild_analytics_summary",
+        "schedule": crontab(hour=0, minute=15),
+    },
+
+    # Write Redis plan usage counters behind to Postgres every minute
+    "flush-usage-counters": {
+        "task": "flush_usage_counters",
+        "schedule": 60.0,
+    },
 }
 
 
 # # ---------------------------
 # # Celery Tasks
 # # ---------------------------
-@celery.task(name="schedule_plan_expiration")
-def schedule_plan_expiration():
+# Every task runs on the worker process's persistent event loop (worker/runtime.py);
+# the engine, Redis pool and HTTP clients are shared across tasks, not rebuilt.
+
+
+@async_task(celery, name="schedule_plan_expiration")
+async def schedule_plan_expiration():
+    logger.info("Running plan expiration task")
+    async with AsyncSessionLocal() as db:
+        service = ProjectPlanUsageService(db=db)
+        return await service.schedule_plan_expiration()
 
-    import os
-    import sys
 
-    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+@async_task(celery, name="schedule_plan_expire_notification_email")
+async def schedule_plan_expiration_email():
+    logger.info("Running plan expiration email task")
+    async with AsyncSessionLocal() as db:
+        service = ProjectPlanUsageService(db=db)
+        return await service.send_plan_expiration_reminders()
 
-    from services.plan_usage_service import ProjectPlanUsageService
-    # Import engine here or from your DB module
-    from utils.db_setup import AsyncSessionLocal, engine
 
-    async def run():
-        try:
-            async with AsyncSessionLocal() as db:
-                service = ProjectPlanUsageService(db=db)
-                await service.schedule_plan_expiration()
-        finally:
-            # THIS IS THE FIX: Clear the pool before the loop exits
-            await engine.dispose()
+@async_task(celery, name="flush_usage_counters")
+async def flush_usage_counters():
+    flushed = 0
+    async with AsyncSessionLocal() as db:
+        service = EntitlementService(db=db)
+        while True:
+            count = await service.flush_usage()
+            flushed += count
+            if not count:
+                break
 
-    logger.info("Running plan expiration task")
-    asyncio.run(run())
-    return "Plan expiration task completed"
+    logger.info(f"Flushed usage counters for {flushed} projects")
+    return f"Flushed usage counters for {flushed} projects"
 
 
-@celery.task(name="schedule_plan_expire_notification_email")
-def schedule_plan_expiration_email():
+@async_task(celery, name="reconcile_chat_unread")
+async def reconcile_chat_unread():
+    async with AsyncSessionLocal() as db:
+        reconciled = await ChatUnreadService(db=db).reconcile()
 
-    import os
-    import sys
+    logger.info(f"Reconciled chat unread counters for {reconciled} users")
+    return f"Reconciled chat unread counters for {reconciled} users"
 
-    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-    from services.plan_usage_service import ProjectPlanUsageService
-    from utils.db_setup import AsyncSessionLocal, engine
+@async_task(celery, name="process_webhook_event")
+async def process_webhook_event(event_id: str):
+    async with AsyncSessionLocal() as db:
+        result = await WebhookService(db=db).process(event_id)
 
-    async def run():
-        try:
-            async with AsyncSessionLocal() as db:
-                service = ProjectPlanUsageService(db=db)
-                await service.send_plan_expiration_reminders()
-        finally:
-            # THIS IS THE FIX: Clear the pool before the loop exits
-            await engine.dispose()
+    logger.info(f"Webhook event {event_id}: {result}")
+    return result
 
-    logger.info("Running plan expiration email task")
-    asyncio.run(run())
-    return "Plan expiration email task completed"
+
+@async_task(celery, name="dispatch_webhook_events")
+async def dispatch_webhook_events():
+    async with AsyncSessionLocal() as db:
+        event_ids = await WebhookService(db=db).due_event_ids()
+
+    for event_id in event_ids:
+        process_webhook_event.delay(event_id)
+    if event_ids:
+        logger.info(f"Dispatched {len(event_ids)} webhook events")
+    return f"Dispatched {len(event_ids)} webhook events"
+
+
+@async_task(celery, name="drain_email_outbox")
+async def drain_email_outbox():
+    async with AsyncSessionLocal() as db:
+        sent = await EmailOutboxService(db=db).drain()
+
+    if sent:
+        logger.info(f"Drained {sent} outbox emails")
+    return f"Drained {sent} outbox emails"
+
+
+@async_task(celery, name="refresh_analytics_summary")
+async def refresh_analytics_summary():
+    async with AsyncSessionLocal() as db:
+        return await AnalyticsService(db=db).refresh()
+
+
+@async_task(celery, name="rebuild_analytics_summary")
+async def rebuild_analytics_summary():
+    """Full recompute for drift repair: ``celery -A worker.celery_worker.celery call rebuild_analytics_summary``."""
+    async with AsyncSessionLocal() as db:
+        return await AnalyticsService(db=db).refresh(full=True)
+
+
+@celery.task(name="worker_runtime_stats")
+def worker_runtime_stats():
+    """Task latency percentiles of the worker process that picks this up."""
+    return runtime.stats()
@@ -0,0 +1,132 @@
+import asyncio
+import functools
+import glob
+import logging
+import os
+import time
+from typing import Any, Callable, Coroutine, Dict, Optional
+
+from celery import Celery
+from celery.signals import (
+    worker_init,
+    worker_process_init,
+    worker_process_shutdown,
+    worker_shutdown,
+)
+
+from utils.latency_stats import LatencyStats
+from utils.metrics import CELERY_TASK_DURATION, MULTIPROC_DIR, mark_process_dead, metrics_registry
+
+logger = logging.getLogger("celery_runtime")
+
+
+class WorkerRuntime:
+    """
+    One event loop per Celery worker process, shared by every async task it runs.
+
+    The loop is created when the pool process starts (lazily for ``solo`` pools and
+    eager ``apply()``). Tasks are driven with ``run_until_complete`` on it, so the
+    SQLAlchemy engine, the Redis pool and the outbound HTTP clients keep their
+    connections between tasks. Everything is closed once, at process shutdown.
+    """
+
+    def __init__(self) -> None:
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.latency = LatencyStats()
+
+    def start(self) -> asyncio.AbstractEventLoop:
+        if self.loop is None or self.loop.is_closed():
+            self.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.loop)
+            logger.info("[Runtime] Event loop started")
+        return self.loop
+
+    def run(self, name: str, fn: Callable[..., Coroutine], *args: Any, **kwargs: Any) -> Any:
+        loop = self.start()
+        started = time.perf_counter()
+        failed = False
+        try:
+            return loop.run_until_complete(fn(*args, **kwargs))
+        except Exception:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self.latency.record(name, elapsed, error=failed)
+            CELERY_TASK_DURATION.labels(name, "failure" if failed else "success").observe(elapsed)
+            logger.debug(f"[Runtime] {name} finished in {elapsed * 1000:.1f}ms")
+
+    async def _aclose(self) -> None:
+        from utils.db_setup import engine, replica_engine
+        from utils.http_client import http_clients
+        from utils.redis_client import redis_client
+
+        await http_clients.aclose()
+        await redis_client.connection_pool.disconnect()
+        await engine.dispose()
+        if replica_engine is not None:
+            await replica_engine.dispose()
+
+    def shutdown(self) -> None:
+        if self.loop is None or self.loop.is_closed():
+            return
+        try:
+            self.loop.run_until_complete(self._aclose())
+        except Exception as e:
+            logger.warning(f"[Runtime] Failed to close connections: {e}")
+        finally:
+            self.loop.close()
+            logger.info(f"[Runtime] Event loop closed | task stats={self.stats()}")
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return self.latency.snapshot()
+
+
+runtime = WorkerRuntime()
+
+
+def async_task(app: Celery, name: str, **options: Any) -> Callable:
+    """Register a coroutine function as a Celery task run on the process event loop."""
+
+    def decorator(fn: Callable[..., Coroutine]):
+        @app.task(name=name, **options)
+        @functools.wraps(fn)
+        def task(*args: Any, **kwargs: Any) -> Any:
+            return runtime.run(name, fn, *args, **kwargs)
+
+        return task
+
+    return decorator
+
+
+@worker_init.connect
+def _start_metrics_exporter(**_: Any) -> None:
+    """Serve every pool process's task metrics from the worker's main process."""
+    from prometheus_client import start_http_server
+
+    from settings import get_settings
+
+    if MULTIPROC_DIR:
+        # Samples left by the previous run of this container
+        for path in glob.glob(os.path.join(MULTIPROC_DIR, "*.db")):
+            os.remove(path)
+    start_http_server(get_settings().worker_metrics_port, registry=metrics_registry())
+    logger.info("[Runtime] Metrics exporter started")
+
+
+@worker_process_init.connect
+def _start_process_runtime(**_: Any) -> None:
+    from utils.db_setup import engine, replica_engine
+
+    # Never reuse sockets inherited from the parent across fork
+    engine.sync_engine.dispose(close=False)
+    if replica_engine is not None:
+        replica_engine.sync_engine.dispose(close=False)
+    runtime.start()
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def _stop_process_runtime(**_: Any) -> None:
+    runtime.shutdown()
+    mark_process_dead(os.getpid())